@@ -0,0 +1,584 @@
+# adaptadores_jurisprudencia.py
+
+"""
+Adaptadores dos sites de jurisprudência usados pela JurisprudenciaTool.
+Cada site é uma subclasse de AdaptadorSite que reúne o que antes ficava
+espalhado na ferramenta: o perfil de rede do modo enxuto, a condição de
+prontidão da página, os seletores dos cartões e a própria busca. Cada
+adaptador também protege o site: limite de buscas simultâneas, limite de
+taxa (token bucket) e um disjuntor (circuit breaker) que, após falhas ou
+timeouts seguidos, recusa as buscas naquele site durante um período de
+resfriamento em vez de esperar o timeout inteiro a cada pesquisa.
+
+Adaptadores de sites que devolvem os resultados em HTML renderizado no
+servidor declaram requer_navegador = False e implementam buscar_http: a
+busca é feita com o cliente HTTP (cliente_http), sem abrir o Chromium, e o
+navegador fica como alternativa se a requisição falhar.
+
+Os adaptadores ficam em um registro por processo (registrar_adaptador), de
+modo que o estado do disjuntor, o limite de taxa e os histogramas de
+latência valem para todas as instâncias da ferramenta. O url_base de cada
+adaptador pode ser trocado (por exemplo, por um servidor local com páginas
+gravadas, nos testes).
+"""
+
+import asyncio
+import bisect
+import contextlib
+import time
+import weakref
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+from melkor.cliente_http import analisar_html, texto_xpath
+
+# Extrai todos os campos de todos os cartões de uma vez, no navegador
+_JS_EXTRAIR_CARTOES = """
+([spec, limite]) => {
+    let cartoes = [];
+    for (const seletor of spec.cartoes) {
+        cartoes = Array.from(document.querySelectorAll(seletor));
+        if (cartoes.length) break;
+    }
+    const texto = (raiz, seletor) => {
+        const el = seletor ? raiz.querySelector(seletor) : null;
+        return el ? el.innerText : null;
+    };
+    return cartoes.slice(0, limite).map((cartao) => {
+        const titulo = cartao.querySelector(spec.titulo);
+        const ancora = titulo ? (titulo.closest("a") || titulo.querySelector("a")) : null;
+        return {
+            titulo: titulo ? titulo.innerText : null,
+            link: ancora ? ancora.getAttribute("href") : null,
+            resumo: texto(cartao, spec.resumo),
+            data_publicacao: texto(cartao, spec.data),
+        };
+    });
+}
+"""
+
+# Limites superiores (em segundos) das faixas dos histogramas de latência
+FAIXAS_LATENCIA = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class LimitadorTaxa:
+    """
+    Token bucket: até `rajada` buscas imediatas, reabastecido a
+    `por_segundo` fichas por segundo. Quem chega sem ficha reserva a próxima
+    e espera por ela, na ordem de chegada.
+    """
+
+    def __init__(self, por_segundo: Optional[float], rajada: int = 1):
+        self.por_segundo = por_segundo
+        self.rajada = max(1, rajada)
+        self.fichas = float(self.rajada)
+        self.atualizado = time.monotonic()
+        self.esperas = 0
+
+    async def aguardar(self) -> float:
+        """Consome uma ficha, esperando por ela se preciso. Retorna a espera em segundos."""
+        if not self.por_segundo:
+            return 0.0
+        agora = time.monotonic()
+        self.fichas = min(self.rajada, self.fichas + (agora - self.atualizado) * self.por_segundo)
+        self.atualizado = agora
+        self.fichas -= 1
+        if self.fichas >= 0:
+            return 0.0
+        espera = -self.fichas / self.por_segundo
+        self.esperas += 1
+        await asyncio.sleep(espera)
+        return espera
+
+
+class Disjuntor:
+    """
+    Circuit breaker. "fechado": as buscas passam. Após `falhas_para_abrir`
+    falhas seguidas passa a "aberto" e recusa as buscas por
+    `tempo_resfriamento` segundos; depois fica "meio_aberto" e deixa passar
+    uma única busca de teste, que fecha o disjuntor se der certo ou o reabre
+    se falhar.
+    """
+
+    def __init__(self, falhas_para_abrir: int = 3, tempo_resfriamento: float = 120.0):
+        self.falhas_para_abrir = max(1, falhas_para_abrir)
+        self.tempo_resfriamento = tempo_resfriamento
+        self.estado = "fechado"
+        self.falhas_seguidas = 0
+        self.aberto_em = 0.0
+        self.aberturas = 0
+        self.recusadas = 0
+        self._teste_em_andamento = False
+
+    def permitir(self) -> bool:
+        """Indica se uma busca pode ser feita agora (e reserva o teste, no estado meio aberto)."""
+        if self.estado == "aberto" and time.monotonic() - self.aberto_em >= self.tempo_resfriamento:
+            self.estado = "meio_aberto"
+        if self.estado == "fechado":
+            return True
+        if self.estado == "meio_aberto" and not self._teste_em_andamento:
+            self._teste_em_andamento = True
+            return True
+        self.recusadas += 1
+        return False
+
+    def registrar_sucesso(self) -> None:
+        self.estado = "fechado"
+        self.falhas_seguidas = 0
+        self._teste_em_andamento = False
+
+    def registrar_falha(self) -> None:
+        self.falhas_seguidas += 1
+        self._teste_em_andamento = False
+        if self.estado == "meio_aberto" or self.falhas_seguidas >= self.falhas_para_abrir:
+            self.estado = "aberto"
+            self.aberto_em = time.monotonic()
+            self.aberturas += 1
+
+    def cancelar(self) -> None:
+        """Libera o teste do estado meio aberto quando a busca foi cancelada sem resultado."""
+        self._teste_em_andamento = False
+
+    def segundos_para_reabrir(self) -> float:
+        """Tempo restante de resfriamento (0 se o disjuntor não estiver aberto)."""
+        if self.estado != "aberto":
+            return 0.0
+        return max(self.tempo_resfriamento - (time.monotonic() - self.aberto_em), 0.0)
+
+    def resumo(self) -> Dict[str, object]:
+        return {
+            "estado": self.estado,
+            "falhas_seguidas": self.falhas_seguidas,
+            "aberturas": self.aberturas,
+            "recusadas": self.recusadas,
+            "segundos_para_reabrir": round(self.segundos_para_reabrir(), 1),
+        }
+
+
+class HistogramaLatencia:
+    """Contagem de latências por faixa (FAIXAS_LATENCIA), com média e percentis estimados."""
+
+    def __init__(self, faixas=FAIXAS_LATENCIA):
+        self.faixas = tuple(faixas)
+        self.contagens = [0] * (len(self.faixas) + 1)
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos: float) -> None:
+        self.contagens[bisect.bisect_left(self.faixas, segundos)] += 1
+        self.total += 1
+        self.soma += segundos
+        self.maximo = max(self.maximo, segundos)
+
+    def percentil(self, p: float) -> Optional[float]:
+        """Limite superior da faixa que contém o percentil p (0 a 100); o máximo na última faixa."""
+        if not self.total:
+            return None
+        alvo = p / 100 * self.total
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo and contagem:
+                return self.faixas[indice] if indice < len(self.faixas) else self.maximo
+        return self.maximo
+
+    def resumo(self) -> Dict[str, object]:
+        rotulos = [f"<={faixa:g}s" for faixa in self.faixas] + [f">{self.faixas[-1]:g}s"]
+        return {
+            "contagem": self.total,
+            "media": self.soma / self.total if self.total else None,
+            "p50": self.percentil(50),
+            "p95": self.percentil(95),
+            "maximo": self.maximo if self.total else None,
+            "faixas": dict(zip(rotulos, self.contagens)),
+        }
+
+
+class AdaptadorSite:
+    """
+    Base dos adaptadores. Subclasses definem o nome e a configuração do site
+    nos atributos de classe e implementam buscar().
+    """
+
+    # Nome usado na lista de sites da ferramenta e fonte exibida nos resultados
+    nome = ""
+    fonte = ""
+    # Perfil de rede no modo enxuto: domínios próprios (requisições a outros
+    # domínios, como analytics e anúncios, são bloqueadas) e tipos de recurso
+    # liberados apesar do bloqueio padrão da ferramenta
+    dominios: List[str] = []
+    tipos_permitidos: List[str] = []
+    # Condição que indica que a página de resultados está pronta. Tipos:
+    #   "seletor": espera o seletor ficar visível;
+    #   "min_resultados": espera o seletor ter pelo menos "minimo" elementos;
+    #   "rede_ociosa": espera a rede ficar ociosa (networkidle).
+    # "espera_maxima" (ms) limita a espera; ao estourar, a extração segue com
+    # o que já carregou.
+    prontidao: Dict[str, object] = {"tipo": "rede_ociosa", "espera_maxima": 5000}
+    # Seletores dos cartões de resultado, lidos por extrair_cartoes em uma
+    # única avaliação na página. "cartoes" é uma lista de alternativas: vale a
+    # primeira que encontrar algum cartão. A estrutura dos sites pode mudar,
+    # então os seletores podem precisar de ajuste.
+    seletores_cartoes: Optional[Dict[str, object]] = None
+    # Expressões XPath (relativas ao cartão, exceto "cartoes") dos resultados
+    # em HTML obtidos por buscar_http, lidas por extrair_html
+    seletores_html: Optional[Dict[str, str]] = None
+    url_base = ""
+    # False quando buscar_http atende o site sem JavaScript
+    requer_navegador = True
+    # Proteções do site
+    max_concorrencia = 2
+    requisicoes_por_segundo: Optional[float] = 0.5
+    rajada = 2
+    falhas_para_abrir = 3
+    tempo_resfriamento = 120.0
+
+    def __init__(self, url_base: Optional[str] = None):
+        """
+        Args:
+            url_base: Endereço alternativo do site (ex.: servidor local com
+                      páginas gravadas). O domínio passa a fazer parte do
+                      perfil de rede do adaptador.
+        """
+        if url_base:
+            self.url_base = url_base.rstrip("/")
+            self.dominios = self.dominios + [urlsplit(self.url_base).hostname or ""]
+        self.limitador = LimitadorTaxa(self.requisicoes_por_segundo, self.rajada)
+        self.disjuntor = Disjuntor(self.falhas_para_abrir, self.tempo_resfriamento)
+        self.latencias = HistogramaLatencia()
+        self.sucessos = 0
+        self.falhas = 0
+        self.em_uso = 0
+        # asyncio.Semaphore pertence a um loop de eventos: um por loop
+        self._semaforos: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def semaforo(self) -> asyncio.Semaphore:
+        """Semáforo que limita as buscas simultâneas no site (max_concorrencia)."""
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(max(1, self.max_concorrencia))
+        return semaforo
+
+    def registrar_resultado(self, sucesso: bool, segundos: float) -> None:
+        """Registra o desfecho de uma busca no disjuntor e no histograma de latência."""
+        self.latencias.registrar(segundos)
+        if sucesso:
+            self.sucessos += 1
+            self.disjuntor.registrar_sucesso()
+        else:
+            self.falhas += 1
+            self.disjuntor.registrar_falha()
+
+    def estatisticas(self) -> Dict[str, object]:
+        """Estado do disjuntor, latências e contadores do adaptador."""
+        return {
+            "disjuntor": self.disjuntor.resumo(),
+            "latencia": self.latencias.resumo(),
+            "sucessos": self.sucessos,
+            "falhas": self.falhas,
+            "em_uso": self.em_uso,
+            "max_concorrencia": self.max_concorrencia,
+            "esperas_taxa": self.limitador.esperas,
+        }
+
+    async def buscar(self, tool, page: Page, termo_busca: str) -> List[Dict[str, str]]:
+        """
+        Faz a busca no site.
+
+        Args:
+            tool: JurisprudenciaTool que pediu a busca (timeout, limite_resultados
+                  e ultimo_status_sites).
+            page: Página nova, já com o roteamento de rede instalado.
+            termo_busca: O termo a ser pesquisado.
+
+        Returns:
+            Lista de resultados com "titulo", "link", "resumo", "fonte" e "data_publicacao".
+        """
+        raise NotImplementedError
+
+    async def buscar_http(self, tool, cliente, termo_busca: str) -> List[Dict[str, str]]:
+        """
+        Faz a busca no site sem navegador. Implementado pelos adaptadores com
+        requer_navegador = False.
+
+        Args:
+            tool: JurisprudenciaTool que pediu a busca.
+            cliente: httpx.AsyncClient compartilhado (obter_cliente_http).
+            termo_busca: O termo a ser pesquisado.
+
+        Returns:
+            Lista de resultados, no mesmo formato de buscar().
+        """
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def etapa(self, status: Optional[Dict[str, object]], nome: str) -> Iterator[None]:
+        """
+        Soma o tempo do bloco em status["etapas"][nome] ("navegacao", "espera",
+        "extracao", "requisicao"), usado pelo benchmark de jurisprudência.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            if status is not None:
+                etapas = status.setdefault("etapas", {})
+                etapas[nome] = etapas.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def tem_busca_navegador(self) -> bool:
+        """Indica se o adaptador implementa a busca pelo navegador (alternativa à HTTP)."""
+        return type(self).buscar is not AdaptadorSite.buscar
+
+    async def aguardar_pronto(self, page: Page, status: Optional[Dict[str, object]] = None) -> bool:
+        """
+        Espera a condição de prontidão do site e registra o tempo gasto em
+        status["espera_segundos"] e na etapa "espera".
+
+        Returns:
+            True se a condição foi atingida dentro da espera máxima.
+        """
+        spec = self.prontidao
+        espera_maxima = spec["espera_maxima"]
+        inicio = time.perf_counter()
+        try:
+            if spec["tipo"] == "seletor":
+                await page.locator(spec["seletor"]).first.wait_for(state="visible", timeout=espera_maxima)
+            elif spec["tipo"] == "min_resultados":
+                await page.wait_for_function(
+                    "([seletor, minimo]) => document.querySelectorAll(seletor).length >= minimo",
+                    arg=[spec["seletor"], spec["minimo"]], timeout=espera_maxima)
+            else:
+                await page.wait_for_load_state("networkidle", timeout=espera_maxima)
+            pronto = True
+        except PlaywrightTimeoutError:
+            print(f"{self.nome}: página não ficou pronta em {espera_maxima} ms; extraindo o que carregou.")
+            pronto = False
+        if status is not None:
+            decorrido = time.perf_counter() - inicio
+            status["espera_segundos"] = status.get("espera_segundos", 0.0) + decorrido
+            etapas = status.setdefault("etapas", {})
+            etapas["espera"] = etapas.get("espera", 0.0) + decorrido
+            status["pronto"] = pronto
+        return pronto
+
+    async def extrair_cartoes(self, page: Page, limite: int) -> List[Dict[str, str]]:
+        """
+        Extrai os cartões de resultado da página atual com uma única chamada
+        ao navegador (page.evaluate), usando seletores_cartoes. O tratamento
+        dos campos (link absoluto, textos padrão) é comum a todos os sites.
+
+        Returns:
+            Até `limite` resultados com "titulo", "link", "resumo", "fonte" e
+            "data_publicacao".
+        """
+        cartoes = await page.evaluate(_JS_EXTRAIR_CARTOES, [self.seletores_cartoes, limite])
+        resultados: List[Dict[str, str]] = []
+        for cartao in cartoes:
+            resultado = self._montar_resultado(cartao["titulo"], cartao["link"], cartao["resumo"],
+                                               cartao["data_publicacao"])
+            if resultado is not None:
+                resultados.append(resultado)
+        return resultados
+
+    def extrair_html(self, texto: str, limite: int) -> List[Dict[str, str]]:
+        """
+        Extrai os resultados de uma página HTML (resposta de buscar_http) com
+        as expressões XPath de seletores_html.
+
+        Returns:
+            Até `limite` resultados, no mesmo formato de extrair_cartoes.
+        """
+        spec = self.seletores_html
+        resultados: List[Dict[str, str]] = []
+        for cartao in analisar_html(texto).xpath(spec["cartoes"])[:limite]:
+            resultado = self._montar_resultado(
+                texto_xpath(cartao, spec.get("titulo")), texto_xpath(cartao, spec.get("link")),
+                texto_xpath(cartao, spec.get("resumo")), texto_xpath(cartao, spec.get("data")))
+            if resultado is not None:
+                resultados.append(resultado)
+        return resultados
+
+    def _montar_resultado(self, titulo: Optional[str], link: Optional[str], resumo: Optional[str],
+                          data_publicacao: Optional[str]) -> Optional[Dict[str, str]]:
+        """Normaliza os campos de um cartão (link absoluto, textos padrão); None se não houver título."""
+        if not titulo or not titulo.strip():
+            print(f"Cartão sem título ignorado em {self.fonte}.")
+            return None
+        link = (link or "").strip()
+        if link and not link.startswith("http"):
+            link = f"{self.url_base}{link if link.startswith('/') else '/' + link}"
+        return {
+            "titulo": titulo.strip(),
+            "link": link,
+            "resumo": (resumo or "Resumo não disponível").strip(),
+            "fonte": self.fonte,
+            "data_publicacao": (data_publicacao or "Não informado").strip(),
+        }
+
+
+class AdaptadorJusBrasil(AdaptadorSite):
+    nome = "jusbrasil"
+    fonte = "JusBrasil"
+    dominios = ["jusbrasil.com.br", "jusbr.com"]
+    url_base = "https://www.jusbrasil.com.br"
+    seletores_cartoes = {
+        "cartoes": ["div.search-results_SearchCard__1wsPd", "div[data-testid='search-result-card']"],
+        "titulo": "h2 a, a h2, a[data-testid='search-result-card-title']",
+        "resumo": "div.DocumentSnippet, p[data-testid='search-result-card-snippet']",
+        "data": "span.BaseSnippetWrapper-publish-date, time",
+    }
+    prontidao = {"tipo": "min_resultados", "minimo": 1, "espera_maxima": 8000,
+                 "seletor": ", ".join(seletores_cartoes["cartoes"])}
+    requisicoes_por_segundo = 1.0
+    rajada = 3
+
+    async def buscar(self, tool, page: Page, termo_busca: str) -> List[Dict[str, str]]:
+        """Busca jurisprudência no JusBrasil."""
+        print(f"Buscando '{termo_busca}' no JusBrasil...")
+        status = tool.ultimo_status_sites.get(self.nome)
+        url = f"{self.url_base}/jurisprudencia/busca?q={termo_busca.replace(' ', '+')}"
+        with self.etapa(status, "navegacao"):
+            await page.goto(url, timeout=tool.timeout, wait_until="domcontentloaded")
+        await self.aguardar_pronto(page, status) # Carregamento dinâmico dos resultados
+
+        # Tenta fechar pop-ups de consentimento/login se aparecerem. A checagem
+        # é imediata: quando a página está pronta, o pop-up já foi exibido.
+        try:
+            popup = page.locator("button[aria-label='close'], *[data-testid='modal-close-button']").first
+            if await popup.is_visible():
+                await popup.click()
+        except Exception:
+            pass # Ignora se o pop-up não estiver presente
+
+        with self.etapa(status, "extracao"):
+            resultados = await self.extrair_cartoes(page, tool.limite_resultados)
+        print(f"Encontrados {len(resultados)} resultados no JusBrasil.")
+        return resultados
+
+
+class AdaptadorSTF(AdaptadorSite):
+    nome = "stf"
+    fonte = "STF"
+    dominios = ["stf.jus.br"]
+    url_base = "https://portal.stf.jus.br"
+
+    async def buscar(self, tool, page: Page, termo_busca: str) -> List[Dict[str, str]]:
+        """Busca jurisprudência no STF."""
+        print(f"Buscando '{termo_busca}' no STF...")
+        resultados: List[Dict[str, str]] = []
+        # URL e seletores específicos para o STF
+        # Exemplo: https://jurisprudencia.stf.jus.br/pages/search?base=acordaos&sinonimo=true&plural=true&page=1&pageSize=10&queryString={termo_busca}
+        # Esta parte precisará de implementação detalhada dos seletores corretos para o STF.
+        status = tool.ultimo_status_sites.get(self.nome)
+        with self.etapa(status, "navegacao"):
+            await page.goto(f"{self.url_base}/jurisprudencia/pesquisarJurisprudencia.asp", timeout=tool.timeout)
+            await page.fill("input[name='pesquisa']", termo_busca)
+            await page.press("input[name='pesquisa']", "Enter")
+        await self.aguardar_pronto(page, status)
+        # ... lógica de extração para STF
+        print(f"Busca no STF ainda não implementada em detalhes.")
+        return resultados
+
+
+class AdaptadorSTJ(AdaptadorSite):
+    nome = "stj"
+    fonte = "STJ"
+    dominios = ["stj.jus.br"]
+    url_base = "https://scon.stj.jus.br"
+    # O SCON devolve a lista de acórdãos renderizada no servidor
+    requer_navegador = False
+    seletores_html = {
+        "cartoes": "//div[contains(concat(' ', normalize-space(@class), ' '), ' documento ')]",
+        "titulo": ".//div[contains(@class, 'clsIdentificacao')]",
+        "link": ".//a[contains(@href, 'documento') or contains(@href, 'pesquisar.jsp')]/@href",
+        "resumo": ".//div[contains(@class, 'paragrafoBRS')][.//*[contains(., 'Ementa')]]//div[contains(@class, 'docTexto')]",
+        "data": ".//div[contains(@class, 'paragrafoBRS')][.//*[contains(., 'Data do Julgamento')]]//div[contains(@class, 'docTexto')]",
+    }
+
+    async def buscar_http(self, tool, cliente, termo_busca: str) -> List[Dict[str, str]]:
+        """Busca jurisprudência no STJ pela URL de consulta do SCON, sem navegador."""
+        print(f"Buscando '{termo_busca}' no STJ (HTTP)...")
+        status = tool.ultimo_status_sites.get(self.nome)
+        with self.etapa(status, "requisicao"):
+            resposta = await cliente.get(f"{self.url_base}/SCON/pesquisar.jsp", timeout=tool.timeout / 1000,
+                                         params={"ACAO": "PESQUISAR", "novaConsulta": "true", "i": "1",
+                                                 "b": "ACOR", "livre": termo_busca})
+            resposta.raise_for_status()
+        with self.etapa(status, "extracao"):
+            resultados = self.extrair_html(resposta.text, tool.limite_resultados)
+        print(f"Encontrados {len(resultados)} resultados no STJ.")
+        return resultados
+
+    async def buscar(self, tool, page: Page, termo_busca: str) -> List[Dict[str, str]]:
+        """Busca jurisprudência no STJ."""
+        print(f"Buscando '{termo_busca}' no STJ...")
+        resultados: List[Dict[str, str]] = []
+        # URL e seletores específicos para o STJ
+        # Exemplo: https://scon.stj.jus.br/SCON/pesquisar.jsp?NOME_USUARIO=&ACAO=PESQUISAR&novaConsulta=true&i=1&OPERADOR_E_OU=AND&tipoPesquisa=&chkOrgao=&DATA_JULGAMENTO_INI=&DATA_JULGAMENTO_FIM=&obj_TEXTO=&ementa=&hide=&p={termo_busca}
+        # Esta parte precisará de implementação detalhada dos seletores corretos para o STJ.
+        status = tool.ultimo_status_sites.get(self.nome)
+        with self.etapa(status, "navegacao"):
+            await page.goto(f"{self.url_base}/SCON/", timeout=tool.timeout)
+            await page.fill("textarea[name='pesquisaLivre']", termo_busca)
+            await page.click("input[name='imgBotao']") # Botão de pesquisa
+        await self.aguardar_pronto(page, status)
+        # ... lógica de extração para STJ
+        print(f"Busca no STJ ainda não implementada em detalhes.")
+        return resultados
+
+
+class AdaptadorTJMG(AdaptadorSite):
+    nome = "tjmg"
+    fonte = "TJMG"
+    dominios = ["tjmg.jus.br"]
+    url_base = "https://www5.tjmg.jus.br"
+
+    async def buscar(self, tool, page: Page, termo_busca: str) -> List[Dict[str, str]]:
+        """Busca jurisprudência no TJMG."""
+        print(f"Buscando '{termo_busca}' no TJMG...")
+        resultados: List[Dict[str, str]] = []
+        # URL e seletores específicos para o TJMG
+        # Exemplo: https://jurisprudencia.tjmg.jus.br/jurisprudencia/pesquisaPalavrasGerarInteiro Teor.do?numeroRegistro=1&paginaNumero=1&linhasPorPagina=10&palavras={termo_busca}
+        # Esta parte precisará de implementação detalhada dos seletores corretos para o TJMG.
+        status = tool.ultimo_status_sites.get(self.nome)
+        with self.etapa(status, "navegacao"):
+            await page.goto(f"{self.url_base}/jurisprudencia/pesquisaJurisprudenciaPrimeiraInstancia.do", timeout=tool.timeout)
+            # O TJMG pode ter um formulário mais complexo
+            await page.fill("input[name='palavras']", termo_busca)
+            await page.click("input[name='pesquisar']")
+        await self.aguardar_pronto(page, status)
+        # ... lógica de extração para TJMG
+        print(f"Busca no TJMG ainda não implementada em detalhes.")
+        return resultados
+
+
+# Adaptadores registrados neste processo, por nome do site
+_adaptadores: Dict[str, AdaptadorSite] = {}
+
+
+def registrar_adaptador(adaptador: AdaptadorSite) -> AdaptadorSite:
+    """
+    Registra (ou substitui) o adaptador de um site. Novos sites passam a ser
+    aceitos por JurisprudenciaTool pelo nome do adaptador.
+    """
+    _adaptadores[adaptador.nome] = adaptador
+    return adaptador
+
+
+def obter_adaptador(site: str) -> Optional[AdaptadorSite]:
+    """Retorna o adaptador registrado para o site, ou None se não houver."""
+    return _adaptadores.get(site)
+
+
+def estado_adaptadores() -> Dict[str, Dict[str, object]]:
+    """Estatísticas de todos os adaptadores registrados (disjuntor, latências, contadores)."""
+    return {nome: adaptador.estatisticas() for nome, adaptador in _adaptadores.items()}
+
+
+for _classe in (AdaptadorJusBrasil, AdaptadorSTF, AdaptadorSTJ, AdaptadorTJMG):
+    registrar_adaptador(_classe())
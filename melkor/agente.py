@@ -20,6 +20,31 @@ from melkor.parser_pdf import ParserPDF
 # Inicializar a Persona Melkor para fornecer o contexto e o tom aos agentes
 persona_melkor = PersonaMelkor()
 
+# Seções da denúncia (ver ParserPDF.segment_sections) entregues a cada agente.
+# Cada agente recebe apenas o trecho de que precisa, e não o documento inteiro.
+SECOES_POR_AGENTE = {
+    "analista_acusacao": ("qualificacao", "narrativa", "capitulacao"),
+    "formulador_perguntas": ("narrativa", "rol_testemunhas"),
+    "redator_teses": ("narrativa", "capitulacao", "pedidos"),
+}
+
+def contexto_para_agente(nome_agente: str, texto_denuncia: str) -> str:
+    """
+    Retorna o trecho da denúncia relevante para o agente informado.
+
+    Args:
+        nome_agente: Chave de SECOES_POR_AGENTE (ex.: "formulador_perguntas").
+        texto_denuncia: Texto completo da denúncia.
+
+    Returns:
+        Texto das seções do agente, ou a denúncia inteira se as seções não
+        forem encontradas ou o agente não tiver seções definidas.
+    """
+    secoes = SECOES_POR_AGENTE.get(nome_agente)
+    if not secoes:
+        return texto_denuncia
+    return ParserPDF(use_ocr=False).section_text(texto_denuncia, secoes)
+
 # Inicializar as ferramentas que os agentes poderão usar
 # (A ferramenta de jurisprudência é assíncrona, sua integração com CrewAI síncrono pode exigir um wrapper)
 # Por enquanto, vamos focar na estrutura dos agentes.
@@ -73,6 +98,7 @@ redator_teses = Agent(
 # Definição de Tarefas (Tasks) para os agentes
 # Exemplo de como uma tarefa poderia ser definida:
 # task_analise_denuncia = Task(
+#     # texto_denuncia = contexto_para_agente("analista_acusacao", texto_completo)
 #     description="Analisar o seguinte texto de denúncia: {texto_denuncia} e identificar todos os pontos fracos.",
 #     agent=analista_acusacao,
 #     expected_output="Um relatório detalhado listando os pontos fracos, contradições e omissões encontradas na denúncia, com justificativas baseadas na análise técnica e estratégica."
@@ -0,0 +1,200 @@
+# benchmark_jurisprudencia.py
+
+"""
+Benchmark da JurisprudenciaTool sobre respostas gravadas, sem rede.
+
+As respostas dos sites são gravadas uma vez (--gravar, com rede) e depois
+reproduzidas do disco (melkor.replay_jurisprudencia). Para cada site, as
+buscas da lista de termos são repetidas e o benchmark mede:
+- buscas por segundo;
+- latência total e de cada etapa do adaptador (navegacao, espera e extracao
+  no navegador; requisicao e extracao no caminho HTTP);
+- memória do navegador (pico do RSS somado dos processos do Chromium);
+- respostas reproduzidas e faltantes no replay.
+
+Limite de taxa e disjuntor dos adaptadores, cache e índice local são
+desligados durante a medição.
+Os resultados podem ser gravados em JSON (--saida) para comparar execuções.
+
+Uso:
+    python -m melkor.benchmark_jurisprudencia --fixtures fixtures/jurisprudencia --gravar
+    python -m melkor.benchmark_jurisprudencia --fixtures fixtures/jurisprudencia --repeticoes 5 --saida resultados.json
+"""
+
+import argparse
+import asyncio
+import copy
+import time
+import weakref
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from melkor.adaptadores_jurisprudencia import (Disjuntor, HistogramaLatencia, LimitadorTaxa,
+                                               obter_adaptador, registrar_adaptador)
+from melkor.benchmark_parser_pdf import salvar_resultados
+from melkor.jurisprudencia_tool import SITES_SUPORTADOS, JurisprudenciaTool
+from melkor.pool_navegador import PoolNavegador
+from melkor.replay_jurisprudencia import ReplayJurisprudencia
+
+TERMOS_PADRAO = [
+    "homicídio qualificado nulidade",
+    "pronúncia excesso de linguagem",
+    "tráfico de drogas dosimetria",
+]
+
+
+def _rss_navegador_mb() -> Optional[float]:
+    """RSS somado dos processos filhos (driver do Playwright e Chromium), em MB."""
+    if psutil is None:
+        return None
+    total = 0
+    for processo in psutil.Process().children(recursive=True):
+        try:
+            total += processo.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+def _resumo(valores: List[float]) -> Optional[Dict[str, float]]:
+    """Média, mediana, p95 e máximo de uma lista de tempos em segundos."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return {
+        'media': sum(ordenados) / len(ordenados),
+        'p50': ordenados[len(ordenados) // 2],
+        'p95': ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))],
+        'maximo': ordenados[-1],
+    }
+
+
+def _liberar_adaptador(site: str, concorrencia: int) -> None:
+    """Registra uma cópia do adaptador do site sem limite de taxa nem disjuntor."""
+    adaptador = copy.copy(obter_adaptador(site))
+    adaptador.limitador = LimitadorTaxa(None)
+    adaptador.disjuntor = Disjuntor(falhas_para_abrir=10 ** 9)
+    adaptador.latencias = HistogramaLatencia()
+    adaptador.max_concorrencia = concorrencia
+    adaptador._semaforos = weakref.WeakKeyDictionary()
+    registrar_adaptador(adaptador)
+
+
+async def medir_site(site: str, termos: Sequence[str], repeticoes: int, replay: ReplayJurisprudencia,
+                     pool: PoolNavegador, concorrencia: int = 1, usar_http: bool = True) -> Dict[str, object]:
+    """
+    Executa as buscas de um site e agrega as medições.
+
+    Args:
+        site: Nome do site (adaptador registrado).
+        termos: Termos pesquisados; cada repetição percorre a lista inteira.
+        repeticoes: Número de passadas pela lista de termos.
+        replay: Replay que grava ou reproduz as respostas.
+        pool: Pool do navegador, compartilhado entre os sites.
+        concorrencia: Buscas simultâneas no site.
+        usar_http: Repassado à ferramenta (caminho HTTP dos adaptadores).
+
+    Returns:
+        Medição do site: buscas por segundo, latências por etapa, memória do
+        navegador, vias usadas e contadores do replay.
+    """
+    _liberar_adaptador(site, concorrencia)
+    antes = replay.estatisticas()
+
+    async def buscar(termo: str) -> Dict[str, object]:
+        tool = JurisprudenciaTool(pool=pool, usar_cache=False, usar_indice=False, usar_http=usar_http,
+                                  replay=replay)
+        resultados = await tool.buscar_jurisprudencia(termo, [site])
+        return {**tool.ultimo_status_sites[site], 'resultados': len(resultados)}
+
+    # A primeira busca abre o navegador (ou as conexões) e é medida à parte
+    inicio = time.perf_counter()
+    await buscar(termos[0])
+    primeira = time.perf_counter() - inicio
+
+    fila = [termo for _ in range(repeticoes) for termo in termos]
+    medicoes: List[Dict[str, object]] = []
+    rss_pico = _rss_navegador_mb()
+    inicio = time.perf_counter()
+    for lote in range(0, len(fila), concorrencia):
+        medicoes += await asyncio.gather(*(buscar(termo) for termo in fila[lote:lote + concorrencia]))
+        rss = _rss_navegador_mb()
+        if rss is not None:
+            rss_pico = max(rss_pico or 0.0, rss)
+    decorrido = time.perf_counter() - inicio
+
+    etapas: Dict[str, List[float]] = {}
+    vias: Dict[str, int] = {}
+    for medicao in medicoes:
+        for etapa, segundos in medicao.get('etapas', {}).items():
+            etapas.setdefault(etapa, []).append(segundos)
+        via = medicao.get('via', 'nenhuma')
+        vias[via] = vias.get(via, 0) + 1
+    depois = replay.estatisticas()
+    return {
+        'site': site,
+        'buscas': len(medicoes),
+        'erros': sum(1 for medicao in medicoes if medicao['status'] != 'ok'),
+        'buscas_por_segundo': len(medicoes) / decorrido if decorrido else None,
+        'primeira_busca_s': primeira,
+        'latencia_s': _resumo([medicao['segundos'] for medicao in medicoes]),
+        'etapas_s': {etapa: _resumo(valores) for etapa, valores in etapas.items()},
+        'resultados_por_busca': sum(medicao['resultados'] for medicao in medicoes) / len(medicoes) if medicoes else 0,
+        'vias': vias,
+        'rss_navegador_pico_mb': rss_pico,
+        'replay': {chave: depois[chave] - antes[chave] for chave in depois},
+    }
+
+
+async def executar(diretorio: str, sites: Sequence[str] = SITES_SUPORTADOS,
+                   termos: Sequence[str] = TERMOS_PADRAO, repeticoes: int = 3, concorrencia: int = 1,
+                   gravar: bool = False, usar_http: bool = True) -> List[Dict[str, object]]:
+    """
+    Executa o benchmark em todos os sites e imprime o resumo.
+
+    Args:
+        diretorio: Diretório das respostas gravadas.
+        gravar: Se True, faz as buscas reais (uma passada) e grava as respostas.
+
+    Returns:
+        Lista com a medição de cada site (ver medir_site).
+    """
+    replay = ReplayJurisprudencia(diretorio, modo="gravar" if gravar else "reproduzir")
+    pool = PoolNavegador(tamanho=max(4, concorrencia))
+    resultados = []
+    try:
+        for site in sites:
+            medicao = await medir_site(site, termos, 1 if gravar else repeticoes, replay, pool,
+                                       concorrencia, usar_http)
+            resultados.append(medicao)
+            etapas = "  ".join(f"{etapa}: {resumo['media']:.3f}s" for etapa, resumo in medicao['etapas_s'].items())
+            rss = medicao['rss_navegador_pico_mb']
+            print(f"{site:<10} {medicao['buscas_por_segundo'] or 0:7.2f} buscas/s  "
+                  f"p50: {(medicao['latencia_s'] or {}).get('p50', 0):.3f}s  {etapas}  "
+                  f"navegador: {f'{rss:.0f} MB' if rss is not None else 'n/d'}  "
+                  f"faltas no replay: {medicao['replay']['faltas']}")
+    finally:
+        await pool.fechar()
+    return resultados
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Benchmark da JurisprudenciaTool sobre respostas gravadas")
+    argumentos.add_argument('--fixtures', required=True, help="Diretório das respostas gravadas")
+    argumentos.add_argument('--gravar', action='store_true', help="Faz as buscas reais e grava as respostas")
+    argumentos.add_argument('--sites', nargs='+', default=list(SITES_SUPORTADOS))
+    argumentos.add_argument('--termos', nargs='+', default=TERMOS_PADRAO)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    argumentos.add_argument('--concorrencia', type=int, default=1)
+    argumentos.add_argument('--sem-http', action='store_true', help="Usa o navegador em todos os sites")
+    argumentos.add_argument('--saida', help="Arquivo JSON para gravar os resultados")
+    opcoes = argumentos.parse_args()
+
+    resultados = asyncio.run(executar(opcoes.fixtures, opcoes.sites, opcoes.termos, opcoes.repeticoes,
+                                      max(1, opcoes.concorrencia), opcoes.gravar, not opcoes.sem_http))
+    if opcoes.saida:
+        salvar_resultados(opcoes.saida, {'sites': resultados, 'modo': 'gravar' if opcoes.gravar else 'reproduzir'})
@@ -0,0 +1,314 @@
+# benchmark_parser_pdf.py
+
+"""
+Benchmark do ParserPDF.
+
+1. Etapas de texto (_clean_text e extract_structured_info): compara a
+   implementação atual, de varredura única, com a implementação anterior
+   (várias passadas de re.sub/re.finditer), usando textos sintéticos de 1 MB
+   ou mais e um texto hostil de OCR sem pontuação.
+2. Corpus sintético de PDFs (melkor.corpus_denuncias_pdf): documentos só com
+   texto, só com imagem e mistos, de 1 a 500 páginas. Mede páginas por
+   segundo, pico de memória (RSS) e o tempo de cada etapa
+   (_extract_text_direct, _extract_text_ocr, _clean_text,
+   extract_structured_info).
+
+Os resultados podem ser gravados em JSON (--saida) para comparar execuções.
+
+Uso:
+    python -m melkor.benchmark_parser_pdf --tamanho-mb 2
+    python -m melkor.benchmark_parser_pdf --paginas 1 10 100 500 --saida resultados.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from melkor.corpus_denuncias_pdf import TIPOS_DOCUMENTO, gerar_pdf
+from melkor.parser_pdf import ParserPDF
+
+# Trecho de denúncia usado como molde dos textos sintéticos
+TEXTO_MODELO = """
+MINISTÉRIO PÚBLICO DO ESTADO DE MINAS GERAIS
+PROMOTORIA DE JUSTIÇA DA COMARCA DE BELO HORIZONTE
+
+O MINISTÉRIO PÚBLICO DO ESTADO DE MINAS GERAIS, por seu Promotor de Justiça, vem oferecer DENÚNCIA em face de:
+
+JOÃO DA SILVA, brasileiro, solteiro, nascido em 15/03/1985, residente na Rua das Flores, nº 123, Belo Horizonte/MG.
+
+No dia 10 de janeiro de 2023, na Avenida Afonso Pena, nº 1500, o denunciado subtraiu para si, mediante grave ameaça, o veículo pertencente à vítima MARIA OLIVEIRA.
+
+O crime foi presenciado pelas testemunhas PEDRO SANTOS e ANA PEREIRA, que acionaram a Polícia Militar.
+
+Diante do exposto, o denunciado JOÃO DA SILVA está incurso nas penas do artigo 157, §2º, inciso I, do Código Penal.
+
+Página 1 de 1
+"""
+
+
+def gerar_texto(tamanho_bytes: int) -> str:
+    """Repete o texto modelo até atingir o tamanho pedido (em bytes UTF-8)."""
+    bloco = TEXTO_MODELO
+    repeticoes = max(1, tamanho_bytes // len(bloco.encode('utf-8')) + 1)
+    return bloco * repeticoes
+
+
+def gerar_texto_hostil(tamanho_bytes: int) -> str:
+    """
+    Texto típico de OCR ruim: muitas palavras-gatilho e nenhuma pontuação.
+    As expressões antigas retrocedem sobre o texto inteiro a cada gatilho.
+    """
+    bloco = "ocorrido denunciado vítima texto sujo bloco "
+    return bloco * max(1, tamanho_bytes // len(bloco))
+
+
+def _legacy_clean_text(text: str) -> str:
+    """Implementação anterior de ParserPDF._clean_text (referência)."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    headers_footers = [
+        r'MINISTÉRIO PÚBLICO DO ESTADO DE.*\n',
+        r'PROMOTORIA DE JUSTIÇA.*\n',
+        r'Página \d+ de \d+',
+        r'Documento assinado digitalmente.*',
+        r'www\..*\.jus\.br',
+    ]
+    for pattern in headers_footers:
+        text = re.sub(pattern, '', text)
+    text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def _legacy_extract_structured_info(text: str) -> Dict[str, Union[str, List[str]]]:
+    """Implementação anterior de ParserPDF.extract_structured_info (referência)."""
+    info = {'reus': [], 'vitimas': [], 'crimes': [], 'data_fato': '', 'local_fato': '', 'testemunhas': []}
+    listas = {
+        'reus': [r'denunciado[s]?:?\s*([^,;\n\.]+)', r'acusado[s]?:?\s*([^,;\n\.]+)',
+                 r'réu[s]?:?\s*([^,;\n\.]+)'],
+        'vitimas': [r'vítima[s]?:?\s*([^,;\n\.]+)', r'ofendido[s]?:?\s*([^,;\n\.]+)'],
+        'crimes': [r'crime[s]? (?:de|do|da)?\s*([^,;\n\.]+)', r'delito[s]? (?:de|do|da)?\s*([^,;\n\.]+)',
+                   r'(?:art|artigo)[\.:]?\s*(\d+)[^\d]+(?:do|da)\s*(?:CP|Código Penal)'],
+        'testemunhas': [r'testemunha[s]?:?\s*([^,;\n\.]+)', r'(?:ouvir|ouvido|depoimento de)\s*([^,;\n\.]+)'],
+    }
+    for campo, patterns in listas.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                if match.group(1).strip() and match.group(1).strip() not in info[campo]:
+                    info[campo].append(match.group(1).strip())
+    meses = r'(?:janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)'
+    for pattern in [r'(?:em|no dia|na data de|datado de)\s*(\d{1,2}\/\d{1,2}\/\d{2,4})',
+                    r'(?:em|no dia|na data de|datado de)\s*(\d{1,2}\s+de\s+' + meses + r'\s+de\s+\d{2,4})']:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['data_fato'] = match.group(1).strip()
+            break
+    for pattern in [r'(?:ocorrido|ocorrida|ocorreram|aconteceu|sucedeu|deu-se)[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})',
+                    r'(?:local|lugar|endereço)[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})']:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['local_fato'] = match.group(1).strip()
+            break
+    return info
+
+
+def _medir(funcao: Callable[[str], object], texto: str, repeticoes: int) -> float:
+    """Retorna o menor tempo (em segundos) entre as repetições."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def executar(tamanho_mb: float = 1.0, tamanho_hostil_kb: int = 64, repeticoes: int = 3) -> List[Dict[str, object]]:
+    """
+    Executa o benchmark e imprime a comparação.
+
+    Args:
+        tamanho_mb: Tamanho do texto sintético de denúncia.
+        tamanho_hostil_kb: Tamanho do texto hostil. As expressões antigas são
+                           quadráticas nele, por isso o padrão é menor.
+        repeticoes: Número de execuções de cada medição (vale a melhor).
+
+    Returns:
+        Lista de medições com etapa, texto, tempos e aceleração.
+    """
+    parser = ParserPDF(use_ocr=False)
+    textos = {
+        f'denuncia_{tamanho_mb:g}mb': gerar_texto(int(tamanho_mb * 1024 * 1024)),
+        f'hostil_{tamanho_hostil_kb}kb': gerar_texto_hostil(tamanho_hostil_kb * 1024),
+    }
+    etapas = {
+        '_clean_text': (_legacy_clean_text, parser._clean_text),
+        'extract_structured_info': (_legacy_extract_structured_info, parser.extract_structured_info),
+    }
+    resultados = []
+    for nome_texto, texto in textos.items():
+        for etapa, (antiga, atual) in etapas.items():
+            tempo_antigo = _medir(antiga, texto, repeticoes)
+            tempo_atual = _medir(atual, texto, repeticoes)
+            resultados.append({
+                'etapa': etapa,
+                'texto': nome_texto,
+                'bytes': len(texto.encode('utf-8')),
+                'anterior_s': tempo_antigo,
+                'atual_s': tempo_atual,
+                'aceleracao': tempo_antigo / tempo_atual if tempo_atual else float('inf'),
+            })
+            print(f"{etapa:<25} {nome_texto:<16} anterior: {tempo_antigo:8.4f}s  "
+                  f"atual: {tempo_atual:8.4f}s  ({resultados[-1]['aceleracao']:.1f}x)")
+    return resultados
+
+
+def _zerar_pico_rss() -> None:
+    """Zera o pico de RSS do processo (Linux), para medir cada etapa isoladamente."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+    except OSError:
+        pass
+
+
+def _pico_rss_kb() -> Optional[int]:
+    """
+    Pico de RSS do processo em KB: VmHWM (zerado por _zerar_pico_rss) quando
+    disponível, senão o máximo da vida do processo informado por getrusage.
+    """
+    try:
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _pico_rss_filhos_kb() -> Optional[int]:
+    """Maior RSS entre os processos filhos já encerrados (pool de OCR, tesseract, pdftoppm)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+
+def _medir_etapa(funcao: Callable, *args) -> Tuple[object, Dict[str, object]]:
+    """Executa uma etapa uma vez e retorna (resultado, {'segundos', 'pico_rss_kb'})."""
+    _zerar_pico_rss()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, {'segundos': time.perf_counter() - inicio, 'pico_rss_kb': _pico_rss_kb()}
+
+
+def executar_corpus(paginas: Sequence[int] = (1, 10, 100, 500),
+                    tipos: Sequence[str] = TIPOS_DOCUMENTO,
+                    max_paginas_ocr: int = 20, ocr_workers: int = 1) -> List[Dict[str, object]]:
+    """
+    Executa o benchmark de extração sobre o corpus sintético de PDFs.
+
+    Args:
+        paginas: Tamanhos dos documentos gerados (em páginas).
+        tipos: Tipos de documento ('texto', 'imagem', 'misto').
+        max_paginas_ocr: Documentos maiores que isso não passam pela etapa de
+                         OCR, que leva segundos por página.
+        ocr_workers: Processos de OCR do parser.
+
+    Returns:
+        Lista com uma medição por documento: tipo, páginas, tamanho do PDF e,
+        para cada etapa, segundos, pico de RSS e páginas por segundo.
+    """
+    parser = ParserPDF(use_ocr=True, ocr_workers=ocr_workers)
+    resultados = []
+    for tipo in tipos:
+        for total_paginas in paginas:
+            dados = gerar_pdf(total_paginas, tipo)
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as arquivo:
+                arquivo.write(dados)
+            etapas: Dict[str, Dict[str, object]] = {}
+            try:
+                texto, etapas['_extract_text_direct'] = _medir_etapa(parser._extract_text_direct, arquivo.name)
+                if parser.ocr_available and total_paginas <= max_paginas_ocr:
+                    texto_ocr, etapas['_extract_text_ocr'] = _medir_etapa(parser._extract_text_ocr, arquivo.name)
+                    texto = texto_ocr if texto_ocr.strip() else texto
+            finally:
+                os.remove(arquivo.name)
+            for etapa in ('_extract_text_direct', '_extract_text_ocr'):
+                if etapa in etapas:
+                    segundos = etapas[etapa]['segundos']
+                    etapas[etapa]['paginas_por_segundo'] = total_paginas / segundos if segundos else None
+            texto, etapas['_clean_text'] = _medir_etapa(parser._clean_text, texto)
+            _, etapas['extract_structured_info'] = _medir_etapa(parser.extract_structured_info, texto)
+
+            resultados.append({
+                'tipo': tipo,
+                'paginas': total_paginas,
+                'bytes_pdf': len(dados),
+                'etapas': etapas,
+                'pico_rss_filhos_kb': _pico_rss_filhos_kb(),
+            })
+            resumo = "  ".join(f"{etapa}: {medida['segundos']:.3f}s" for etapa, medida in etapas.items())
+            print(f"{tipo:<7} {total_paginas:>4} páginas  {resumo}")
+    return resultados
+
+
+def _commit_atual() -> Optional[str]:
+    """Commit do repositório em que o benchmark foi executado, se disponível."""
+    try:
+        resultado = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return resultado.stdout.strip()
+
+
+def salvar_resultados(caminho: str, resultados: Dict[str, object]) -> None:
+    """Grava os resultados em JSON, com a data, o ambiente e o commit da execução."""
+    documento = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'commit': _commit_atual(),
+        **resultados,
+    }
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(documento, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {caminho}")
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Benchmark do ParserPDF")
+    argumentos.add_argument('--tamanho-mb', type=float, default=1.0)
+    argumentos.add_argument('--tamanho-hostil-kb', type=int, default=64)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    argumentos.add_argument('--paginas', type=int, nargs='+', default=[1, 10, 100, 500])
+    argumentos.add_argument('--tipos', nargs='+', choices=TIPOS_DOCUMENTO, default=list(TIPOS_DOCUMENTO))
+    argumentos.add_argument('--max-paginas-ocr', type=int, default=20)
+    argumentos.add_argument('--ocr-workers', type=int, default=1)
+    argumentos.add_argument('--sem-corpus', action='store_true', help="Mede apenas as etapas de texto")
+    argumentos.add_argument('--saida', help="Arquivo JSON para gravar os resultados")
+    opcoes = argumentos.parse_args()
+
+    resultados: Dict[str, object] = {
+        'etapas_texto': executar(opcoes.tamanho_mb, opcoes.tamanho_hostil_kb, opcoes.repeticoes),
+    }
+    if not opcoes.sem_corpus:
+        resultados['corpus'] = executar_corpus(opcoes.paginas, opcoes.tipos,
+                                               opcoes.max_paginas_ocr, opcoes.ocr_workers)
+    if opcoes.saida:
+        salvar_resultados(opcoes.saida, resultados)
@@ -0,0 +1,366 @@
+# cache_jurisprudencia.py
+
+"""
+Cache dos resultados de jurisprudência por site e termo de busca.
+Os advogados repetem as mesmas pesquisas ("homicídio qualificado nulidade")
+e cada busca refazia a raspagem de todos os sites. A chave usa a forma
+canônica do termo (normalizador_consulta), de modo que variações de acento,
+caixa e ordem das palavras caem na mesma entrada. Uma entrada é servida
+direto enquanto estiver fresca (ttl); depois disso, e até o fim da janela de
+obsolescência, ainda é servida na hora, mas a ferramenta dispara uma nova
+busca em segundo plano para atualizá-la (stale-while-revalidate). Listas
+vazias valem só por ttl_vazio, sem janela de obsolescência: costumam indicar
+um site fora do ar ou um raspador desatualizado, não a falta de julgados.
+
+Buscas idênticas simultâneas (mesmo site e mesma forma canônica do termo)
+são coalescidas (coalescer): enquanto uma raspagem está em andamento, as
+chamadas seguintes no mesmo processo aguardam o resultado dela. Com o cache
+do Django, uma trava gravada no próprio cache estende isso aos outros
+workers, que aguardam a entrada ser gravada em vez de raspar de novo.
+
+Com CACHES configurado nas settings do Django (settings_production usa o
+memcached), as entradas ficam no cache do Django e são compartilhadas entre
+os workers; caso contrário, ficam em um LRU no próprio processo, limitado a
+max_entradas.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from melkor.normalizador_consulta import canonizar_consulta
+
+# Tempo (em segundos) em que uma entrada é servida sem atualização
+TTL_PADRAO = 6 * 3600
+# Tempo adicional (em segundos) em que uma entrada vencida ainda é servida
+# enquanto é atualizada em segundo plano
+JANELA_OBSOLETA_PADRAO = 24 * 3600
+# Validade (em segundos) de uma entrada sem resultados
+TTL_VAZIO_PADRAO = 10 * 60
+# Número máximo de entradas do LRU em processo
+MAX_ENTRADAS_PADRAO = 1000
+# Prefixo das chaves no cache do Django
+PREFIXO_CHAVE = "melkor:juris"
+# Validade (em segundos) da trava entre workers: libera a chave se o worker
+# que a obteve morrer no meio da raspagem
+VALIDADE_TRAVA_PADRAO = 90
+# Tempo máximo (em segundos) que um worker aguarda a raspagem de outro antes
+# de raspar por conta própria, e intervalo entre as consultas ao cache
+ESPERA_TRAVA_PADRAO = 60
+INTERVALO_TRAVA = 0.5
+
+
+class _CacheLRU:
+    """Dicionário em memória com expiração por entrada e remoção do menos usado."""
+
+    def __init__(self, max_entradas: int):
+        self.max_entradas = max(1, max_entradas)
+        self.evictions = 0
+        self._entradas: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: str) -> Optional[object]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            expira_em, valor = entrada
+            if expira_em <= time.time():
+                del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+            return valor
+
+    def set(self, chave: str, valor: object, timeout: float) -> None:
+        with self._lock:
+            self._entradas[chave] = (time.time() + timeout, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+def _cache_django():
+    """Retorna o cache padrão do Django se CACHES foi configurado nas settings, ou None."""
+    try:
+        from django.conf import settings
+        if not settings.configured or not settings.is_overridden('CACHES'):
+            return None
+        from django.core.cache import caches
+        return caches['default']
+    except Exception:
+        return None
+
+
+# Resultado de uma raspagem coalescida: (resultados, status do site)
+ResultadoRaspagem = Tuple[List[Dict[str, str]], Dict[str, object]]
+
+
+class CacheJurisprudencia:
+    def __init__(self, ttl: float = TTL_PADRAO, janela_obsoleta: float = JANELA_OBSOLETA_PADRAO,
+                 max_entradas: int = MAX_ENTRADAS_PADRAO, usar_django: bool = True,
+                 validade_trava: float = VALIDADE_TRAVA_PADRAO, espera_trava: float = ESPERA_TRAVA_PADRAO,
+                 ttl_vazio: float = TTL_VAZIO_PADRAO):
+        """
+        Inicializa o cache.
+
+        Args:
+            ttl: Segundos em que uma entrada é considerada fresca.
+            janela_obsoleta: Segundos, após o ttl, em que a entrada ainda é
+                             servida enquanto é atualizada em segundo plano.
+                             0 desativa o stale-while-revalidate.
+            max_entradas: Limite de entradas do LRU em processo. No cache do
+                          Django o limite é o do próprio backend (memória do
+                          memcached, MAX_ENTRIES do locmem).
+            usar_django: Se True, usa o cache do Django quando CACHES estiver
+                         configurado; se False, sempre o LRU em processo.
+            validade_trava: Segundos até a trava entre workers expirar sozinha.
+            espera_trava: Segundos que um worker aguarda a raspagem de outro
+                          antes de raspar por conta própria.
+            ttl_vazio: Segundos em que uma entrada sem resultados é servida;
+                       depois disso ela expira e o site é raspado de novo.
+        """
+        self.ttl = ttl
+        self.janela_obsoleta = janela_obsoleta
+        self.usar_django = usar_django
+        self.validade_trava = validade_trava
+        self.espera_trava = espera_trava
+        self.ttl_vazio = ttl_vazio
+        self._lru = _CacheLRU(max_entradas)
+        self._django = None
+        self._backend_resolvido = False
+        # Chaves com atualização em segundo plano em andamento neste processo
+        self._atualizando: Set[str] = set()
+        # Raspagens em andamento por chave, um dicionário por loop de eventos
+        # (os futures pertencem ao loop que os criou)
+        self._em_andamento: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.hits_obsoletos = 0
+        self.misses = 0
+        self.atualizacoes = 0
+        # Acertos cuja entrada foi gravada com outra grafia do termo, que uma
+        # chave pelo termo literal teria perdido
+        self.hits_por_normalizacao = 0
+        # Raspagens evitadas por coalescência: chamadas que aguardaram outra
+        # busca do mesmo processo e as que aguardaram outro worker
+        self.coalescidas_locais = 0
+        self.coalescidas_workers = 0
+
+    def _backend(self):
+        # Resolvido no primeiro uso: a ferramenta pode ser importada antes das settings
+        if not self._backend_resolvido:
+            self._django = _cache_django() if self.usar_django else None
+            self._backend_resolvido = True
+        return self._django
+
+    def chave(self, site: str, termo: str) -> str:
+        """
+        Monta a chave de uma entrada a partir do site e da forma canônica do
+        termo. O termo entra como hash, o que respeita os limites de chave do
+        memcached.
+        """
+        digest = hashlib.sha256(canonizar_consulta(termo).encode('utf-8')).hexdigest()[:32]
+        return f"{PREFIXO_CHAVE}:{site}:{digest}"
+
+    async def obter(self, site: str, termo: str) -> Optional[Tuple[List[Dict[str, str]], bool]]:
+        """
+        Procura os resultados de um site para o termo.
+
+        Returns:
+            Tupla (resultados, fresco), em que fresco é False quando a entrada
+            passou do ttl e deve ser atualizada; ou None se não houver entrada.
+        """
+        entrada = await self._ler(self.chave(site, termo))
+        if entrada is None:
+            self.misses += 1
+            return None
+        fresco = time.time() - entrada["salvo_em"] < self.ttl
+        if fresco:
+            self.hits += 1
+        else:
+            self.hits_obsoletos += 1
+        if entrada.get("termo", "").strip() != termo.strip():
+            self.hits_por_normalizacao += 1
+        return [dict(resultado) for resultado in entrada["resultados"]], fresco
+
+    async def _ler(self, chave: str) -> Optional[Dict[str, object]]:
+        """Lê a entrada bruta da chave no backend, sem mexer nos contadores."""
+        django_cache = self._backend()
+        if django_cache is None:
+            return self._lru.get(chave)
+        try:
+            return await django_cache.aget(chave)
+        except Exception as e:
+            print(f"Erro ao ler o cache de jurisprudência: {e}")
+            return None
+
+    async def salvar(self, site: str, termo: str, resultados: List[Dict[str, str]]) -> None:
+        """
+        Grava os resultados de um site para o termo, válidos por
+        ttl + janela_obsoleta, ou por ttl_vazio se não houver resultados.
+        """
+        chave = self.chave(site, termo)
+        entrada = {"resultados": [dict(resultado) for resultado in resultados],
+                   "termo": termo, "salvo_em": time.time()}
+        validade = self.ttl + self.janela_obsoleta if resultados else self.ttl_vazio
+        django_cache = self._backend()
+        if django_cache is not None:
+            try:
+                await django_cache.aset(chave, entrada, timeout=validade)
+            except Exception as e:
+                print(f"Erro ao gravar no cache de jurisprudência: {e}")
+        else:
+            self._lru.set(chave, entrada, validade)
+
+    def iniciar_atualizacao(self, site: str, termo: str) -> bool:
+        """
+        Marca a entrada como em atualização. Retorna False se outra atualização
+        da mesma entrada já estiver em andamento neste processo.
+        """
+        chave = self.chave(site, termo)
+        if chave in self._atualizando:
+            return False
+        self._atualizando.add(chave)
+        self.atualizacoes += 1
+        return True
+
+    def concluir_atualizacao(self, site: str, termo: str) -> None:
+        """Desmarca a entrada ao fim da atualização em segundo plano."""
+        self._atualizando.discard(self.chave(site, termo))
+
+    async def coalescer(self, site: str, termo: str,
+                        raspar: Callable[[], Awaitable[ResultadoRaspagem]]) -> Tuple[ResultadoRaspagem, str]:
+        """
+        Executa a raspagem de um site para o termo, ou aguarda uma idêntica já
+        em andamento.
+
+        A primeira chamada para a chave (líder) executa raspar; as seguintes no
+        mesmo processo aguardam o resultado dela. Com o cache do Django, o
+        líder também precisa obter a trava da chave no cache: se outro worker
+        a tiver, a chamada aguarda a entrada que ele vai gravar (até
+        espera_trava segundos) e só raspa se ela não aparecer.
+
+        raspar deve gravar o resultado no cache (salvar) antes de retornar, para
+        que os outros workers o encontrem quando a trava for liberada.
+
+        Args:
+            site: Nome do site.
+            termo: Termo de busca (a chave usa a forma canônica).
+            raspar: Corrotina sem argumentos que faz a busca e retorna
+                    (resultados, status do site).
+
+        Returns:
+            Tupla ((resultados, status), origem), em que origem é "raspagem"
+            (esta chamada raspou), "local" (aguardou outra busca do processo)
+            ou "worker" (aguardou outro worker).
+        """
+        chave = self.chave(site, termo)
+        em_andamento = self._em_andamento.setdefault(asyncio.get_running_loop(), {})
+        while chave in em_andamento:
+            futuro = em_andamento[chave]
+            try:
+                # shield: o cancelamento de quem aguarda não cancela o líder
+                resultado = await asyncio.shield(futuro)
+            except asyncio.CancelledError:
+                if not futuro.cancelled():
+                    raise
+                # O líder foi cancelado; a próxima volta escolhe um novo líder
+                continue
+            self.coalescidas_locais += 1
+            return resultado, "local"
+
+        futuro = asyncio.get_running_loop().create_future()
+        em_andamento[chave] = futuro
+        try:
+            resultado, origem = await self._raspar_com_trava(chave, raspar)
+        except BaseException:
+            futuro.cancel()
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado, origem
+        finally:
+            if em_andamento.get(chave) is futuro:
+                del em_andamento[chave]
+
+    async def _raspar_com_trava(self, chave: str,
+                                raspar: Callable[[], Awaitable[ResultadoRaspagem]]) -> Tuple[ResultadoRaspagem, str]:
+        """Raspa sob a trava da chave no cache do Django, ou aguarda o worker que a tem."""
+        django_cache = self._backend()
+        if django_cache is None:
+            return await raspar(), "raspagem"
+
+        trava = f"{chave}:trava"
+        try:
+            obtida = await django_cache.aadd(trava, 1, timeout=self.validade_trava)
+        except Exception as e:
+            print(f"Erro ao obter a trava do cache de jurisprudência: {e}")
+            obtida = True
+        if obtida:
+            try:
+                return await raspar(), "raspagem"
+            finally:
+                try:
+                    await django_cache.adelete(trava)
+                except Exception as e:
+                    print(f"Erro ao liberar a trava do cache de jurisprudência: {e}")
+
+        limite = time.monotonic() + self.espera_trava
+        while time.monotonic() < limite:
+            await asyncio.sleep(INTERVALO_TRAVA)
+            entrada = await self._ler(chave)
+            if entrada is not None:
+                self.coalescidas_workers += 1
+                resultados = [dict(resultado) for resultado in entrada["resultados"]]
+                return (resultados, {"status": "ok", "resultados": len(resultados)}), "worker"
+            try:
+                if await django_cache.aget(trava) is None:
+                    # Trava liberada sem entrada: o outro worker não obteve resultado
+                    break
+            except Exception:
+                break
+        return await raspar(), "raspagem"
+
+    def estatisticas(self) -> Dict[str, object]:
+        """
+        Retorna os contadores de acertos (frescos e obsoletos), faltas,
+        atualizações, remoções e raspagens evitadas por coalescência, e a taxa
+        de acerto com e sem a forma canônica do termo (a segunda desconta os
+        hits_por_normalizacao).
+        """
+        consultas = self.hits + self.hits_obsoletos + self.misses
+        acertos = self.hits + self.hits_obsoletos
+        return {
+            "backend": "django" if self._backend() is not None else "lru",
+            "hits": self.hits,
+            "hits_obsoletos": self.hits_obsoletos,
+            "hits_por_normalizacao": self.hits_por_normalizacao,
+            "misses": self.misses,
+            "taxa_acerto": acertos / consultas if consultas else 0.0,
+            "taxa_acerto_sem_normalizacao": (acertos - self.hits_por_normalizacao) / consultas if consultas else 0.0,
+            "atualizacoes": self.atualizacoes,
+            "coalescidas_locais": self.coalescidas_locais,
+            "coalescidas_workers": self.coalescidas_workers,
+            "raspagens_evitadas": self.coalescidas_locais + self.coalescidas_workers,
+            "evictions": self._lru.evictions,
+            "entradas_lru": len(self._lru),
+        }
+
+
+_cache_padrao: Optional[CacheJurisprudencia] = None
+
+
+def obter_cache_jurisprudencia() -> CacheJurisprudencia:
+    """Retorna o cache compartilhado do processo, criando-o com as opções padrão."""
+    global _cache_padrao
+    if _cache_padrao is None:
+        _cache_padrao = CacheJurisprudencia()
+    return _cache_padrao
@@ -0,0 +1,160 @@
+# cache_pdf.py
+
+"""
+Cache endereçado por conteúdo para o texto extraído de PDFs.
+A chave é o SHA-256 dos bytes do PDF combinado com as opções do parser
+(OCR ligado/desligado, idioma, versão da limpeza), de modo que o mesmo
+arquivo reenviado por outro usuário ou em outra sessão não passa de novo
+pelo PyPDF2 nem pelo OCR.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+# Tamanho dos blocos lidos ao calcular o hash de um arquivo
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Gravações entre duas varreduras completas do diretório. Outros processos
+# gravam no mesmo diretório, então o total acompanhado por este processo é
+# uma estimativa, corrigida periodicamente
+_GRAVACOES_POR_VARREDURA = 100
+# Ao passar de max_bytes, a remoção desce até esta fração dele, para que
+# o cache cheio não exija uma varredura a cada gravação
+_FRACAO_APOS_REMOCAO = 0.9
+
+
+def sha256_arquivo(caminho: str) -> str:
+    """Calcula o SHA-256 de um arquivo lendo-o em blocos."""
+    digest = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+class CachePDF:
+    def __init__(self, diretorio: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Inicializa o cache em disco.
+
+        Args:
+            diretorio: Diretório onde as entradas (arquivos JSON) são gravadas.
+                       Padrão: variável de ambiente MELKOR_PDF_CACHE_DIR ou um
+                       subdiretório do diretório temporário do sistema.
+            max_bytes: Tamanho máximo ocupado pelo cache. Ao ultrapassá-lo, as
+                       entradas usadas há mais tempo são removidas.
+        """
+        self.diretorio = diretorio or os.environ.get(
+            'MELKOR_PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'melkor_cache_pdf'))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Tamanho total das entradas, conhecido após a primeira varredura e
+        # atualizado a cada gravação; a varredura só é refeita quando ele
+        # passa de max_bytes ou a cada _GRAVACOES_POR_VARREDURA gravações
+        self._total_bytes: Optional[int] = None
+        self._gravacoes = 0
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def chave(self, sha256: str, opcoes: Dict[str, object]) -> str:
+        """
+        Monta a chave de uma entrada a partir do hash do PDF e das opções do parser.
+
+        Args:
+            sha256: Hash SHA-256 dos bytes do PDF.
+            opcoes: Opções que alteram o resultado da extração.
+
+        Returns:
+            Chave hexadecimal da entrada.
+        """
+        opcoes_serializadas = json.dumps(opcoes, sort_keys=True)
+        return hashlib.sha256(f"{sha256}:{opcoes_serializadas}".encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def obter(self, chave: str) -> Optional[Dict[str, object]]:
+        """
+        Retorna a entrada armazenada para a chave, ou None se não existir.
+        Um acerto atualiza o horário de acesso, usado na política de remoção.
+        """
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            os.utime(caminho)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return dados
+
+    def salvar(self, chave: str, dados: Dict[str, object]) -> None:
+        """
+        Grava uma entrada. A escrita é atômica (arquivo temporário + rename),
+        o que permite que vários processos do gunicorn compartilhem o diretório.
+        """
+        caminho = self._caminho(chave)
+        try:
+            fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+                json.dump(dados, arquivo, ensure_ascii=False)
+            tamanho = os.path.getsize(temporario)
+            try:
+                tamanho_anterior = os.path.getsize(caminho)
+            except OSError:
+                tamanho_anterior = 0
+            os.replace(temporario, caminho)
+        except OSError as e:
+            print(f"Erro ao gravar entrada no cache de PDF: {e}")
+            return
+        with self._lock:
+            self._gravacoes += 1
+            if self._total_bytes is not None:
+                self._total_bytes += tamanho - tamanho_anterior
+            varrer = (self._total_bytes is None or self._total_bytes > self.max_bytes
+                      or self._gravacoes % _GRAVACOES_POR_VARREDURA == 0)
+        if varrer:
+            self._remover_excedente()
+
+    def _remover_excedente(self) -> None:
+        """
+        Varre o diretório e, se o total passar de max_bytes, remove as
+        entradas menos usadas até _FRACAO_APOS_REMOCAO dele. Atualiza o total
+        acompanhado.
+        """
+        with self._lock:
+            entradas = []
+            total = 0
+            for nome in os.listdir(self.diretorio):
+                if not nome.endswith('.json'):
+                    continue
+                caminho = os.path.join(self.diretorio, nome)
+                try:
+                    info = os.stat(caminho)
+                except OSError:
+                    continue
+                entradas.append((info.st_mtime, info.st_size, caminho))
+                total += info.st_size
+            if total > self.max_bytes:
+                for _, tamanho, caminho in sorted(entradas):
+                    try:
+                        os.remove(caminho)
+                    except OSError:
+                        continue
+                    self.evictions += 1
+                    total -= tamanho
+                    if total <= self.max_bytes * _FRACAO_APOS_REMOCAO:
+                        break
+            self._total_bytes = total
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores de acertos, faltas e remoções."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,80 @@
+# cliente_http.py
+
+"""
+Cliente HTTP assíncrono das buscas de jurisprudência que dispensam o navegador.
+Vários tribunais devolvem os resultados em HTML renderizado no servidor (ou
+em JSON), sem depender de JavaScript; para eles uma requisição HTTP com
+conexões keep-alive reaproveitadas custa uma fração de uma página do
+Chromium. O HTML é analisado com o lxml.
+
+httpx e lxml são opcionais: sem eles (HTTP_DISPONIVEL = False) todas as
+buscas usam o navegador.
+"""
+
+import asyncio
+import weakref
+from typing import Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+from melkor.pool_navegador import OPCOES_CONTEXTO
+
+HTTP_DISPONIVEL = httpx is not None and lxml_html is not None
+
+# Cabeçalhos enviados em todas as requisições (mesmo User-Agent do navegador)
+CABECALHOS = {
+    "User-Agent": OPCOES_CONTEXTO["user_agent"],
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9",
+}
+# Conexões mantidas abertas por cliente e tempo (em segundos) de uma conexão ociosa
+MAX_CONEXOES = 20
+MAX_CONEXOES_OCIOSAS = 10
+TEMPO_CONEXAO_OCIOSA = 30.0
+
+# Um cliente por loop de eventos (as conexões pertencem ao loop que as abriu)
+_clientes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+
+
+def obter_cliente_http() -> "httpx.AsyncClient":
+    """
+    Retorna o cliente compartilhado do loop de eventos atual, criando-o na
+    primeira chamada. Deve ser chamada de dentro de uma corrotina.
+    """
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.get(loop)
+    if cliente is None or cliente.is_closed:
+        limites = httpx.Limits(max_connections=MAX_CONEXOES, max_keepalive_connections=MAX_CONEXOES_OCIOSAS,
+                               keepalive_expiry=TEMPO_CONEXAO_OCIOSA)
+        cliente = _clientes[loop] = httpx.AsyncClient(headers=CABECALHOS, limits=limites, follow_redirects=True)
+    return cliente
+
+
+async def fechar_cliente_http() -> None:
+    """Fecha o cliente do loop de eventos atual e suas conexões, se existir."""
+    cliente: Optional[object] = _clientes.pop(asyncio.get_running_loop(), None)
+    if cliente is not None:
+        await cliente.aclose()
+
+
+def analisar_html(texto: str):
+    """Converte o HTML em uma árvore do lxml, consultada com XPath."""
+    return lxml_html.fromstring(texto)
+
+
+def texto_xpath(no, expressao: Optional[str]) -> str:
+    """
+    Avalia a expressão XPath relativa ao nó e devolve o texto encontrado, com
+    os espaços colapsados (string vazia se a expressão for None ou nada casar).
+    """
+    if not expressao:
+        return ""
+    return " ".join(no.xpath(f"string({expressao})").split())
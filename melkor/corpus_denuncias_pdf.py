@@ -0,0 +1,187 @@
+# corpus_denuncias_pdf.py
+
+"""
+Gerador de PDFs sintéticos de denúncias para benchmarks do ParserPDF.
+Os documentos são montados byte a byte, sem dependências externas para as
+páginas de texto (fonte Helvetica padrão do PDF). As páginas digitalizadas
+são desenhadas com o PIL e embutidas como imagem em tons de cinza
+comprimida (FlateDecode), como sai de um scanner.
+
+Uso:
+    python -m melkor.corpus_denuncias_pdf --paginas 100 --tipo misto saida.pdf
+"""
+
+import argparse
+import random
+import zlib
+from typing import List
+
+# Tipos de documento gerados
+TIPOS_DOCUMENTO = ('texto', 'imagem', 'misto')
+
+# Dimensões da página (A4, em pontos) e resolução das páginas em imagem
+LARGURA_PAGINA = 595
+ALTURA_PAGINA = 842
+DPI_IMAGEM = 150
+# Diagramação das páginas de texto
+TAMANHO_FONTE = 11
+ENTRELINHA = 14
+MARGEM = 56
+CARACTERES_POR_LINHA = 90
+# Fonte TrueType usada nas páginas em imagem, se instalada
+FONTE_IMAGEM = 'DejaVuSans.ttf'
+
+NOMES = ['JOÃO DA SILVA', 'MARIA OLIVEIRA', 'PEDRO SANTOS', 'ANA PEREIRA',
+         'CARLOS SOUZA', 'JULIANA COSTA', 'RAFAEL ALMEIDA', 'BEATRIZ LIMA']
+MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho',
+         'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+RUAS = ['Avenida Afonso Pena', 'Rua da Bahia', 'Rua dos Timbiras', 'Avenida Amazonas']
+
+# Molde de denúncia (o mesmo texto_exemplo de parser_pdf.py, com campos variáveis)
+MODELO_DENUNCIA = """MINISTÉRIO PÚBLICO DO ESTADO DE MINAS GERAIS
+PROMOTORIA DE JUSTIÇA DA COMARCA DE BELO HORIZONTE
+
+O MINISTÉRIO PÚBLICO DO ESTADO DE MINAS GERAIS, por seu Promotor de Justiça, vem oferecer DENÚNCIA em face de:
+
+{reu}, brasileiro, solteiro, nascido em {nascimento}, residente na Rua das Flores, nº {numero}, Belo Horizonte/MG.
+
+No dia {dia} de {mes} de {ano}, na {rua}, nº {numero_fato}, o denunciado subtraiu para si, mediante grave ameaça, o veículo pertencente à vítima {vitima}.
+
+O crime foi presenciado pelas testemunhas {testemunha1} e {testemunha2}, que acionaram a Polícia Militar.
+
+Diante do exposto, o denunciado {reu} está incurso nas penas do artigo 157, §2º, inciso I, do Código Penal."""
+
+
+def _linhas_pagina(gerador: random.Random, pagina: int, total: int) -> List[str]:
+    """Preenche o molde com dados sorteados e quebra o texto em linhas da página."""
+    reu, vitima, testemunha1, testemunha2 = gerador.sample(NOMES, 4)
+    texto = MODELO_DENUNCIA.format(
+        reu=reu, vitima=vitima, testemunha1=testemunha1, testemunha2=testemunha2,
+        nascimento=f"{gerador.randint(1, 28):02d}/{gerador.randint(1, 12):02d}/{gerador.randint(1960, 2004)}",
+        numero=gerador.randint(1, 2000), numero_fato=gerador.randint(1, 3000),
+        dia=gerador.randint(1, 28), mes=gerador.choice(MESES), ano=gerador.randint(2015, 2024),
+        rua=gerador.choice(RUAS),
+    )
+    linhas = []
+    for paragrafo in texto.split('\n'):
+        while len(paragrafo) > CARACTERES_POR_LINHA:
+            corte = paragrafo.rfind(' ', 0, CARACTERES_POR_LINHA)
+            corte = corte if corte > 0 else CARACTERES_POR_LINHA
+            linhas.append(paragrafo[:corte])
+            paragrafo = paragrafo[corte:].lstrip()
+        linhas.append(paragrafo)
+    linhas += ['', f'Página {pagina} de {total}']
+    return linhas
+
+
+def _conteudo_texto(linhas: List[str]) -> bytes:
+    """Stream de conteúdo que escreve as linhas com a fonte /F1."""
+    comandos = [f"BT /F1 {TAMANHO_FONTE} Tf {ENTRELINHA} TL {MARGEM} {ALTURA_PAGINA - MARGEM} Td".encode('ascii')]
+    for linha in linhas:
+        escapada = linha.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        comandos.append(b'(' + escapada.encode('cp1252', errors='replace') + b") '")
+    comandos.append(b'ET')
+    return b'\n'.join(comandos)
+
+
+def _imagem_pagina(linhas: List[str]) -> bytes:
+    """Desenha as linhas em uma imagem em tons de cinza e devolve os pixels brutos."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    escala = DPI_IMAGEM / 72
+    largura, altura = round(LARGURA_PAGINA * escala), round(ALTURA_PAGINA * escala)
+    imagem = Image.new('L', (largura, altura), 255)
+    desenho = ImageDraw.Draw(imagem)
+    tamanho = round(TAMANHO_FONTE * escala)
+    try:
+        # A fonte embutida do PIL não tem acentos; a DejaVu acompanha a
+        # maioria das imagens Linux com o Tesseract instalado.
+        fonte = ImageFont.truetype(FONTE_IMAGEM, tamanho)
+    except OSError:
+        try:
+            fonte = ImageFont.load_default(size=tamanho)
+        except TypeError:
+            # PIL anterior à 10.1: fonte bitmap de tamanho fixo
+            fonte = ImageFont.load_default()
+    y = MARGEM * escala
+    for linha in linhas:
+        desenho.text((MARGEM * escala, y), linha, fill=0, font=fonte)
+        y += ENTRELINHA * escala
+    return imagem.tobytes()
+
+
+def gerar_pdf(paginas: int, tipo: str = 'texto', semente: int = 0) -> bytes:
+    """
+    Gera uma denúncia sintética em PDF.
+
+    Args:
+        paginas: Número de páginas.
+        tipo: 'texto' (camada de texto em todas as páginas), 'imagem' (todas
+              as páginas digitalizadas, sem texto) ou 'misto' (uma página
+              digitalizada a cada três).
+        semente: Semente dos dados sorteados; a mesma semente gera o mesmo PDF.
+
+    Returns:
+        Conteúdo do PDF.
+    """
+    if tipo not in TIPOS_DOCUMENTO:
+        raise ValueError(f"Tipo de documento inválido: {tipo}")
+    gerador = random.Random(semente)
+    objetos: List[bytes] = []
+
+    def adicionar(conteudo: bytes) -> int:
+        objetos.append(conteudo)
+        return len(objetos)
+
+    def adicionar_stream(dicionario: bytes, dados: bytes) -> int:
+        return adicionar(b'<< ' + dicionario + b' /Length %d >>\nstream\n' % len(dados)
+                         + dados + b'\nendstream')
+
+    # Objeto 1: catálogo; objeto 2: árvore de páginas (preenchida ao final)
+    adicionar(b'<< /Type /Catalog /Pages 2 0 R >>')
+    adicionar(b'')
+    fonte = adicionar(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    filhos = []
+    for pagina in range(1, paginas + 1):
+        linhas = _linhas_pagina(gerador, pagina, paginas)
+        digitalizada = tipo == 'imagem' or (tipo == 'misto' and pagina % 3 == 0)
+        if digitalizada:
+            escala = DPI_IMAGEM / 72
+            imagem = adicionar_stream(
+                b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray '
+                b'/BitsPerComponent 8 /Filter /FlateDecode'
+                % (round(LARGURA_PAGINA * escala), round(ALTURA_PAGINA * escala)),
+                zlib.compress(_imagem_pagina(linhas), 6))
+            conteudo = adicionar_stream(b'', b'q %d 0 0 %d 0 0 cm /Im0 Do Q' % (LARGURA_PAGINA, ALTURA_PAGINA))
+            recursos = b'<< /XObject << /Im0 %d 0 R >> >>' % imagem
+        else:
+            conteudo = adicionar_stream(b'', _conteudo_texto(linhas))
+            recursos = b'<< /Font << /F1 %d 0 R >> >>' % fonte
+        filhos.append(adicionar(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R /Resources %s >>'
+            % (LARGURA_PAGINA, ALTURA_PAGINA, conteudo, recursos)))
+    objetos[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % filho for filho in filhos), len(filhos))
+
+    saida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    deslocamentos = []
+    for numero, conteudo in enumerate(objetos, start=1):
+        deslocamentos.append(len(saida))
+        saida += b'%d 0 obj\n' % numero + conteudo + b'\nendobj\n'
+    inicio_xref = len(saida)
+    saida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    saida += b''.join(b'%010d 00000 n \n' % deslocamento for deslocamento in deslocamentos)
+    saida += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, inicio_xref)
+    return bytes(saida)
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Gera uma denúncia sintética em PDF")
+    argumentos.add_argument('saida')
+    argumentos.add_argument('--paginas', type=int, default=10)
+    argumentos.add_argument('--tipo', choices=TIPOS_DOCUMENTO, default='texto')
+    argumentos.add_argument('--semente', type=int, default=0)
+    opcoes = argumentos.parse_args()
+    with open(opcoes.saida, 'wb') as arquivo:
+        arquivo.write(gerar_pdf(opcoes.paginas, opcoes.tipo, opcoes.semente))
@@ -0,0 +1,532 @@
+# indice_jurisprudencia.py
+
+"""
+Índice local de texto completo dos resultados de jurisprudência.
+Os resultados raspados pela JurisprudenciaTool (titulo, link, resumo, fonte,
+data_publicacao) eram descartados ao fim da busca. Aqui eles são gravados de
+forma incremental em um banco local, sem duplicatas (a chave é o link
+canônico, ver canonizar_link), com um índice de texto completo sobre o
+título e o resumo. A ferramenta consulta o índice antes dos sites e só raspa
+para completar resultados obsoletos ou escassos.
+
+Dois backends, com o mesmo esquema e a mesma semântica de busca:
+- Postgres (produção): coluna tsvector gerada e índice GIN. Usado quando há
+  um DSN explícito (argumento ou MELKOR_INDICE_DSN) e o psycopg2 está
+  instalado. O DATABASE_URL do Django não é usado: as tabelas são criadas
+  fora das migrações, então o banco do índice precisa ser escolhido de
+  propósito. Se a conexão cair (reinício do Postgres, conexão ociosa
+  encerrada), ela é refeita na operação seguinte;
+- SQLite FTS5 (testes e desenvolvimento): arquivo em MELKOR_INDICE_CAMINHO
+  ou no diretório temporário do sistema (":memory:" também é aceito).
+
+As tabelas são criadas na primeira conexão (CREATE ... IF NOT EXISTS), fora
+das migrações do Django. O texto indexado é reduzido pelo normalizador_consulta
+aos mesmos radicais da forma canônica do termo (ver radicais), e a consulta
+usa esses radicais como prefixos: "homicídios qualificados" encontra
+"homicídio qualificado" e "prisões" encontra "prisão". Quando essa redução
+muda (VERSAO_TEXTO_BUSCA), o texto dos documentos já gravados é refeito na
+primeira conexão.
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+from melkor.normalizador_consulta import canonizar_consulta, radicais, remover_acentos, termos_canonicos
+
+# Tempo (em segundos) em que a última raspagem de uma consulta dispensa
+# uma nova raspagem do site
+IDADE_MAXIMA_PADRAO = 24 * 3600
+# O mesmo para raspagens sem resultados: sites fora do ar ou com o
+# raspador desatualizado devolvem listas vazias, então a espera é curta
+IDADE_MAXIMA_VAZIA_PADRAO = 10 * 60
+# Número máximo de resultados devolvidos por consulta quando não informado
+LIMITE_PADRAO = 20
+# Campos de um resultado gravados no índice
+CAMPOS_RESULTADO = ("titulo", "link", "resumo", "fonte", "data_publicacao")
+# Versão da redução de titulo e resumo em texto_busca; incremente ao mudar o
+# normalizador para refazer o texto dos documentos já indexados
+VERSAO_TEXTO_BUSCA = 2
+
+# Parâmetros de rastreamento removidos do link canônico
+_PARAMETROS_RASTREAMENTO = {"fbclid", "gclid"}
+_RE_ESPACOS = re.compile(r"\s+")
+
+_ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS melkor_jurisprudencia (
+    id INTEGER PRIMARY KEY,
+    link_canonico TEXT NOT NULL UNIQUE,
+    site TEXT NOT NULL,
+    titulo TEXT NOT NULL,
+    link TEXT NOT NULL,
+    resumo TEXT NOT NULL,
+    fonte TEXT NOT NULL,
+    data_publicacao TEXT NOT NULL,
+    texto_busca TEXT NOT NULL,
+    criado_em REAL NOT NULL,
+    atualizado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS melkor_jurisprudencia_site ON melkor_jurisprudencia (site);
+CREATE VIRTUAL TABLE IF NOT EXISTS melkor_jurisprudencia_fts USING fts5(
+    texto_busca, content='melkor_jurisprudencia', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS melkor_jurisprudencia_ai AFTER INSERT ON melkor_jurisprudencia BEGIN
+    INSERT INTO melkor_jurisprudencia_fts (rowid, texto_busca) VALUES (new.id, new.texto_busca);
+END;
+CREATE TRIGGER IF NOT EXISTS melkor_jurisprudencia_ad AFTER DELETE ON melkor_jurisprudencia BEGIN
+    INSERT INTO melkor_jurisprudencia_fts (melkor_jurisprudencia_fts, rowid, texto_busca)
+    VALUES ('delete', old.id, old.texto_busca);
+END;
+CREATE TRIGGER IF NOT EXISTS melkor_jurisprudencia_au AFTER UPDATE ON melkor_jurisprudencia BEGIN
+    INSERT INTO melkor_jurisprudencia_fts (melkor_jurisprudencia_fts, rowid, texto_busca)
+    VALUES ('delete', old.id, old.texto_busca);
+    INSERT INTO melkor_jurisprudencia_fts (rowid, texto_busca) VALUES (new.id, new.texto_busca);
+END;
+CREATE TABLE IF NOT EXISTS melkor_jurisprudencia_consultas (
+    site TEXT NOT NULL,
+    termo_canonico TEXT NOT NULL,
+    raspado_em REAL NOT NULL,
+    resultados INTEGER NOT NULL,
+    PRIMARY KEY (site, termo_canonico)
+);
+CREATE TABLE IF NOT EXISTS melkor_jurisprudencia_meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+# A configuração 'simple' do Postgres não remove stopwords nem aplica radical,
+# como o tokenizador do FTS5: os dois backends encontram os mesmos documentos
+_ESQUEMA_POSTGRES = """
+CREATE TABLE IF NOT EXISTS melkor_jurisprudencia (
+    id BIGSERIAL PRIMARY KEY,
+    link_canonico TEXT NOT NULL UNIQUE,
+    site TEXT NOT NULL,
+    titulo TEXT NOT NULL,
+    link TEXT NOT NULL,
+    resumo TEXT NOT NULL,
+    fonte TEXT NOT NULL,
+    data_publicacao TEXT NOT NULL,
+    texto_busca TEXT NOT NULL,
+    criado_em DOUBLE PRECISION NOT NULL,
+    atualizado_em DOUBLE PRECISION NOT NULL,
+    documento TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', texto_busca)) STORED
+);
+CREATE INDEX IF NOT EXISTS melkor_jurisprudencia_site ON melkor_jurisprudencia (site);
+CREATE INDEX IF NOT EXISTS melkor_jurisprudencia_documento ON melkor_jurisprudencia USING GIN (documento);
+CREATE TABLE IF NOT EXISTS melkor_jurisprudencia_consultas (
+    site TEXT NOT NULL,
+    termo_canonico TEXT NOT NULL,
+    raspado_em DOUBLE PRECISION NOT NULL,
+    resultados INTEGER NOT NULL,
+    PRIMARY KEY (site, termo_canonico)
+);
+CREATE TABLE IF NOT EXISTS melkor_jurisprudencia_meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+# Comandos iguais nos dois backends (marcadores "?" convertidos para o psycopg2)
+_SQL_INSERIR = """
+INSERT INTO melkor_jurisprudencia (link_canonico, site, titulo, link, resumo, fonte, data_publicacao,
+                                   texto_busca, criado_em, atualizado_em)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (link_canonico) DO UPDATE SET
+    titulo = excluded.titulo, link = excluded.link, resumo = excluded.resumo, fonte = excluded.fonte,
+    data_publicacao = excluded.data_publicacao, texto_busca = excluded.texto_busca,
+    atualizado_em = excluded.atualizado_em
+"""
+_SQL_REGISTRAR_CONSULTA = """
+INSERT INTO melkor_jurisprudencia_consultas (site, termo_canonico, raspado_em, resultados)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (site, termo_canonico) DO UPDATE SET
+    raspado_em = excluded.raspado_em, resultados = excluded.resultados
+"""
+_SQL_ULTIMA_RASPAGEM = """
+SELECT raspado_em, resultados FROM melkor_jurisprudencia_consultas WHERE site = ? AND termo_canonico = ?
+"""
+_SQL_GRAVAR_META = """
+INSERT INTO melkor_jurisprudencia_meta (chave, valor) VALUES (?, ?)
+ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor
+"""
+
+
+def canonizar_link(link: str) -> str:
+    """
+    Forma canônica de um link, usada para deduplicar resultados: https, host
+    em minúsculas e sem "www.", sem fragmento, barra final e parâmetros de
+    rastreamento (utm_*, fbclid...), e com a query ordenada.
+
+    Exemplo: "http://www.STJ.jus.br/processo/?b=2&a=1&utm_source=x#topo" e
+    "https://stj.jus.br/processo?a=1&b=2" resultam no mesmo link.
+    """
+    partes = urlsplit(link.strip())
+    host = (partes.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if partes.port and partes.port not in (80, 443):
+        host = f"{host}:{partes.port}"
+    query = urlencode(sorted((nome, valor) for nome, valor in parse_qsl(partes.query, keep_blank_values=True)
+                             if not nome.lower().startswith("utm_")
+                             and nome.lower() not in _PARAMETROS_RASTREAMENTO))
+    caminho = partes.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, caminho, query, ""))
+
+
+def _texto_busca(titulo: str, resumo: str) -> str:
+    """Texto indexado de um resultado: os radicais do título e do resumo."""
+    return " ".join(radicais(f"{titulo} {resumo}"))
+
+
+def _chave_resultado(site: str, resultado: Dict[str, str]) -> str:
+    """Chave de deduplicação: o link canônico ou, sem link, o site e o título normalizado."""
+    link = (resultado.get("link") or "").strip()
+    if link:
+        return canonizar_link(link)
+    titulo = _RE_ESPACOS.sub(" ", remover_acentos(resultado.get("titulo", "")).lower()).strip()
+    return f"sem-link:{site}:{titulo}"
+
+
+def mesclar_resultados(novos: Sequence[Dict[str, str]], anteriores: Sequence[Dict[str, str]],
+                       limite: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Completa os resultados novos com os anteriores (por exemplo, os do índice),
+    sem repetir links canônicos. Os novos vêm primeiro.
+
+    Args:
+        novos: Resultados da raspagem.
+        anteriores: Resultados já conhecidos.
+        limite: Número máximo de resultados; None mantém todos.
+    """
+    mesclados, vistos = [], set()
+    for resultado in list(novos) + list(anteriores):
+        chave = _chave_resultado("", resultado)
+        if chave in vistos:
+            continue
+        vistos.add(chave)
+        mesclados.append(resultado)
+    return mesclados[:limite] if limite is not None else mesclados
+
+
+class _BackendSQLite:
+    nome = "sqlite"
+
+    def __init__(self, caminho: str):
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        if caminho != ":memory:":
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.executescript(_ESQUEMA_SQLITE)
+        self.conexao.commit()
+
+    def executar(self, sql: str, parametros: Sequence = (), varios: bool = False) -> None:
+        if varios:
+            self.conexao.executemany(sql, parametros)
+        else:
+            self.conexao.execute(sql, parametros)
+        self.conexao.commit()
+
+    def consultar(self, sql: str, parametros: Sequence = ()) -> List[Tuple]:
+        return self.conexao.execute(sql, parametros).fetchall()
+
+    def sql_busca(self, termos: List[str], quantidade_sites: int) -> Tuple[str, List[str]]:
+        # Cada radical vira um prefixo entre aspas; todos precisam aparecer
+        expressao = " AND ".join(f'"{termo}"*' for termo in termos)
+        filtro_sites = f"AND j.site IN ({', '.join('?' * quantidade_sites)})" if quantidade_sites else ""
+        sql = f"""
+            SELECT j.site, j.titulo, j.link, j.resumo, j.fonte, j.data_publicacao
+            FROM melkor_jurisprudencia_fts f JOIN melkor_jurisprudencia j ON j.id = f.rowid
+            WHERE melkor_jurisprudencia_fts MATCH ? {filtro_sites}
+            ORDER BY f.rank LIMIT ?
+        """
+        return sql, [expressao]
+
+    def fechar(self) -> None:
+        self.conexao.close()
+
+
+class _BackendPostgres:
+    nome = "postgres"
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.conexao = psycopg2.connect(dsn)
+        self._com_cursor(lambda cursor: cursor.execute(_ESQUEMA_POSTGRES))
+
+    def _com_cursor(self, operacao):
+        """
+        Executa operacao(cursor) e confirma a transação. Se a conexão tiver
+        caído, reconecta e tenta mais uma vez.
+        """
+        for tentativa in range(2):
+            try:
+                with self.conexao.cursor() as cursor:
+                    resultado = operacao(cursor)
+                self.conexao.commit()
+                return resultado
+            except (psycopg2.InterfaceError, psycopg2.OperationalError):
+                if tentativa or not self.conexao.closed:
+                    self._desfazer()
+                    raise
+                self.conexao = psycopg2.connect(self.dsn)
+            except Exception:
+                self._desfazer()
+                raise
+
+    def _desfazer(self) -> None:
+        if not self.conexao.closed:
+            self.conexao.rollback()
+
+    def executar(self, sql: str, parametros: Sequence = (), varios: bool = False) -> None:
+        if varios:
+            self._com_cursor(lambda cursor: cursor.executemany(sql.replace("?", "%s"), parametros))
+        else:
+            self._com_cursor(lambda cursor: cursor.execute(sql.replace("?", "%s"), parametros))
+
+    def consultar(self, sql: str, parametros: Sequence = ()) -> List[Tuple]:
+        def operacao(cursor):
+            cursor.execute(sql.replace("?", "%s"), parametros)
+            return cursor.fetchall()
+        return self._com_cursor(operacao)
+
+    def sql_busca(self, termos: List[str], quantidade_sites: int) -> Tuple[str, List[str]]:
+        expressao = " & ".join(f"{termo}:*" for termo in termos)
+        filtro_sites = f"AND site IN ({', '.join('?' * quantidade_sites)})" if quantidade_sites else ""
+        sql = f"""
+            SELECT site, titulo, link, resumo, fonte, data_publicacao
+            FROM melkor_jurisprudencia, to_tsquery('simple', ?) consulta
+            WHERE documento @@ consulta {filtro_sites}
+            ORDER BY ts_rank_cd(documento, consulta) DESC LIMIT ?
+        """
+        return sql, [expressao]
+
+    def fechar(self) -> None:
+        self.conexao.close()
+
+
+class IndiceJurisprudencia:
+    def __init__(self, dsn: Optional[str] = None, caminho: Optional[str] = None,
+                 idade_maxima: float = IDADE_MAXIMA_PADRAO,
+                 idade_maxima_vazia: float = IDADE_MAXIMA_VAZIA_PADRAO):
+        """
+        Inicializa o índice. A conexão é aberta no primeiro uso.
+
+        Args:
+            dsn: DSN do Postgres. Padrão: variável de ambiente
+                 MELKOR_INDICE_DSN. Sem DSN (ou sem o psycopg2), usa o
+                 SQLite.
+            caminho: Arquivo do SQLite. Padrão: variável de ambiente
+                     MELKOR_INDICE_CAMINHO ou um arquivo no diretório
+                     temporário do sistema.
+            idade_maxima: Segundos em que a última raspagem de uma consulta
+                          dispensa raspar o site de novo.
+            idade_maxima_vazia: O mesmo, quando nem a raspagem nem o índice
+                                têm resultados para a consulta.
+        """
+        if dsn is None:
+            dsn = os.environ.get('MELKOR_INDICE_DSN')
+        if dsn and psycopg2 is None:
+            print("psycopg2 não instalado; o índice de jurisprudência usará o SQLite.")
+            dsn = None
+        self.dsn = dsn
+        self.caminho = caminho or os.environ.get(
+            'MELKOR_INDICE_CAMINHO', os.path.join(tempfile.gettempdir(), 'melkor_indice_jurisprudencia.sqlite3'))
+        self.idade_maxima = idade_maxima
+        self.idade_maxima_vazia = idade_maxima_vazia
+        self._backend: Optional[object] = None
+        # As conexões do sqlite3 e do psycopg2 não aceitam uso simultâneo
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.segundos_consultas = 0.0
+        self.acertos = 0
+        self.complementos = 0
+        self.inseridos = 0
+        self.atualizados = 0
+
+    def _obter_backend(self):
+        if self._backend is None:
+            backend = _BackendPostgres(self.dsn) if self.dsn else _BackendSQLite(self.caminho)
+            self._atualizar_texto_busca(backend)
+            self._backend = backend
+        return self._backend
+
+    @staticmethod
+    def _atualizar_texto_busca(backend) -> None:
+        """Refaz texto_busca dos documentos gravados com outra VERSAO_TEXTO_BUSCA."""
+        linhas = backend.consultar("SELECT valor FROM melkor_jurisprudencia_meta WHERE chave = 'versao_texto_busca'")
+        if linhas and linhas[0][0] == str(VERSAO_TEXTO_BUSCA):
+            return
+        documentos = backend.consultar("SELECT id, titulo, resumo FROM melkor_jurisprudencia")
+        for inicio in range(0, len(documentos), 500):
+            backend.executar("UPDATE melkor_jurisprudencia SET texto_busca = ? WHERE id = ?",
+                             [(_texto_busca(titulo, resumo), id_) for id_, titulo, resumo
+                              in documentos[inicio:inicio + 500]], varios=True)
+        backend.executar(_SQL_GRAVAR_META, ("versao_texto_busca", str(VERSAO_TEXTO_BUSCA)))
+
+    def buscar_sincrono(self, termo: str, sites: Optional[Sequence[str]] = None,
+                        limite: int = LIMITE_PADRAO) -> List[Dict[str, str]]:
+        """
+        Busca no índice os resultados que contêm todos os radicais do termo,
+        ordenados por relevância.
+
+        Args:
+            termo: Termo de busca como digitado.
+            sites: Restringe a busca aos resultados desses sites. Padrão: todos.
+            limite: Número máximo de resultados.
+
+        Returns:
+            Lista de resultados no formato da JurisprudenciaTool, com o campo
+            adicional "site".
+        """
+        termos = termos_canonicos(termo)
+        if not termos:
+            return []
+        sites = list(sites or [])
+        inicio = time.perf_counter()
+        with self._lock:
+            backend = self._obter_backend()
+            sql, parametros = backend.sql_busca(termos, len(sites))
+            linhas = backend.consultar(sql, parametros + sites + [limite])
+        self.consultas += 1
+        self.segundos_consultas += time.perf_counter() - inicio
+        return [dict(zip(("site",) + CAMPOS_RESULTADO, linha)) for linha in linhas]
+
+    def inserir_sincrono(self, site: str, termo: Optional[str], resultados: Iterable[Dict[str, str]]) -> int:
+        """
+        Grava os resultados de um site de forma incremental: links canônicos já
+        indexados têm os campos atualizados, os demais são inseridos. Com o
+        termo, registra também a raspagem da consulta (ver ultima_raspagem).
+
+        Returns:
+            Número de resultados novos no índice.
+        """
+        agora = time.time()
+        linhas: Dict[str, Tuple] = {}
+        for resultado in resultados:
+            campos = [str(resultado.get(campo) or "") for campo in CAMPOS_RESULTADO]
+            # Links repetidos no mesmo lote: vale o primeiro (mais relevante)
+            linhas.setdefault(_chave_resultado(site, resultado),
+                              (site, *campos, _texto_busca(campos[0], campos[2]), agora, agora))
+        with self._lock:
+            backend = self._obter_backend()
+            existentes = set()
+            chaves = list(linhas)
+            for inicio in range(0, len(chaves), 500):
+                lote = chaves[inicio:inicio + 500]
+                existentes.update(linha[0] for linha in backend.consultar(
+                    f"SELECT link_canonico FROM melkor_jurisprudencia "
+                    f"WHERE link_canonico IN ({', '.join('?' * len(lote))})", lote))
+            if linhas:
+                backend.executar(_SQL_INSERIR, [(chave, *linha) for chave, linha in linhas.items()], varios=True)
+            if termo is not None:
+                backend.executar(_SQL_REGISTRAR_CONSULTA, (site, canonizar_consulta(termo), agora, len(linhas)))
+        novos = len(linhas) - len(existentes)
+        self.inseridos += novos
+        self.atualizados += len(existentes)
+        return novos
+
+    def _raspagem(self, site: str, termo: str) -> Optional[Tuple[float, int]]:
+        with self._lock:
+            linhas = self._obter_backend().consultar(_SQL_ULTIMA_RASPAGEM, (site, canonizar_consulta(termo)))
+        return tuple(linhas[0]) if linhas else None
+
+    def ultima_raspagem(self, site: str, termo: str) -> Optional[float]:
+        """Momento (time.time()) da última raspagem do site para a consulta, ou None."""
+        raspagem = self._raspagem(site, termo)
+        return raspagem[0] if raspagem else None
+
+    def consultar_sincrono(self, site: str, termo: str, limite: int) -> Tuple[List[Dict[str, str]], str]:
+        """
+        Consulta o índice para um site antes da raspagem.
+
+        Returns:
+            Tupla (resultados, estado), em que estado é:
+            - "fresco": a consulta foi raspada há menos de idade_maxima e o
+              índice tem resultados (sem resultados, vale idade_maxima_vazia
+              se a raspagem também veio vazia);
+            - "suficiente": nunca raspada, mas o índice já tem limite resultados;
+            - "obsoleto": raspada há mais tempo, ou sem resultados no índice
+              embora a raspagem tenha trazido algum;
+            - "escasso": nunca raspada e com menos de limite resultados.
+            Nos dois primeiros casos a raspagem é dispensável.
+        """
+        resultados = self.buscar_sincrono(termo, [site], limite)
+        for resultado in resultados:
+            del resultado["site"]
+        raspagem = self._raspagem(site, termo)
+        if raspagem is not None:
+            raspado_em, quantidade_raspada = raspagem
+            if resultados:
+                idade_maxima = self.idade_maxima
+            else:
+                idade_maxima = self.idade_maxima_vazia if quantidade_raspada == 0 else 0
+            estado = "fresco" if time.time() - raspado_em < idade_maxima else "obsoleto"
+        else:
+            estado = "suficiente" if len(resultados) >= limite else "escasso"
+        if estado in ("fresco", "suficiente"):
+            self.acertos += 1
+        else:
+            self.complementos += 1
+        return resultados, estado
+
+    async def buscar(self, termo: str, sites: Optional[Sequence[str]] = None,
+                     limite: int = LIMITE_PADRAO) -> List[Dict[str, str]]:
+        """Versão assíncrona de buscar_sincrono (executada em uma thread)."""
+        return await asyncio.to_thread(self.buscar_sincrono, termo, sites, limite)
+
+    async def inserir(self, site: str, termo: Optional[str], resultados: Iterable[Dict[str, str]]) -> int:
+        """Versão assíncrona de inserir_sincrono (executada em uma thread)."""
+        return await asyncio.to_thread(self.inserir_sincrono, site, termo, list(resultados))
+
+    async def consultar(self, site: str, termo: str, limite: int) -> Tuple[List[Dict[str, str]], str]:
+        """Versão assíncrona de consultar_sincrono (executada em uma thread)."""
+        return await asyncio.to_thread(self.consultar_sincrono, site, termo, limite)
+
+    def estatisticas(self) -> Dict[str, object]:
+        """
+        Retorna o backend, o total de documentos indexados, o tempo médio das
+        consultas (em milissegundos) e os contadores de acertos (raspagem
+        dispensada), complementos (raspagem para completar o índice),
+        resultados inseridos e atualizados.
+        """
+        with self._lock:
+            documentos = self._obter_backend().consultar("SELECT COUNT(*) FROM melkor_jurisprudencia")[0][0]
+        return {
+            "backend": self._obter_backend().nome,
+            "documentos": documentos,
+            "consultas": self.consultas,
+            "tempo_medio_consulta_ms": 1000 * self.segundos_consultas / self.consultas if self.consultas else 0.0,
+            "acertos": self.acertos,
+            "complementos": self.complementos,
+            "inseridos": self.inseridos,
+            "atualizados": self.atualizados,
+        }
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco, se aberta."""
+        with self._lock:
+            if self._backend is not None:
+                self._backend.fechar()
+                self._backend = None
+
+
+_indice_padrao: Optional[IndiceJurisprudencia] = None
+
+
+def obter_indice_jurisprudencia() -> IndiceJurisprudencia:
+    """Retorna o índice compartilhado do processo, criando-o com as opções padrão."""
+    global _indice_padrao
+    if _indice_padrao is None:
+        _indice_padrao = IndiceJurisprudencia()
+    return _indice_padrao
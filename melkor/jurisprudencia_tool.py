@@ -3,48 +3,143 @@
 """
 Ferramenta para buscar jurisprudência em sites jurídicos como JusBrasil, STF, STJ e outros tribunais.
 Utiliza Playwright para interagir com as páginas web e extrair informações relevantes.
+A busca em cada site fica no adaptador do site (adaptadores_jurisprudencia);
+sites que não precisam de JavaScript são consultados por HTTP (cliente_http)
+e o navegador só é aberto para os demais. Os resultados raspados são gravados
+em um índice local de texto completo (indice_jurisprudencia), consultado
+antes dos sites.
 """
 
 import asyncio
-from playwright.async_api import async_playwright, Playwright, Browser, Page
-from typing import List, Dict, Optional
+import copy
+from playwright.async_api import Page, Route
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 import time
 
+from melkor.adaptadores_jurisprudencia import AdaptadorSite, estado_adaptadores, obter_adaptador
+from melkor.cache_jurisprudencia import CacheJurisprudencia, obter_cache_jurisprudencia
+from melkor.cliente_http import HTTP_DISPONIVEL, fechar_cliente_http, obter_cliente_http
+from melkor.indice_jurisprudencia import IndiceJurisprudencia, mesclar_resultados, obter_indice_jurisprudencia
+from melkor.pool_navegador import PoolNavegador, obter_pool
+from melkor.replay_jurisprudencia import ReplayJurisprudencia
+
+SITES_SUPORTADOS = ["jusbrasil", "stf", "stj", "tjmg"]
+
+# Tipos de recurso que os cartões de resultado não usam (modo enxuto)
+TIPOS_RECURSO_BLOQUEADOS = {"image", "media", "font", "stylesheet"}
+
+# Atualizações de cache em segundo plano; a referência impede que a tarefa
+# seja coletada antes de terminar
+_revalidacoes = set()
+
 class JurisprudenciaTool:
-    def __init__(self, timeout: int = 30000, headless: bool = True):
+    def __init__(self, timeout: int = 30000, headless: bool = True, max_concorrencia: int = 4,
+                 timeout_site: Optional[int] = None, prazo_total: Optional[int] = None,
+                 pool: Optional[PoolNavegador] = None, modo_enxuto: bool = True,
+                 limite_resultados: int = 5, cache: Optional[CacheJurisprudencia] = None,
+                 usar_cache: bool = True, usar_http: bool = True,
+                 replay: Optional[ReplayJurisprudencia] = None,
+                 indice: Optional[IndiceJurisprudencia] = None, usar_indice: bool = True):
         """
         Inicializa a ferramenta de busca de jurisprudência.
 
         Args:
             timeout: Tempo máximo de espera para operações do Playwright (em milissegundos).
             headless: Se True, executa o navegador em modo headless (sem interface gráfica).
+            max_concorrencia: Número máximo de sites pesquisados ao mesmo tempo.
+            timeout_site: Tempo máximo (em milissegundos) da busca em um site,
+                          incluindo navegação e extração. Padrão: 2 * timeout.
+            prazo_total: Tempo máximo (em milissegundos) da busca completa. Ao
+                         estourar, os sites que não terminaram são cancelados e
+                         os resultados já obtidos são devolvidos. Padrão: sem prazo.
+            pool: Pool de contextos do navegador. Padrão: o pool compartilhado
+                  do loop de eventos atual (obter_pool), que mantém o navegador
+                  aberto entre buscas e entre instâncias da ferramenta.
+            modo_enxuto: Se True, bloqueia imagens, fontes, CSS, mídia e
+                         domínios de terceiros (perfil de rede de cada
+                         adaptador), carregando apenas o necessário para
+                         extrair os resultados.
+            limite_resultados: Número máximo de resultados extraídos por site.
+            cache: Cache de resultados por site e termo. Padrão: o cache
+                   compartilhado do processo (obter_cache_jurisprudencia).
+            usar_cache: Se False, sempre raspa os sites, sem ler nem gravar no cache.
+            usar_http: Se True (e com httpx e lxml instalados), os sites cujo
+                       adaptador não requer navegador são consultados por
+                       HTTP; o navegador fica como alternativa se a
+                       requisição falhar.
+            replay: Grava as respostas dos sites em disco ou as reproduz sem
+                    rede (ver replay_jurisprudencia), para testes e benchmarks.
+            indice: Índice local de texto completo dos resultados. Padrão: o
+                    índice compartilhado do processo (obter_indice_jurisprudencia).
+            usar_indice: Se False, não consulta nem grava no índice.
         """
         self.timeout = timeout
         self.headless = headless
-        self.browser: Optional[Browser] = None
-        self.playwright: Optional[Playwright] = None
+        self.max_concorrencia = max(1, max_concorrencia)
+        self.timeout_site = timeout_site if timeout_site is not None else 2 * timeout
+        self.prazo_total = prazo_total
+        self.pool = pool
+        self.modo_enxuto = modo_enxuto
+        self.limite_resultados = limite_resultados
+        self.cache = cache
+        self.usar_cache = usar_cache
+        self.usar_http = usar_http and HTTP_DISPONIVEL
+        self.replay = replay
+        self.indice = indice
+        self.usar_indice = usar_indice
+        # Se True, a busca ignora os resultados do índice (mas grava neles);
+        # usado pela atualização do cache em segundo plano
+        self._forcar_raspagem = False
+        # Situação de cada site na última busca: {"site": {"status": "ok" |
+        # "erro" | "timeout" | "prazo_esgotado" | "nao_suportado" | "circuito_aberto",
+        # "resultados": n, "segundos": t, "erro": mensagem, "rede": {...},
+        # "espera_segundos": tempo aguardando a página ficar pronta,
+        # "espera_taxa_segundos": tempo aguardando o limite de taxa do site,
+        # "via": "http" | "navegador", "etapas": {"navegacao": s, "espera": s,
+        # "extracao": s} (ou "requisicao" e "extracao" no caminho HTTP),
+        # "cache": "fresco" | "obsoleto" | "falta",
+        # "indice": "fresco" | "suficiente" | "obsoleto" | "escasso"}}
+        self.ultimo_status_sites: Dict[str, Dict[str, object]] = {}
+
+    def _get_pool(self) -> PoolNavegador:
+        """Retorna o pool informado no construtor ou o compartilhado do loop atual."""
+        return self.pool if self.pool is not None else obter_pool(headless=self.headless)
 
-    async def _get_browser(self) -> Browser:
-        """Retorna uma instância do navegador, inicializando se necessário."""
-        if self.playwright is None:
-            self.playwright = await async_playwright().start()
-        if self.browser is None or not self.browser.is_connected():
-            self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        return self.browser
+    def _get_cache(self) -> Optional[CacheJurisprudencia]:
+        """Retorna o cache informado no construtor, o compartilhado, ou None se desativado."""
+        if not self.usar_cache:
+            return None
+        return self.cache if self.cache is not None else obter_cache_jurisprudencia()
+
+    def _get_indice(self) -> Optional[IndiceJurisprudencia]:
+        """Retorna o índice informado no construtor, o compartilhado, ou None se desativado."""
+        if not self.usar_indice:
+            return None
+        return self.indice if self.indice is not None else obter_indice_jurisprudencia()
 
     async def close_browser(self):
-        """Fecha o navegador e o Playwright se estiverem abertos."""
-        if self.browser and self.browser.is_connected():
-            await self.browser.close()
-            self.browser = None
-        if self.playwright:
-            await self.playwright.stop()
-            self.playwright = None
+        """
+        Fecha o pool usado pela ferramenta (navegador, contextos e Playwright)
+        e o cliente HTTP. Entre buscas não é necessário: o pool mantém o
+        navegador aquecido e o cliente mantém as conexões abertas para as
+        próximas requisições. Use ao encerrar a aplicação ou um script.
+        """
+        await self._get_pool().fechar()
+        if HTTP_DISPONIVEL:
+            await fechar_cliente_http()
 
     async def buscar_jurisprudencia(self, termo_busca: str, sites: Optional[List[str]] = None) -> List[Dict[str, str]]:
         """
         Busca jurisprudência sobre um termo específico nos sites fornecidos ou em um conjunto padrão.
 
+        Os sites são pesquisados em paralelo (até max_concorrencia ao mesmo
+        tempo), cada um em sua própria página do mesmo contexto. Um site que
+        falha ou demora mais que timeout_site não interrompe os demais; com
+        prazo_total, os resultados já obtidos são devolvidos quando o prazo
+        acaba. A situação de cada site fica em self.ultimo_status_sites. Sites
+        com resultado no cache não são raspados (ver buscar_jurisprudencia_stream).
+
         Args:
             termo_busca: O termo a ser pesquisado.
             sites: Lista opcional de sites para buscar. Sites suportados no momento:
@@ -55,146 +150,340 @@ class JurisprudenciaTool:
             Uma lista de dicionários, onde cada dicionário representa um resultado de jurisprudência
             contendo chaves como "titulo", "link", "resumo", "fonte", "data_publicacao".
         """
-        if sites is None:
-            sites = ["jusbrasil", "stf", "stj", "tjmg"] # Sites padrão conforme especificado
+        resultados_por_site: Dict[str, List[Dict[str, str]]] = {}
+        async for lote in self.buscar_jurisprudencia_stream(termo_busca, sites):
+            resultados_por_site[lote["site"]] = lote["resultados"]
 
+        # Resultados na ordem dos sites pedidos, não na ordem de conclusão
         resultados_finais: List[Dict[str, str]] = []
-        browser = await self._get_browser()
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            java_script_enabled=True,
-            accept_downloads=False,
-            bypass_csp=True
-        )
-        # Adicionar cookies se necessário para evitar pop-ups de consentimento, etc.
-        # await context.add_cookies([...])
-
-        for site in sites:
-            page = await context.new_page()
-            try:
-                if site == "jusbrasil":
-                    resultados_site = await self._buscar_jusbrasil(page, termo_busca)
-                elif site == "stf":
-                    resultados_site = await self._buscar_stf(page, termo_busca)
-                elif site == "stj":
-                    resultados_site = await self._buscar_stj(page, termo_busca)
-                elif site == "tjmg":
-                    resultados_site = await self._buscar_tjmg(page, termo_busca)
-                else:
-                    print(f"Site não suportado: {site}")
-                    resultados_site = []
-                
-                resultados_finais.extend(resultados_site)
-            except Exception as e:
-                print(f"Erro ao buscar em {site}: {e}")
-            finally:
-                await page.close()
-        
-        await context.close()
+        for site in self.ultimo_status_sites:
+            resultados_finais.extend(resultados_por_site.get(site, []))
         # Não fechar o browser aqui se for reutilizar em chamadas subsequentes
         # await self.close_browser() # Descomente se quiser fechar após cada busca completa
         return resultados_finais
 
-    async def _buscar_jusbrasil(self, page: Page, termo_busca: str) -> List[Dict[str, str]]:
-        """Busca jurisprudência no JusBrasil."""
-        print(f"Buscando '{termo_busca}' no JusBrasil...")
-        resultados: List[Dict[str, str]] = []
-        url = f"https://www.jusbrasil.com.br/jurisprudencia/busca?q={termo_busca.replace(' ', '+')}"
-        await page.goto(url, timeout=self.timeout, wait_until="domcontentloaded")
-        await page.wait_for_timeout(3000) # Espera adicional para carregamento dinâmico
+    async def buscar_jurisprudencia_stream(self, termo_busca: str,
+                                           sites: Optional[List[str]] = None) -> AsyncIterator[Dict[str, object]]:
+        """
+        Versão em fluxo de buscar_jurisprudencia: entrega os resultados de cada
+        site assim que ele termina, sem esperar pelo site mais lento.
+
+        Args:
+            termo_busca: O termo a ser pesquisado.
+            sites: Lista opcional de sites (ver buscar_jurisprudencia).
+
+        Yields:
+            Um lote por site concluído, na ordem de conclusão:
+            {"site": nome, "resultados": [...], "status": {...}}, em que status
+            é a entrada do site em ultimo_status_sites. Sites cancelados pelo
+            prazo_total geram um lote vazio com status "prazo_esgotado".
 
-        # Tenta fechar pop-ups de consentimento/login se aparecerem
+        Sites com resultado no cache são entregues primeiro, sem raspagem. Se a
+        entrada já passou do ttl, ela é entregue mesmo assim e o site é
+        pesquisado de novo em segundo plano para atualizar o cache. Com o cache
+        ativo, buscas idênticas simultâneas (inclusive de outros workers) são
+        coalescidas em uma única raspagem por site.
+
+        Os demais sites são procurados no índice local: se a consulta foi
+        raspada há pouco ou o índice já tem limite_resultados resultados, eles
+        são entregues sem raspagem; caso contrário, o site é raspado e os
+        resultados do índice completam os novos.
+        """
+        if sites is None:
+            sites = SITES_SUPORTADOS # Sites padrão conforme especificado
+        # Sites repetidos seriam pesquisados duas vezes
+        sites = list(dict.fromkeys(sites))
+        self.ultimo_status_sites = {site: {"status": "pendente", "resultados": 0, "segundos": 0.0}
+                                    for site in sites}
+        if not sites:
+            return
+
+        cache = self._get_cache()
+        em_cache: Dict[str, List[Dict[str, str]]] = {}
+        for site in sites if cache is not None else []:
+            entrada = await cache.obter(site, termo_busca)
+            if entrada is None:
+                self.ultimo_status_sites[site]["cache"] = "falta"
+                continue
+            em_cache[site], fresco = entrada
+            self.ultimo_status_sites[site].update(status="ok", resultados=len(em_cache[site]),
+                                                  cache="fresco" if fresco else "obsoleto")
+            if not fresco:
+                self._agendar_revalidacao(cache, site, termo_busca)
+
+        indice = self._get_indice()
+        do_indice: Dict[str, List[Dict[str, str]]] = {}
+        for site in sites if indice is not None and not self._forcar_raspagem else []:
+            if site in em_cache or obter_adaptador(site) is None:
+                continue
+            try:
+                resultados_site, estado = await indice.consultar(site, termo_busca, self.limite_resultados)
+            except Exception as e:
+                print(f"Erro ao consultar o índice de jurisprudência: {e}")
+                break
+            self.ultimo_status_sites[site]["indice"] = estado
+            if estado in ("fresco", "suficiente"):
+                em_cache[site] = resultados_site
+                self.ultimo_status_sites[site].update(status="ok", resultados=len(resultados_site))
+            else:
+                do_indice[site] = resultados_site
+
+        pool = self._get_pool()
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+        tarefas = {asyncio.create_task(self._buscar_coalescido(pool, semaforo, cache, site, termo_busca,
+                                                               do_indice.get(site, []))): site
+                   for site in sites if site not in em_cache}
+        prazo = time.monotonic() + self.prazo_total / 1000 if self.prazo_total else None
+        pendentes = set(tarefas)
         try:
-            if await page.locator("button[aria-label='close']").is_visible(timeout=2000):
-                 await page.locator("button[aria-label='close']").click()
-            elif await page.locator("*[data-testid='modal-close-button']").is_visible(timeout=2000):
-                 await page.locator("*[data-testid='modal-close-button']").click()
-        except Exception:
-            pass # Ignora se o pop-up não estiver presente
-
-        # Extrai os resultados
-        # A estrutura do JusBrasil pode mudar, então os seletores podem precisar de ajuste.
-        items = await page.locator("div.search-results_SearchCard__1wsPd").all()
-        if not items:
-             items = await page.locator("div[data-testid='search-result-card']").all()
-
-        for i, item in enumerate(items[:5]): # Limita a 5 resultados por site por enquanto
+            for site, resultados_site in em_cache.items():
+                yield {"site": site, "resultados": resultados_site,
+                       "status": self.ultimo_status_sites[site]}
+            while pendentes:
+                restante = max(prazo - time.monotonic(), 0) if prazo else None
+                concluidas, pendentes = await asyncio.wait(
+                    pendentes, timeout=restante, return_when=asyncio.FIRST_COMPLETED)
+                if not concluidas:
+                    break
+                for tarefa in concluidas:
+                    site = tarefas[tarefa]
+                    yield {"site": site, "resultados": tarefa.result(),
+                           "status": self.ultimo_status_sites[site]}
+
+            for tarefa in pendentes:
+                tarefa.cancel()
+            if pendentes:
+                await asyncio.wait(pendentes)
+            for tarefa in pendentes:
+                site = tarefas[tarefa]
+                self.ultimo_status_sites[site]["status"] = "prazo_esgotado"
+                print(f"Prazo total da busca esgotado antes de concluir {site}.")
+                yield {"site": site, "resultados": [], "status": self.ultimo_status_sites[site]}
+        finally:
+            # Se o consumidor parar antes do fim (ex.: cliente desconectado),
+            # nenhum site fica rodando sozinho
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    def _agendar_revalidacao(self, cache: CacheJurisprudencia, site: str, termo_busca: str) -> None:
+        """
+        Pesquisa o site de novo em segundo plano e grava o resultado no cache.
+        A busca usa uma cópia da ferramenta, para não alterar o
+        ultimo_status_sites desta busca, e não é repetida se a mesma entrada
+        já estiver sendo atualizada.
+        """
+        if not cache.iniciar_atualizacao(site, termo_busca):
+            return
+        revalidador = copy.copy(self)
+        revalidador.usar_cache = False
+        revalidador._forcar_raspagem = True
+        revalidador.ultimo_status_sites = {}
+
+        async def revalidar() -> None:
             try:
-                titulo_element = item.locator("h2 a, a h2, a[data-testid='search-result-card-title']")
-                titulo = await titulo_element.inner_text()
-                link = await titulo_element.get_attribute("href")
-                if link and not link.startswith("http"):
-                    link = f"https://www.jusbrasil.com.br{link}"
-                
-                resumo_element = item.locator("div.DocumentSnippet, p[data-testid='search-result-card-snippet']")
-                resumo = await resumo_element.inner_text() if await resumo_element.count() > 0 else "Resumo não disponível"
-                
-                # Data e fonte podem ser mais complexos de extrair de forma consistente
-                data_publicacao = "Não informado"
+                resultados_site = await revalidador.buscar_jurisprudencia(termo_busca, [site])
+                if revalidador.ultimo_status_sites[site]["status"] == "ok":
+                    await cache.salvar(site, termo_busca, resultados_site)
+            except Exception as e:
+                print(f"Erro ao atualizar o cache de {site}: {e}")
+            finally:
+                cache.concluir_atualizacao(site, termo_busca)
+
+        tarefa = asyncio.create_task(revalidar())
+        _revalidacoes.add(tarefa)
+        tarefa.add_done_callback(_revalidacoes.discard)
+
+    async def _buscar_coalescido(self, pool: PoolNavegador, semaforo: asyncio.Semaphore,
+                                 cache: Optional[CacheJurisprudencia], site: str, termo_busca: str,
+                                 anteriores: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        """
+        Busca em um site e grava o resultado no índice e no cache, coalescendo
+        buscas idênticas simultâneas (CacheJurisprudencia.coalescer): se a
+        mesma busca já estiver em andamento neste processo ou em outro worker,
+        aguarda o resultado dela em vez de raspar de novo. O status copiado da
+        busca aguardada recebe "coalescida" ("local" ou "worker").
+
+        anteriores são os resultados do índice para o site: completam os da
+        raspagem até limite_resultados, ou os substituem se ela falhar.
+        """
+        status = self.ultimo_status_sites[site]
+        indice = self._get_indice()
+
+        async def raspar() -> Tuple[List[Dict[str, str]], Dict[str, object]]:
+            resultados_site = await self._buscar_site(pool, semaforo, site, termo_busca)
+            if status["status"] != "ok":
+                if anteriores:
+                    resultados_site = list(anteriores)
+                    status["resultados"] = len(resultados_site)
+                return resultados_site, copy.deepcopy(status)
+            if indice is not None:
+                try:
+                    await indice.inserir(site, termo_busca, resultados_site)
+                except Exception as e:
+                    print(f"Erro ao gravar no índice de jurisprudência: {e}")
+                if anteriores:
+                    resultados_site = mesclar_resultados(resultados_site, anteriores, self.limite_resultados)
+                    status["resultados"] = len(resultados_site)
+            if cache is not None:
+                await cache.salvar(site, termo_busca, resultados_site)
+            return resultados_site, copy.deepcopy(status)
+
+        if cache is None:
+            return (await raspar())[0]
+        (resultados_site, status_raspagem), origem = await cache.coalescer(site, termo_busca, raspar)
+        if origem != "raspagem":
+            status.update(copy.deepcopy(status_raspagem), coalescida=origem)
+            resultados_site = [dict(resultado) for resultado in resultados_site]
+        return resultados_site
+
+    def metricas_rede(self) -> Dict[str, int]:
+        """Totais de rede da última busca, somando os sites: requisições bloqueadas e permitidas e bytes recebidos."""
+        totais = {"bloqueadas": 0, "permitidas": 0, "bytes_recebidos": 0}
+        for status in self.ultimo_status_sites.values():
+            for chave in totais:
+                totais[chave] += status.get("rede", {}).get(chave, 0)
+        return totais
+
+    def estado_sites(self) -> Dict[str, Dict[str, object]]:
+        """
+        Estado dos adaptadores dos sites, compartilhado por todas as instâncias
+        da ferramenta no processo: disjuntor ("fechado", "aberto" ou
+        "meio_aberto"), histograma de latências e contadores.
+        """
+        return estado_adaptadores()
+
+    async def _buscar_site(self, pool: PoolNavegador, semaforo: asyncio.Semaphore,
+                           site: str, termo_busca: str) -> List[Dict[str, str]]:
+        """
+        Busca em um único site pelo seu adaptador (adaptadores_jurisprudencia),
+        respeitando o limite de concorrência da ferramenta, as proteções do
+        adaptador (buscas simultâneas, limite de taxa e disjuntor) e o
+        timeout_site. Erros são registrados em ultimo_status_sites e no
+        disjuntor do adaptador em vez de interromper a busca nos demais sites.
+        """
+        status = self.ultimo_status_sites[site]
+        adaptador = obter_adaptador(site)
+        if adaptador is None:
+            print(f"Site não suportado: {site}")
+            status["status"] = "nao_suportado"
+            return []
+        if not adaptador.disjuntor.permitir():
+            # Site falhando seguidamente: recusa na hora em vez de esperar o timeout
+            reabre = adaptador.disjuntor.segundos_para_reabrir()
+            print(f"Disjuntor de {site} aberto; busca recusada.")
+            status.update(status="circuito_aberto", erro=f"Site indisponível; nova tentativa em {reabre:.0f} s")
+            return []
+
+        sucesso: Optional[bool] = None
+        try:
+            async with semaforo, adaptador.semaforo():
+                status["espera_taxa_segundos"] = await adaptador.limitador.aguardar()
+                adaptador.em_uso += 1
+                inicio = time.perf_counter()
                 try:
-                    data_element = item.locator("span.BaseSnippetWrapper-publish-date, time")
-                    if await data_element.count() > 0:
-                        data_publicacao = await data_element.first.inner_text()
-                except Exception:
-                    pass
-
-                resultados.append({
-                    "titulo": titulo.strip(),
-                    "link": link.strip() if link else "",
-                    "resumo": resumo.strip(),
-                    "fonte": "JusBrasil",
-                    "data_publicacao": data_publicacao.strip()
-                })
+                    resultados_site = await asyncio.wait_for(
+                        self._executar_adaptador(pool, adaptador, termo_busca), timeout=self.timeout_site / 1000)
+                    sucesso = True
+                    status.update(status="ok", resultados=len(resultados_site))
+                    return resultados_site
+                except asyncio.TimeoutError:
+                    sucesso = False
+                    print(f"Tempo limite atingido ao buscar em {site}.")
+                    status.update(status="timeout", erro=f"Sem resposta em {self.timeout_site} ms")
+                    return []
+                except Exception as e:
+                    sucesso = False
+                    print(f"Erro ao buscar em {site}: {e}")
+                    status.update(status="erro", erro=str(e))
+                    return []
+                finally:
+                    status["segundos"] = time.perf_counter() - inicio
+                    adaptador.em_uso -= 1
+        finally:
+            if sucesso is None:
+                # Cancelada (prazo_total ou cliente desconectado): não conta como falha
+                adaptador.disjuntor.cancelar()
+            else:
+                adaptador.registrar_resultado(sucesso, status["segundos"])
+
+    async def _executar_adaptador(self, pool: PoolNavegador, adaptador: AdaptadorSite,
+                                  termo_busca: str) -> List[Dict[str, str]]:
+        """
+        Busca pelo caminho HTTP quando o adaptador dispensa o navegador; se a
+        requisição falhar e o adaptador também souber buscar pelo navegador,
+        tenta de novo com ele.
+        """
+        status = self.ultimo_status_sites[adaptador.nome]
+        if self.usar_http and not adaptador.requer_navegador:
+            status["via"] = "http"
+            try:
+                cliente = self.replay.cliente_http(adaptador.nome) if self.replay else obter_cliente_http()
+                return await adaptador.buscar_http(self, cliente, termo_busca)
             except Exception as e:
-                print(f"Erro ao processar item do JusBrasil: {e}")
-        print(f"Encontrados {len(resultados)} resultados no JusBrasil.")
-        return resultados
-
-    async def _buscar_stf(self, page: Page, termo_busca: str) -> List[Dict[str, str]]:
-        """Busca jurisprudência no STF."""
-        print(f"Buscando '{termo_busca}' no STF...")
-        resultados: List[Dict[str, str]] = []
-        # URL e seletores específicos para o STF
-        # Exemplo: https://jurisprudencia.stf.jus.br/pages/search?base=acordaos&sinonimo=true&plural=true&page=1&pageSize=10&queryString={termo_busca}
-        # Esta parte precisará de implementação detalhada dos seletores corretos para o STF.
-        await page.goto(f"https://portal.stf.jus.br/jurisprudencia/pesquisarJurisprudencia.asp", timeout=self.timeout)
-        await page.fill("input[name='pesquisa']", termo_busca)
-        await page.press("input[name='pesquisa']", "Enter")
-        await page.wait_for_timeout(3000)
-        # ... lógica de extração para STF
-        print(f"Busca no STF ainda não implementada em detalhes.")
-        return resultados
-
-    async def _buscar_stj(self, page: Page, termo_busca: str) -> List[Dict[str, str]]:
-        """Busca jurisprudência no STJ."""
-        print(f"Buscando '{termo_busca}' no STJ...")
-        resultados: List[Dict[str, str]] = []
-        # URL e seletores específicos para o STJ
-        # Exemplo: https://scon.stj.jus.br/SCON/pesquisar.jsp?NOME_USUARIO=&ACAO=PESQUISAR&novaConsulta=true&i=1&OPERADOR_E_OU=AND&tipoPesquisa=&chkOrgao=&DATA_JULGAMENTO_INI=&DATA_JULGAMENTO_FIM=&obj_TEXTO=&ementa=&hide=&p={termo_busca}
-        # Esta parte precisará de implementação detalhada dos seletores corretos para o STJ.
-        await page.goto(f"https://scon.stj.jus.br/SCON/", timeout=self.timeout)
-        await page.fill("textarea[name='pesquisaLivre']", termo_busca)
-        await page.click("input[name='imgBotao']") # Botão de pesquisa
-        await page.wait_for_timeout(3000)
-        # ... lógica de extração para STJ
-        print(f"Busca no STJ ainda não implementada em detalhes.")
-        return resultados
-
-    async def _buscar_tjmg(self, page: Page, termo_busca: str) -> List[Dict[str, str]]:
-        """Busca jurisprudência no TJMG."""
-        print(f"Buscando '{termo_busca}' no TJMG...")
-        resultados: List[Dict[str, str]] = []
-        # URL e seletores específicos para o TJMG
-        # Exemplo: https://jurisprudencia.tjmg.jus.br/jurisprudencia/pesquisaPalavrasGerarInteiro Teor.do?numeroRegistro=1&paginaNumero=1&linhasPorPagina=10&palavras={termo_busca}
-        # Esta parte precisará de implementação detalhada dos seletores corretos para o TJMG.
-        await page.goto(f"https://www5.tjmg.jus.br/jurisprudencia/pesquisaJurisprudenciaPrimeiraInstancia.do", timeout=self.timeout)
-        # O TJMG pode ter um formulário mais complexo
-        await page.fill("input[name='palavras']", termo_busca)
-        await page.click("input[name='pesquisar']")
-        await page.wait_for_timeout(3000)
-        # ... lógica de extração para TJMG
-        print(f"Busca no TJMG ainda não implementada em detalhes.")
-        return resultados
+                if not adaptador.tem_busca_navegador():
+                    raise
+                print(f"Busca HTTP em {adaptador.nome} falhou ({e}); usando o navegador.")
+                status["erro_http"] = str(e)
+        status["via"] = "navegador"
+        return await self._buscar_com_pool(pool, adaptador, termo_busca)
+
+    async def _buscar_com_pool(self, pool: PoolNavegador, adaptador: AdaptadorSite,
+                               termo_busca: str) -> List[Dict[str, str]]:
+        """Empresta um contexto do site no pool e faz a busca em uma página nova."""
+        async with pool.contexto(adaptador.nome) as context:
+            page = await context.new_page()
+            self.ultimo_status_sites[adaptador.nome]["rede"] = await self._preparar_rede(page, adaptador)
+            return await adaptador.buscar(self, page, termo_busca)
+
+    async def _preparar_rede(self, page: Page, adaptador: AdaptadorSite) -> Dict[str, object]:
+        """
+        Instala o bloqueio de recursos do modo enxuto na página (perfil de rede
+        do adaptador: domínios próprios e tipos de recurso liberados) e a
+        contagem do tráfego. Retorna o dicionário de métricas, atualizado durante a busca:
+        requisições bloqueadas (total e por motivo: tipo de recurso ou
+        "terceiros"), requisições permitidas e bytes recebidos (Content-Length
+        das respostas). Com replay, as requisições permitidas são atendidas
+        por ele em vez de irem para a rede.
+        """
+        metricas: Dict[str, object] = {"bloqueadas": 0, "bloqueadas_por_motivo": {},
+                                       "permitidas": 0, "bytes_recebidos": 0}
+
+        def contar_resposta(response) -> None:
+            tamanho = response.headers.get("content-length")
+            if tamanho and tamanho.isdigit():
+                metricas["bytes_recebidos"] += int(tamanho)
+
+        page.on("response", contar_resposta)
+        replay = self.replay
+        if not self.modo_enxuto:
+            if replay is not None:
+                async def reproduzir(route: Route) -> None:
+                    await replay.atender(route, adaptador.nome)
+
+                await page.route("**/*", reproduzir)
+            return metricas
+
+        dominios = adaptador.dominios
+        tipos_bloqueados = TIPOS_RECURSO_BLOQUEADOS - set(adaptador.tipos_permitidos)
+
+        async def rotear(route: Route) -> None:
+            request = route.request
+            host = urlsplit(request.url).hostname or ""
+            terceiro = bool(dominios) and not any(host == d or host.endswith("." + d) for d in dominios)
+            if terceiro or request.resource_type in tipos_bloqueados:
+                motivo = "terceiros" if terceiro else request.resource_type
+                metricas["bloqueadas"] += 1
+                metricas["bloqueadas_por_motivo"][motivo] = metricas["bloqueadas_por_motivo"].get(motivo, 0) + 1
+                await route.abort()
+            else:
+                metricas["permitidas"] += 1
+                if replay is not None:
+                    await replay.atender(route, adaptador.nome)
+                else:
+                    await route.continue_()
+
+        await page.route("**/*", rotear)
+        return metricas
 
 async def main_test():
     tool = JurisprudenciaTool(headless=True) # Mude para False para ver o navegador
@@ -0,0 +1,152 @@
+# normalizador_consulta.py
+
+"""
+Forma canônica dos termos de busca de jurisprudência.
+"Homicídio qualificado", "homicidio  qualificado" e "qualificado homicídio"
+são a mesma pesquisa, mas como textos diferentes erravam o cache e disparavam
+novas raspagens. A forma canônica expande abreviações jurídicas, remove
+acentos, caixa e stopwords, reduz cada palavra a um radical simples (plural e
+vogal final) e ordena os termos. Ela serve apenas de chave (cache, índice,
+histórico); a busca nos sites continua usando o termo digitado.
+"""
+
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, List
+
+# Abreviações expandidas antes da remoção de stopwords (chaves em minúsculas,
+# sem o ponto final). São comparadas com a palavra antes da remoção dos
+# acentos: "RE" é recurso extraordinário, mas "ré" continua sendo a ré.
+ABREVIACOES: Dict[str, str] = {
+    "art": "artigo",
+    "arts": "artigo",
+    "inc": "inciso",
+    "par": "paragrafo",
+    "cp": "codigo penal",
+    "cpp": "codigo processo penal",
+    "cf": "constituicao federal",
+    "crfb": "constituicao federal",
+    "ctb": "codigo transito brasileiro",
+    "eca": "estatuto crianca adolescente",
+    "lep": "lei execucao penal",
+    "hc": "habeas corpus",
+    "resp": "recurso especial",
+    "re": "recurso extraordinario",
+}
+
+# Palavras sem valor de busca. "nao" e "sem" ficam de fora de propósito:
+# "com justa causa" e "sem justa causa" são pesquisas diferentes.
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de do dos e em entre na nas no nos
+o os ou para pela pelas pelo pelos por que se sob sobre um uma umas uns
+""".split())
+
+# Sufixos de plural e sua forma no singular, do mais longo para o mais curto
+_PLURAIS = (("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+            ("res", "r"), ("zes", "z"), ("ns", "m"), ("s", ""))
+# Tamanho mínimo da palavra para aplicar a redução ao radical
+_TAMANHO_MINIMO_RADICAL = 4
+
+_RE_ORDINAL = re.compile(r"(\d+)\s*[ºª°]")
+_RE_TOKEN = re.compile(r"[a-z0-9]+")
+# Palavra ainda com acentos (letras e dígitos de qualquer alfabeto)
+_RE_PALAVRA = re.compile(r"[^\W_]+")
+
+
+def remover_acentos(texto: str) -> str:
+    """Remove os acentos (decomposição NFKD sem as marcas combinantes)."""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def radical(palavra: str) -> str:
+    """
+    Reduz uma palavra (já sem acento) a um radical leve: remove o plural e a
+    vogal final, de modo que "qualificado", "qualificada" e "qualificados"
+    tenham a mesma forma. Números e palavras curtas são mantidos.
+    """
+    if palavra.isdigit() or len(palavra) <= _TAMANHO_MINIMO_RADICAL:
+        return palavra
+    for sufixo, singular in _PLURAIS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 2:
+            palavra = palavra[:-len(sufixo)] + singular
+            break
+    if palavra[-1] in "aeo" and len(palavra) > _TAMANHO_MINIMO_RADICAL:
+        palavra = palavra[:-1]
+    return palavra
+
+
+def radicais(texto: str) -> List[str]:
+    """
+    Reduz um texto aos radicais das suas palavras, na ordem e com repetições:
+    expande as abreviações, remove acentos, caixa e stopwords e aplica radical.
+    É a mesma redução dos termos de busca, usada também no texto indexado.
+    """
+    texto = _RE_ORDINAL.sub(r"\1", texto).replace("§", " paragrafo ").lower()
+    termos = []
+    for palavra_original in _RE_PALAVRA.findall(texto):
+        expandida = ABREVIACOES.get(palavra_original) or remover_acentos(palavra_original)
+        for palavra in _RE_TOKEN.findall(expandida):
+            if palavra not in STOPWORDS:
+                termos.append(radical(palavra))
+    return termos
+
+
+def termos_canonicos(consulta: str) -> List[str]:
+    """
+    Retorna os termos canônicos da consulta, ordenados e sem repetição.
+
+    Args:
+        consulta: Termo de busca como digitado.
+
+    Returns:
+        Lista de radicais (ver canonizar_consulta).
+    """
+    return sorted(set(radicais(consulta)))
+
+
+def canonizar_consulta(consulta: str) -> str:
+    """
+    Gera a forma canônica de uma consulta, estável para uso como chave de
+    cache e de deduplicação.
+
+    Exemplo: "Homicídio qualificado" e "qualificado  homicidio" resultam em
+    "homicidi qualificad"; "art. 157 do CP" em "157 artig codig penal".
+
+    Args:
+        consulta: Termo de busca como digitado.
+
+    Returns:
+        Termos canônicos separados por espaço (string vazia se nada restar).
+    """
+    return " ".join(termos_canonicos(consulta))
+
+
+def comparar_taxas_acerto(consultas: Iterable[str],
+                          chave: Callable[[str], str] = canonizar_consulta) -> Dict[str, float]:
+    """
+    Mede quanto a forma canônica aumenta a taxa de acerto de um cache sobre
+    uma sequência de consultas (por exemplo, o histórico de pesquisas): uma
+    consulta acerta se a mesma chave já apareceu antes. Compara o termo
+    literal com a chave informada, considerando um cache sem expiração.
+
+    Returns:
+        {"consultas": n, "taxa_acerto_literal": x, "taxa_acerto_canonica": y,
+         "chaves_literais": a, "chaves_canonicas": b}
+    """
+    vistos_literais, vistos_canonicos = set(), set()
+    total = acertos_literais = acertos_canonicos = 0
+    for consulta in consultas:
+        total += 1
+        literal, canonica = consulta.strip(), chave(consulta)
+        acertos_literais += literal in vistos_literais
+        acertos_canonicos += canonica in vistos_canonicos
+        vistos_literais.add(literal)
+        vistos_canonicos.add(canonica)
+    return {
+        "consultas": total,
+        "taxa_acerto_literal": acertos_literais / total if total else 0.0,
+        "taxa_acerto_canonica": acertos_canonicos / total if total else 0.0,
+        "chaves_literais": len(vistos_literais),
+        "chaves_canonicas": len(vistos_canonicos),
+    }
@@ -0,0 +1,135 @@
+# ocr_engine.py
+
+"""
+Motores de OCR usados pelo ParserPDF.
+O pytesseract executa um processo `tesseract` por página e recarrega o modelo
+do idioma a cada chamada. O tesserocr usa a API C do Tesseract no próprio
+processo: o modelo é carregado uma vez e a instância é reaproveitada em todas
+as páginas processadas por aquela thread.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+OCR_BACKENDS = ('pytesseract', 'tesserocr')
+
+# Motores já criados, por thread e por (backend, idioma). A PyTessBaseAPI do
+# tesserocr guarda a imagem da página em andamento e não aceita uso
+# simultâneo, então cada thread (as do servidor, no modo sequencial) tem a
+# sua; nos processos do pool de OCR há uma só thread e o modelo do idioma é
+# carregado uma única vez.
+_engines = threading.local()
+
+
+class PytesseractEngine:
+    """Um processo `tesseract` por página (comportamento original do parser)."""
+
+    def __init__(self, lang: str):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.lang = lang
+
+    def image_to_string(self, image, timeout: float = 0) -> str:
+        """
+        Aplica OCR em uma imagem PIL.
+
+        Args:
+            image: Imagem da página.
+            timeout: Tempo máximo em segundos (0 = sem limite). O processo do
+                     tesseract é encerrado ao estourar, com RuntimeError.
+        """
+        return self.pytesseract.image_to_string(image, lang=self.lang, timeout=timeout)
+
+    def image_to_text_confidence(self, image, timeout: float = 0) -> Tuple[str, Optional[float]]:
+        """
+        Aplica OCR e retorna o texto junto com a confiança média das palavras
+        (0 a 100), com uma única execução do tesseract (image_to_data). O texto
+        é remontado a partir das palavras, uma linha por linha reconhecida e
+        parágrafos separados por linha em branco.
+
+        Returns:
+            Tupla (texto, confiança média ou None se nenhuma palavra foi lida).
+        """
+        data = self.pytesseract.image_to_data(image, lang=self.lang, timeout=timeout,
+                                              output_type=self.pytesseract.Output.DICT)
+        lines: Dict[Tuple[int, int, int], List[str]] = {}
+        confidences: List[float] = []
+        for word, conf, block, par, line in zip(data['text'], data['conf'], data['block_num'],
+                                                data['par_num'], data['line_num']):
+            if not str(word).strip():
+                continue
+            lines.setdefault((block, par, line), []).append(str(word))
+            if float(conf) >= 0:
+                confidences.append(float(conf))
+
+        parts = []
+        previous = None
+        for (block, par, line), words in lines.items():
+            if previous is not None:
+                parts.append("\n" if previous == (block, par) else "\n\n")
+            parts.append(" ".join(words))
+            previous = (block, par)
+        confidence = sum(confidences) / len(confidences) if confidences else None
+        return "".join(parts), confidence
+
+
+class TesserocrEngine:
+    """Instância persistente da API C do Tesseract, com o modelo já carregado."""
+
+    def __init__(self, lang: str):
+        import tesserocr
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+        self.lang = lang
+
+    def image_to_string(self, image, timeout: float = 0) -> str:
+        """
+        Aplica OCR em uma imagem PIL. A API em processo não pode ser
+        interrompida no meio de uma página, por isso o timeout é ignorado; o
+        prazo do documento é verificado antes de renderizar e antes do OCR de
+        cada página, no processo atual e nos do pool (ver _ocr_page_worker).
+        """
+        self.api.SetImage(image)
+        return self.api.GetUTF8Text()
+
+    def image_to_text_confidence(self, image, timeout: float = 0) -> Tuple[str, Optional[float]]:
+        """Aplica OCR e retorna (texto, confiança média das palavras de 0 a 100)."""
+        self.api.SetImage(image)
+        text = self.api.GetUTF8Text()
+        return text, float(self.api.MeanTextConf()) if text.strip() else None
+
+
+def backend_available(backend: str) -> bool:
+    """Indica se o pacote Python do backend está instalado."""
+    try:
+        __import__(backend)
+    except ImportError:
+        return False
+    return True
+
+
+def get_ocr_engine(backend: str, lang: str):
+    """
+    Retorna o motor de OCR desta thread para o backend e idioma, criando-o
+    na primeira chamada.
+
+    Args:
+        backend: 'pytesseract' ou 'tesserocr'.
+        lang: Idioma(s) do Tesseract.
+
+    Returns:
+        Instância de PytesseractEngine ou TesserocrEngine.
+    """
+    engines: Optional[Dict[Tuple[str, str], object]] = getattr(_engines, 'por_chave', None)
+    if engines is None:
+        engines = _engines.por_chave = {}
+    key = (backend, lang)
+    engine = engines.get(key)
+    if engine is None:
+        if backend == 'tesserocr':
+            engine = TesserocrEngine(lang)
+        elif backend == 'pytesseract':
+            engine = PytesseractEngine(lang)
+        else:
+            raise ValueError(f"Backend de OCR desconhecido: {backend}")
+        engines[key] = engine
+    return engine
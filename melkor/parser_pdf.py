@@ -6,21 +6,563 @@ Este módulo é responsável por processar arquivos PDF de denúncias,
 extrair seu conteúdo textual e preparar os dados para análise.
 """
 
+import contextlib
+import hashlib
+import io
+import mmap
 import os
 import re
+import subprocess
+import time
 import PyPDF2
-from typing import Dict, List, Optional, Tuple, Union
+from PyPDF2.generic import IndirectObject
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from melkor.cache_pdf import CachePDF, sha256_arquivo
+from melkor.image_preprocess import NUMPY_AVAILABLE, PREPROCESS_TARGET_DPI, preprocess_page
+from melkor.ocr_engine import OCR_BACKENDS, backend_available, get_ocr_engine
+
+# Formas aceitas de entregar um PDF ao parser: caminho em disco, bytes,
+# arquivo mapeado em memória ou objeto de arquivo (ex.: upload do Django).
+PDFInput = Union[str, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+# Uma página com menos caracteres úteis que isso na camada de texto é tratada
+# como digitalizada (somente imagem) e enviada ao OCR.
+MIN_PAGE_CHARS = 50
+# Proporção mínima de letras/dígitos entre os caracteres não brancos. Abaixo
+# disso, a camada de texto é considerada lixo (fontes sem mapeamento, "(cid:12)").
+MIN_PAGE_ALNUM_RATIO = 0.6
+# Versão das regras de _clean_text. Faz parte da chave do cache: alterar a
+# limpeza exige incrementar este número para invalidar os textos já gravados.
+CLEAN_VERSION = 2
+# Resolução usada para renderizar páginas (mesmo padrão do pdf2image)
+RENDER_DPI = 200
+# Confiança média (0 a 100) abaixo da qual o OCR adaptativo renderiza a página
+# de novo na resolução maior (ocr_escalation_dpi)
+OCR_MIN_CONFIDENCE = 70.0
+
+# Buffer do PDF nos processos do pool quando a entrada não é um caminho.
+# É recebido uma única vez por processo, em _init_ocr_worker.
+_worker_pdf_buffer: Optional[bytes] = None
+
+# Limpeza de texto (_clean_text) em uma única passada. Os cabeçalhos de linha
+# consomem o espaço em branco anterior, para que a remoção não deixe espaços
+# duplicados; os demais trechos de espaço viram um único espaço.
+_CLEAN_RE = re.compile(r"""
+    (?P<drop>
+        (?:\A|\s*\n)[ \t]*
+        (?:MINISTÉRIO\ PÚBLICO\ DO\ ESTADO\ DE[^\n]*
+          |PROMOTORIA\ DE\ JUSTIÇA[^\n]*
+          |\d+[ \t]*(?=\n|\Z))                  # número de página isolado
+      | [ \t]*Página\ \d+\ de\ \d+
+      | [ \t]*Documento\ assinado\ digitalmente[^\n]*
+      | [ \t]*www\.\S+?\.jus\.br
+    )
+  | \s{2,}|[^\S ]                               # espaço que precisa ser normalizado
+""", re.VERBOSE)
+
+
+def _clean_replacement(match: "re.Match") -> str:
+    return '' if match.lastgroup == 'drop' else ' '
+
+
+# Extração de entidades (extract_structured_info). Cada regra associa uma
+# palavra-gatilho a uma cauda aplicada logo após ela. Gatilho + cauda
+# reproduzem exatamente as expressões anteriores (ver
+# benchmark_parser_pdf._legacy_extract_structured_info).
+_NAME = r'([^,;\n\.]+)'
+_LOCAL = r'[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})'
+_MONTHS = r'(?:janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)'
+
+# (campo, gatilhos, cauda, prioridade). Os gatilhos são palavras literais em
+# minúsculas. Para data e local vale a regra de menor prioridade que encontrar
+# algo; as demais acumulam todos os valores.
+_EXTRACTION_RULES = [
+    ('reus', ['denunciado', 'denunciados'], r':?\s*' + _NAME, 0),
+    ('reus', ['acusado', 'acusados'], r':?\s*' + _NAME, 0),
+    ('reus', ['réu', 'réus'], r':?\s*' + _NAME, 0),
+    ('vitimas', ['vítima', 'vítimas'], r':?\s*' + _NAME, 0),
+    ('vitimas', ['ofendido', 'ofendidos'], r':?\s*' + _NAME, 0),
+    ('crimes', ['crime', 'crimes'], r' (?:de|do|da)?\s*' + _NAME, 0),
+    ('crimes', ['delito', 'delitos'], r' (?:de|do|da)?\s*' + _NAME, 0),
+    ('crimes', ['art', 'artigo'], r'[\.:]?\s*(\d+)[^\d]+(?:do|da)\s*(?:CP|Código Penal)', 0),
+    ('data_fato', ['em', 'no dia', 'na data de', 'datado de'], r'\s*(\d{1,2}/\d{1,2}/\d{2,4})', 0),
+    ('data_fato', ['em', 'no dia', 'na data de', 'datado de'],
+     r'\s*(\d{1,2}\s+de\s+' + _MONTHS + r'\s+de\s+\d{2,4})', 1),
+    ('local_fato', ['ocorrido', 'ocorrida', 'ocorreram', 'aconteceu', 'sucedeu', 'deu-se'], _LOCAL, 0),
+    ('local_fato', ['local', 'lugar', 'endereço'], _LOCAL, 1),
+    ('testemunhas', ['testemunha', 'testemunhas'], r':?\s*' + _NAME, 0),
+    ('testemunhas', ['ouvir', 'ouvido', 'depoimento de'], r'\s*' + _NAME, 0),
+]
+_LIST_FIELDS = ('reus', 'vitimas', 'crimes', 'testemunhas')
+# Fim de um trecho sem pontuação, o alcance da parte [^,;\.]* de _LOCAL
+_RUN_END_RE = re.compile(r'[,;\.]')
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Monta uma expressão em forma de árvore de prefixos para as palavras dadas
+    (ex.: "d(?:elitos?|enunciados?)"). Em cada posição o motor de regex testa
+    no máximo um ramo por caractere, em vez de todas as palavras.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Quantificador guloso: a palavra mais longa tem precedência ("crimes" sobre "crime")
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def _compile_extraction_rules() -> Tuple["re.Pattern", Dict[str, List[Tuple[int, str, "re.Pattern", int]]],
+                                        Dict[str, List[str]]]:
+    """
+    Indexa as regras por palavra-gatilho e monta a expressão única de gatilhos,
+    aplicada sobre o texto em minúsculas, e, para cada gatilho, os gatilhos
+    que são prefixos dele, do mais longo para o mais curto.
+    """
+    rules: Dict[str, List[Tuple[int, str, "re.Pattern", int]]] = {}
+    for rule_id, (field, triggers, tail, priority) in enumerate(_EXTRACTION_RULES):
+        compiled = re.compile(tail, re.IGNORECASE)
+        for trigger in triggers:
+            rules.setdefault(trigger, []).append((rule_id, field, compiled, priority))
+    # O lookahead não consome o texto: um gatilho dentro de outro (ex.: o
+    # "denunciado" em "depoimento denunciado") continua sendo encontrado.
+    trigger_re = re.compile(f"(?=({_trie_pattern(list(rules))}))")
+    # A expressão de gatilhos só devolve o mais longo ("denunciados"); as
+    # expressões antigas retrocediam para o mais curto ("denunciado") quando a
+    # cauda falhava, e a extração faz o mesmo
+    prefixes = {word: sorted((t for t in rules if word.startswith(t)), key=len, reverse=True) for word in rules}
+    return trigger_re, rules, prefixes
+
+
+_TRIGGER_RE, _TRIGGER_RULES, _TRIGGER_PREFIXES = _compile_extraction_rules()
+
+# Seções padrão de uma denúncia, na ordem usual, com as expressões (em
+# minúsculas) que costumam abrir cada uma. Vale a primeira ocorrência.
+SECTION_MARKERS = {
+    'qualificacao': ['em face de', 'qualificação do denunciado', 'qualificação dos denunciados',
+                     'da qualificação'],
+    'narrativa': ['pela prática do seguinte fato', 'pela prática dos seguintes fatos', 'dos fatos',
+                  'consta dos autos', 'consta do incluso', 'narram os autos', 'segundo apurado'],
+    'capitulacao': ['da capitulação', 'diante do exposto', 'ante o exposto', 'assim agindo',
+                    'incurso nas penas', 'incursos nas penas'],
+    'rol_testemunhas': ['rol de testemunhas', 'rol das testemunhas'],
+    'pedidos': ['dos pedidos', 'requer-se', 'requer o ministério público', 'pede-se'],
+}
+# Seções em que cada campo de extract_structured_info é procurado. Se nenhuma
+# delas for encontrada no texto, o campo é procurado no documento inteiro.
+FIELD_SECTIONS = {
+    'reus': ('qualificacao', 'narrativa', 'capitulacao'),
+    'vitimas': ('narrativa',),
+    'crimes': ('narrativa', 'capitulacao'),
+    'data_fato': ('narrativa',),
+    'local_fato': ('narrativa',),
+    'testemunhas': ('narrativa', 'rol_testemunhas'),
+}
+_SECTION_BY_MARKER = {marker: name for name, markers in SECTION_MARKERS.items() for marker in markers}
+_SECTION_RE = re.compile(f"({_trie_pattern(list(_SECTION_BY_MARKER))})")
+# Sem um marcador de narrativa (muitas denúncias não têm o título "dos
+# fatos"), ela começa na primeira frase após a qualificação que abre o relato
+# de um fato: "No dia 10...", "Em 13/04/2016...", "Consta que..."
+_NARRATIVE_OPENING_RE = re.compile(
+    r"(?:^|[\.:;\n])\s*(no dia\b|na data de\b|na noite\b|na madrugada\b|na manhã\b|na tarde\b"
+    r"|em \d{1,2}(?:/|º?\s+de\s)|consta\b)")
+
+
+def _lowercase_aligned(text: str) -> str:
+    """
+    Minúsculas com as mesmas posições do texto original. "İ" é o único
+    caractere cuja minúscula muda de tamanho; trocá-lo mantém o alinhamento.
+    """
+    return text.replace('İ', 'I').lower()
+
+
+def _init_ocr_worker(buffer: Optional[bytes], options: Dict[str, object]) -> None:
+    """
+    Inicializador dos processos do pool: guarda o buffer do PDF (se houver) e
+    carrega o motor de OCR antes da primeira página.
+    """
+    global _worker_pdf_buffer
+    _worker_pdf_buffer = buffer
+    get_ocr_engine(options['backend'], options['lang'])
+
+
+def _render_page(source: Union[str, bytes, mmap.mmap], page_num: int, dpi: int = RENDER_DPI):
+    """
+    Renderiza uma única página do PDF como imagem PIL na resolução `dpi`.
+
+    Para caminhos usa o pdf2image. Para buffers, o pdftoppm recebe o PDF pela
+    entrada padrão e devolve a página em PNG pela saída padrão; o
+    convert_from_bytes do pdf2image gravaria um arquivo temporário.
+    """
+    if isinstance(source, str):
+        from pdf2image import convert_from_path
+        images = convert_from_path(source, dpi=dpi, first_page=page_num, last_page=page_num)
+        return images[0] if images else None
+
+    from PIL import Image
+    result = subprocess.run(
+        ['pdftoppm', '-f', str(page_num), '-l', str(page_num), '-r', str(dpi), '-png', '-'],
+        input=source, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+    )
+    return Image.open(io.BytesIO(result.stdout)) if result.stdout else None
+
+
+def _ocr_page_worker(source: Union[str, bytes, mmap.mmap, None], page_num: int,
+                     options: Dict[str, object],
+                     deadline: Optional[float]) -> Tuple[int, str, float, Dict[str, object]]:
+    """
+    Renderiza e aplica OCR em uma única página. Executado nos processos do pool,
+    por isso fica no nível do módulo (precisa ser serializável via pickle).
+
+    Com options['escalation_dpi'] (OCR adaptativo), a página é lida primeiro
+    em options['dpi']; se a confiança média das palavras ficar abaixo de
+    options['min_confidence'], ela é renderizada de novo na resolução maior e
+    prevalece o resultado mais confiável.
+
+    O prazo do documento é verificado antes de cada renderização e antes de
+    cada OCR: páginas que começam (ou chegam ao OCR) depois dele falham com
+    TimeoutError, em vez de ocupar o processo depois que o parser desistiu.
+
+    Args:
+        source: Caminho ou buffer do PDF. None usa o buffer recebido pelo
+                processo em _init_ocr_worker.
+        page_num: Número da página (começando em 1).
+        options: Opções de OCR do parser (ver ParserPDF._ocr_options).
+        deadline: Instante (time.time()) limite para o documento, ou None.
+
+    Returns:
+        Tupla (page_num, texto, segundos gastos na página, detalhes), em que
+        detalhes traz 'dpi', 'confidence' e 'escalated'.
+    """
+    _check_deadline(deadline)
+    engine = get_ocr_engine(options['backend'], options['lang'])
+    source = _worker_pdf_buffer if source is None else source
+    adaptive = options['escalation_dpi'] is not None
+    inicio = time.perf_counter()
+
+    text, confidence = _ocr_render_pass(engine, source, page_num, options['dpi'],
+                                        options['target_dpi'], deadline, adaptive)
+    details = {'dpi': options['dpi'], 'confidence': confidence, 'escalated': False}
+    if adaptive and (confidence is None or confidence < options['min_confidence']) \
+            and not (deadline and time.time() >= deadline):
+        # Na passada de alta resolução a imagem não é reduzida de volta
+        high_text, high_confidence = _ocr_render_pass(
+            engine, source, page_num, options['escalation_dpi'],
+            options['escalation_dpi'] if options['target_dpi'] else None, deadline, True)
+        details['escalated'] = True
+        if high_confidence is not None and (confidence is None or high_confidence >= confidence):
+            text, confidence = high_text, high_confidence
+            details.update(dpi=options['escalation_dpi'], confidence=high_confidence)
+    return page_num, text, time.perf_counter() - inicio, details
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    """Levanta TimeoutError se o prazo do documento já passou."""
+    if deadline and time.time() >= deadline:
+        raise TimeoutError("Tempo limite de OCR atingido")
+
+
+def _ocr_render_pass(engine, source: Union[str, bytes, mmap.mmap], page_num: int, dpi: int,
+                     target_dpi: Optional[int], deadline: Optional[float],
+                     with_confidence: bool) -> Tuple[str, Optional[float]]:
+    """
+    Renderiza a página em `dpi` e aplica o OCR.
+
+    Args:
+        target_dpi: Resolução do pré-processamento, ou None para entregar a
+                    imagem renderizada diretamente ao OCR.
+        with_confidence: Se True, lê também a confiança média das palavras.
+
+    Returns:
+        Tupla (texto, confiança média ou None).
+    """
+    image = _render_page(source, page_num, dpi)
+    if image is None:
+        return "", None
+    if target_dpi:
+        image, _ = preprocess_page(image, dpi, target_dpi)
+    _check_deadline(deadline)
+    # No pytesseract, o timeout encerra o processo do tesseract quando o
+    # prazo do documento estoura, liberando o núcleo para outra página.
+    timeout = max(deadline - time.time(), 0.1) if deadline else 0
+    if with_confidence:
+        return engine.image_to_text_confidence(image, timeout=timeout)
+    return engine.image_to_string(image, timeout=timeout), None
+
+
+def _pdf_object_digest(obj, digests: Dict[Tuple[int, int], str]) -> str:
+    """
+    SHA-256 do conteúdo de um objeto do PDF e de tudo o que ele referencia:
+    dicionários (chaves ordenadas), listas e streams (dados decodificados).
+    Os números dos objetos indiretos não entram, só o conteúdo, de modo que o
+    hash não muda quando o PDF é regravado. /Parent é ignorado para não subir
+    à árvore de páginas.
+
+    Args:
+        obj: Objeto do PyPDF2 (direto ou IndirectObject).
+        digests: Hashes dos objetos indiretos já calculados no documento
+                 (fontes costumam ser compartilhadas pelas páginas).
+    """
+    key = None
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key in digests:
+            return digests[key]
+        # Referência circular: o objeto ainda em cálculo entra como um marcador
+        digests[key] = 'ciclo'
+        obj = obj.get_object()
+    digest = hashlib.sha256()
+    if isinstance(obj, dict):
+        for name in sorted(obj):
+            if name != '/Parent':
+                digest.update(name.encode('utf-8'))
+                digest.update(_pdf_object_digest(obj.raw_get(name), digests).encode('utf-8'))
+        if hasattr(obj, 'get_data'):
+            digest.update(obj.get_data())
+    elif isinstance(obj, list):
+        for item in obj:
+            digest.update(_pdf_object_digest(item, digests).encode('utf-8'))
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+    result = digest.hexdigest()
+    if key is not None:
+        digests[key] = result
+    return result
+
+
+def _page_fingerprint(page, object_digests: Optional[Dict[Tuple[int, int], str]] = None) -> str:
+    """
+    Impressão digital de uma página: SHA-256 do stream de conteúdo, das
+    fontes que ele usa (os códigos do stream só viram texto com o /Encoding,
+    o /ToUnicode e o programa de cada fonte), dos dados das imagens e
+    formulários (XObjects) que ele desenha, do tamanho e da rotação. Duas
+    páginas com a mesma impressão digital produzem o mesmo texto e a mesma
+    imagem renderizada, sem que seja preciso renderizá-las.
+
+    Args:
+        page: Página do PyPDF2.
+        object_digests: Hashes dos objetos já calculados no documento (ver
+                        _pdf_object_digest), compartilhado entre as páginas.
+    """
+    if object_digests is None:
+        object_digests = {}
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    digest.update(repr((list(page.mediabox), page.get('/Rotate', 0))).encode('utf-8'))
+
+    seen = set()
+    pending = [page.get('/Resources')]
+    while pending:
+        resources = pending.pop()
+        resources = resources.get_object() if resources is not None else None
+        fonts = resources.get('/Font') if resources else None
+        if fonts:
+            fonts = fonts.get_object()
+            for name in sorted(fonts):
+                digest.update(name.encode('utf-8'))
+                digest.update(_pdf_object_digest(fonts.raw_get(name), object_digests).encode('utf-8'))
+        xobjects = resources.get('/XObject') if resources else None
+        if not xobjects:
+            continue
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            xobject = xobjects[name].get_object()
+            if id(xobject) in seen:
+                continue
+            seen.add(id(xobject))
+            digest.update(name.encode('utf-8'))
+            digest.update(xobject.get_data())
+            # Formulários podem desenhar outras imagens e usar outras fontes
+            if xobject.get('/Subtype') == '/Form':
+                pending.append(xobject.get('/Resources'))
+    return digest.hexdigest()
+
+
+def _diff_fingerprints(previous: List[str], current: List[str]) -> Dict[str, List[int]]:
+    """
+    Compara as impressões digitais de duas versões de um documento.
+
+    Páginas são casadas pelo conteúdo, não pela posição: páginas inseridas no
+    meio (aditamentos, juntadas) não fazem as seguintes aparecerem como
+    alteradas.
+
+    Returns:
+        Dicionário com listas de números de página: 'unchanged', 'added' e
+        'changed' (numeração da versão atual) e 'removed' (numeração anterior).
+        'changed' são posições presentes nas duas versões cujo conteúdo antigo
+        não aparece mais no documento.
+    """
+    available: Dict[str, List[int]] = {}
+    for page_num, fingerprint in enumerate(previous, start=1):
+        available.setdefault(fingerprint, []).append(page_num)
+    diff: Dict[str, List[int]] = {'unchanged': [], 'added': [], 'changed': [], 'removed': []}
+    unmatched = []
+    for page_num, fingerprint in enumerate(current, start=1):
+        if available.get(fingerprint):
+            available[fingerprint].pop(0)
+            diff['unchanged'].append(page_num)
+        else:
+            unmatched.append(page_num)
+    removed = {page_num for pages in available.values() for page_num in pages}
+    for page_num in unmatched:
+        if page_num in removed:
+            removed.discard(page_num)
+            diff['changed'].append(page_num)
+        else:
+            diff['added'].append(page_num)
+    diff['removed'] = sorted(removed)
+    return diff
+
+
+class _PDFSource:
+    """
+    Entrada de PDF normalizada: um caminho em disco ou um único buffer em
+    memória, compartilhado pelo PyPDF2 e pelo renderizador de páginas.
+    """
+
+    def __init__(self, pdf: PDFInput):
+        self.path: Optional[str] = None
+        self.buffer: Union[bytes, mmap.mmap, memoryview, None] = None
+        self._stream: Optional[BinaryIO] = None
+        self._owned_mmap: Optional[mmap.mmap] = None
+
+        if isinstance(pdf, (str, os.PathLike)):
+            self.path = os.fspath(pdf)
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"Arquivo PDF não encontrado: {self.path}")
+        elif isinstance(pdf, (bytes, mmap.mmap)):
+            self.buffer = pdf
+        elif isinstance(pdf, (bytearray, memoryview)):
+            self.buffer = bytes(pdf)
+        elif isinstance(pdf, io.BytesIO):
+            # getbuffer() expõe o conteúdo sem copiar; o próprio BytesIO é o stream
+            self.buffer = pdf.getbuffer()
+            self._stream = pdf
+        elif hasattr(pdf, 'read'):
+            try:
+                # Arquivos reais (ex.: TemporaryUploadedFile) são mapeados em memória
+                self._owned_mmap = mmap.mmap(pdf.fileno(), 0, access=mmap.ACCESS_READ)
+                self.buffer = self._owned_mmap
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                self.buffer = pdf.read()
+        else:
+            raise TypeError(f"Tipo de entrada de PDF não suportado: {type(pdf).__name__}")
+
+    def open_stream(self):
+        """Abre um stream binário posicionado no início do PDF para o PyPDF2."""
+        if self.path is not None:
+            return open(self.path, 'rb')
+        if self._stream is None:
+            # BytesIO sobre bytes não copia o conteúdo; mmap já é um stream
+            self._stream = io.BytesIO(self.buffer) if isinstance(self.buffer, bytes) else self.buffer
+        self._stream.seek(0)
+        return contextlib.nullcontext(self._stream)
+
+    def render_source(self) -> Union[str, bytes, mmap.mmap, memoryview]:
+        """Caminho ou buffer entregue ao renderizador no processo atual."""
+        return self.path if self.path is not None else self.buffer
+
+    def sha256(self) -> str:
+        """SHA-256 dos bytes do PDF."""
+        if self.path is not None:
+            return sha256_arquivo(self.path)
+        return hashlib.sha256(self.buffer).hexdigest()
+
+    def close(self) -> None:
+        if self._owned_mmap is not None:
+            self._owned_mmap.close()
+            self._owned_mmap = None
+
 
 class ParserPDF:
-    def __init__(self, use_ocr: bool = True):
+    def __init__(self, use_ocr: bool = True, ocr_workers: int = 1,
+                 ocr_timeout: Optional[float] = None, ocr_lang: str = 'por',
+                 cache: Optional[CachePDF] = None, ocr_backend: str = 'pytesseract',
+                 ocr_preprocess: bool = False, ocr_target_dpi: int = PREPROCESS_TARGET_DPI,
+                 ocr_dpi: int = RENDER_DPI, ocr_escalation_dpi: Optional[int] = None,
+                 ocr_min_confidence: float = OCR_MIN_CONFIDENCE):
         """
         Inicializa o parser de PDF.
         
         Args:
             use_ocr: Se True, utiliza OCR para extrair texto de imagens no PDF.
                      Se False, utiliza apenas extração direta de texto.
+            ocr_workers: Número de processos usados para aplicar OCR nas páginas
+                         em paralelo. Com 1, o OCR é feito página a página no
+                         processo atual.
+            ocr_timeout: Tempo máximo (em segundos) de OCR por documento. Páginas
+                         não concluídas dentro do prazo (ou com erro) ficam
+                         vazias e são listadas em ocr_stats['failed_pages'].
+            ocr_lang: Idioma(s) do Tesseract, por exemplo 'por' ou 'por+eng'.
+            cache: Cache opcional do texto extraído, endereçado pelo SHA-256 do
+                   PDF e pelas opções do parser.
+            ocr_backend: 'pytesseract' (um processo tesseract por página) ou
+                         'tesserocr' (instância persistente da API do Tesseract
+                         por processo, sem recarregar o modelo a cada página).
+            ocr_preprocess: Se True, as páginas passam por cinza, limiarização,
+                            endireitamento, recorte de margens e redução para
+                            ocr_target_dpi antes do OCR (requer numpy). Pode ser
+                            alterado por chamada no parâmetro `preprocess`.
+                            Desligado por padrão: o Tesseract recebe a página
+                            renderizada em ocr_dpi, sem alterações.
+            ocr_target_dpi: Resolução das imagens entregues ao OCR após o
+                            pré-processamento.
+            ocr_dpi: Resolução de renderização das páginas para o OCR.
+            ocr_escalation_dpi: Ativa o OCR adaptativo: as páginas são lidas em
+                                ocr_dpi (ex.: 150) e apenas aquelas com
+                                confiança média abaixo de ocr_min_confidence
+                                são renderizadas de novo nesta resolução (ex.:
+                                300). O total fica em
+                                extraction_report['escalated_pages'].
+            ocr_min_confidence: Confiança média das palavras (0 a 100) exigida
+                                na primeira passada do OCR adaptativo.
         """
         self.use_ocr = use_ocr
+        self.ocr_workers = max(1, ocr_workers)
+        self.ocr_timeout = ocr_timeout
+        self.ocr_lang = ocr_lang
+        if ocr_backend not in OCR_BACKENDS:
+            raise ValueError(f"Backend de OCR desconhecido: {ocr_backend}")
+        if ocr_backend == 'tesserocr' and not backend_available('tesserocr'):
+            print("AVISO: tesserocr não encontrado. Usando pytesseract.")
+            print("Execute: pip install tesserocr")
+            ocr_backend = 'pytesseract'
+        self.ocr_backend = ocr_backend
+        if ocr_preprocess and use_ocr and not NUMPY_AVAILABLE:
+            print("AVISO: numpy não encontrado. Pré-processamento de imagens desativado.")
+            print("Execute: pip install numpy")
+        self.ocr_preprocess = ocr_preprocess and NUMPY_AVAILABLE
+        self.ocr_target_dpi = ocr_target_dpi
+        if ocr_escalation_dpi is not None and ocr_escalation_dpi <= ocr_dpi:
+            raise ValueError("ocr_escalation_dpi deve ser maior que ocr_dpi")
+        self.ocr_dpi = ocr_dpi
+        self.ocr_escalation_dpi = ocr_escalation_dpi
+        self.ocr_min_confidence = ocr_min_confidence
+        self.cache = cache
+        # Métricas da última execução de OCR (tempo, resolução e confiança por
+        # página, páginas que estouraram o prazo), úteis para dimensionar o
+        # pool de processos e o limiar do OCR adaptativo.
+        self.ocr_stats: Dict[str, object] = {}
+        # Relatório da última extração: método usado em cada página
+        # ('direct' ou 'ocr'), totais por método e páginas cujo OCR precisou
+        # de uma segunda passada em resolução maior.
+        self.extraction_report: Dict[str, object] = {}
         # Verificar se as dependências estão instaladas
         try:
             import pytesseract
@@ -35,30 +577,339 @@ class ParserPDF:
                 print("E instale o Tesseract OCR: https://github.com/tesseract-ocr/tesseract")
             self.ocr_available = False
 
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
+    def extract_text_from_pdf(self, pdf_path: str, preprocess: Optional[bool] = None) -> str:
         """
         Extrai texto de um arquivo PDF.
+
+        Construído sobre iter_pages: as páginas são processadas uma a uma e
+        apenas o texto é mantido em memória. Com cache configurado, um PDF
+        já processado com as mesmas opções é devolvido sem nova extração.
         
         Args:
             pdf_path: Caminho para o arquivo PDF.
+            preprocess: Liga/desliga o pré-processamento de imagens nesta
+                        chamada. None usa o padrão do parser (ocr_preprocess).
             
         Returns:
             Texto extraído do PDF.
         """
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"Arquivo PDF não encontrado: {pdf_path}")
-        
-        # Primeiro, tenta extração direta de texto
-        text = self._extract_text_direct(pdf_path)
-        
-        # Se OCR estiver habilitado e o texto extraído for muito curto ou vazio,
-        # tenta OCR
-        if self.use_ocr and self.ocr_available and (len(text) < 100 or not text.strip()):
-            print("Texto extraído diretamente é insuficiente. Tentando OCR...")
-            text = self._extract_text_ocr(pdf_path)
+        return self._extract_text(_PDFSource(pdf_path), preprocess)
+
+    def extract_text_from_bytes(self, data: Union[bytes, bytearray, memoryview, mmap.mmap], preprocess: Optional[bool] = None) -> str:
+        """
+        Extrai texto de um PDF já carregado em memória, sem gravá-lo em disco.
+
+        Args:
+            data: Conteúdo do PDF (bytes ou arquivo mapeado com mmap).
+            preprocess: Ver extract_text_from_pdf.
+
+        Returns:
+            Texto extraído do PDF.
+        """
+        return self._extract_text(_PDFSource(data), preprocess)
+
+    def extract_text_from_stream(self, stream: BinaryIO, preprocess: Optional[bool] = None) -> str:
+        """
+        Extrai texto de um objeto de arquivo binário, como o `file` de um
+        upload do Django. BytesIO é lido sem cópia; arquivos em disco são
+        mapeados em memória.
+
+        Args:
+            stream: Objeto de arquivo aberto em modo binário.
+            preprocess: Ver extract_text_from_pdf.
+
+        Returns:
+            Texto extraído do PDF.
+        """
+        return self._extract_text(_PDFSource(stream), preprocess)
+
+    def page_fingerprints(self, pdf: PDFInput) -> List[str]:
+        """
+        Calcula a impressão digital de cada página (ver _page_fingerprint).
+
+        Args:
+            pdf: Caminho, bytes, mmap ou objeto de arquivo do PDF.
+
+        Returns:
+            Lista de hashes hexadecimais, na ordem das páginas.
+        """
+        source = pdf if isinstance(pdf, _PDFSource) else _PDFSource(pdf)
+        try:
+            with source.open_stream() as file:
+                reader = PyPDF2.PdfReader(file)
+                object_digests: Dict[Tuple[int, int], str] = {}
+                return [_page_fingerprint(page, object_digests) for page in reader.pages]
+        finally:
+            if source is not pdf:
+                source.close()
+
+    def extract_text_incremental(self, pdf: PDFInput, document_id: str,
+                                 preprocess: Optional[bool] = None) -> Dict[str, object]:
+        """
+        Extrai o texto de uma nova versão de um documento reaproveitando as
+        páginas já processadas (ex.: denúncia reenviada com aditamento).
+
+        O texto de cada página é gravado no cache sob a sua impressão digital;
+        apenas páginas novas ou alteradas passam pelo PyPDF2 e pelo OCR, e o
+        texto do documento é remontado na ordem das páginas. As impressões
+        digitais da versão anterior ficam no cache sob document_id, para o
+        cálculo das diferenças.
+
+        Args:
+            pdf: Caminho, bytes, mmap ou objeto de arquivo do PDF.
+            document_id: Identificador estável do documento entre versões
+                         (ex.: número do processo).
+            preprocess: Ver extract_text_from_pdf.
+
+        Returns:
+            Dicionário com:
+            - 'text': texto limpo do documento
+            - 'diff': diferenças por página em relação à versão anterior
+              (ver _diff_fingerprints; sem versão anterior, todas são 'added')
+            - 'reused_pages': páginas reaproveitadas do cache
+        """
+        if self.cache is None:
+            raise ValueError("extract_text_incremental requer um cache (parâmetro cache)")
+        preprocess = self._resolve_preprocess(preprocess)
+        source = _PDFSource(pdf)
+        try:
+            fingerprints = self.page_fingerprints(source)
+            options = dict(self._cache_options(preprocess), scope='page')
+            keys = [self.cache.chave(fingerprint, options) for fingerprint in fingerprints]
+
+            texts: Dict[int, str] = {}
+            for page_num, key in enumerate(keys, start=1):
+                cached = self.cache.obter(key)
+                if cached is not None:
+                    texts[page_num] = cached['text']
+            missing = {page_num for page_num in range(1, len(keys) + 1) if page_num not in texts}
+
+            for page in self.iter_pages(source, preprocess=preprocess, pages=missing):
+                texts[page['page']] = page['text']
+                # Páginas que falharam no OCR não são gravadas (ver _extract_text_cached)
+                if page['page'] not in self.ocr_stats['failed_pages']:
+                    self.cache.salvar(keys[page['page'] - 1], {'text': page['text'],
+                                                               'method': page['method']})
+        finally:
+            source.close()
+
+        manifest_key = self.cache.chave(document_id, {'scope': 'document'})
+        previous = self.cache.obter(manifest_key)
+        self.cache.salvar(manifest_key, {'fingerprints': fingerprints})
+        reused = len(fingerprints) - len(missing)
+        self.extraction_report['reused_pages'] = reused
+
+        return {
+            'text': self._clean_text("".join(texts[n] + "\n\n" for n in range(1, len(fingerprints) + 1))),
+            'diff': _diff_fingerprints(previous['fingerprints'] if previous else [], fingerprints),
+            'reused_pages': reused,
+        }
+
+    def _extract_text(self, source: _PDFSource, preprocess: Optional[bool] = None) -> str:
+        """Extração comum a todas as formas de entrada (ver extract_text_from_pdf)."""
+        try:
+            return self._extract_text_cached(source, self._resolve_preprocess(preprocess))
+        finally:
+            source.close()
+
+    def _extract_text_cached(self, source: _PDFSource, preprocess: bool) -> str:
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.chave(source.sha256(), self._cache_options(preprocess))
+            cached = self.cache.obter(cache_key)
+            if cached is not None:
+                self.extraction_report = dict(cached['report'], cache_hit=True)
+                return cached['text']
+
+        pages = list(self.iter_pages(source, preprocess=preprocess))
         
         # Limpa o texto extraído
-        return self._clean_text(text)
+        text = self._clean_text("".join(page['text'] + "\n\n" for page in pages))
+
+        # Páginas que falharam no OCR (ex.: prazo estourado) não são gravadas,
+        # para que uma nova tentativa possa obter o texto completo.
+        if cache_key is not None and not self.ocr_stats['failed_pages']:
+            self.cache.salvar(cache_key, {
+                'text': text,
+                'pages': pages,
+                'report': self.extraction_report,
+            })
+        self.extraction_report['cache_hit'] = False
+        return text
+
+    def _cache_options(self, preprocess: bool) -> Dict[str, object]:
+        """Opções do parser que alteram o texto extraído (parte da chave do cache)."""
+        return dict(self._ocr_options(preprocess),
+                    ocr=self.use_ocr and self.ocr_available,
+                    clean_version=CLEAN_VERSION)
+
+    def _resolve_preprocess(self, preprocess: Optional[bool]) -> bool:
+        """Valor efetivo do pré-processamento para uma chamada."""
+        if preprocess is None:
+            return self.ocr_preprocess
+        return preprocess and NUMPY_AVAILABLE
+
+    def _ocr_options(self, preprocess: bool) -> Dict[str, object]:
+        """Opções repassadas a _ocr_page_worker (serializáveis para o pool)."""
+        return {
+            'lang': self.ocr_lang,
+            'backend': self.ocr_backend,
+            'target_dpi': self.ocr_target_dpi if preprocess else None,
+            'dpi': self.ocr_dpi,
+            'escalation_dpi': self.ocr_escalation_dpi,
+            'min_confidence': self.ocr_min_confidence,
+        }
+
+    def iter_pages(self, pdf: Union[PDFInput, _PDFSource],
+                   mode: str = 'hybrid', preprocess: Optional[bool] = None,
+                   pages: Optional[Set[int]] = None) -> Iterator[Dict[str, object]]:
+        """
+        Percorre o PDF página a página, renderizando e aplicando OCR em uma
+        página por vez. O consumo de memória não depende do número de páginas:
+        no modo paralelo, no máximo 2 * ocr_workers páginas ficam em andamento.
+
+        Args:
+            pdf: Caminho, bytes, mmap ou objeto de arquivo do PDF.
+            mode: 'hybrid' usa a camada de texto e envia ao OCR apenas as
+                  páginas sem texto utilizável; 'direct' nunca usa OCR;
+                  'ocr' aplica OCR em todas as páginas.
+            preprocess: Liga/desliga o pré-processamento das imagens antes do
+                        OCR. None usa o padrão do parser (ocr_preprocess).
+            pages: Números das páginas a processar (começando em 1). None
+                   processa todas.
+
+        Yields:
+            Dicionários {'page': número, 'text': texto, 'method': 'direct' ou 'ocr'},
+            na ordem do documento.
+        """
+        if mode not in ('hybrid', 'direct', 'ocr'):
+            raise ValueError(f"Modo de extração inválido: {mode}")
+        source = pdf if isinstance(pdf, _PDFSource) else _PDFSource(pdf)
+
+        ocr_enabled = mode != 'direct' and self.use_ocr and self.ocr_available
+        deadline = time.time() + self.ocr_timeout if self.ocr_timeout else None
+        ocr_options = self._ocr_options(self._resolve_preprocess(preprocess))
+        inicio = time.perf_counter()
+        self.ocr_stats = {
+            'workers': self.ocr_workers,
+            'pages': [],
+            'failed_pages': [],
+            'total_seconds': 0.0,
+        }
+        self.extraction_report = {'pages': [], 'direct_pages': 0, 'ocr_pages': 0, 'escalated_pages': 0}
+
+        executor = None
+        # Páginas lidas e ainda não entregues: (número, texto direto, futuro do OCR)
+        window: Deque[Tuple[int, str, Optional[Future]]] = deque()
+        try:
+            with source.open_stream() as file:
+                reader = PyPDF2.PdfReader(file)
+                num_pages = len(reader.pages)
+                page_count = num_pages if pages is None else len(pages)
+                if ocr_enabled and self.ocr_workers > 1 and page_count > 1:
+                    workers = min(self.ocr_workers, page_count)
+                    executor = self._create_ocr_executor(source, workers, ocr_options)
+                    print(f"Processando {page_count} páginas em {workers} processos...")
+                # Caminho repassado aos processos; None indica o buffer do inicializador
+                worker_source = source.path
+
+                for page_num in range(1, num_pages + 1):
+                    if pages is not None and page_num not in pages:
+                        continue
+                    text = "" if mode == 'ocr' else self._page_text_direct(reader, page_num)
+                    needs_ocr = ocr_enabled and (mode == 'ocr' or self._page_needs_ocr(text))
+                    if not needs_ocr:
+                        window.append((page_num, text, None))
+                    elif executor is not None and not (deadline and time.time() >= deadline):
+                        window.append((page_num, text, executor.submit(
+                            _ocr_page_worker, worker_source, page_num, ocr_options, deadline)))
+                    else:
+                        # Sem pool, ou com o prazo esgotado: as páginas restantes
+                        # falham na hora, sem serem enviadas aos processos
+                        window.append((page_num, text, self._ocr_page_inline(
+                            source.render_source(), page_num, ocr_options, deadline)))
+                    while len(window) > 2 * self.ocr_workers or (window and executor is None):
+                        yield self._finish_page(*window.popleft(), deadline)
+
+            while window:
+                yield self._finish_page(*window.popleft(), deadline)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            if source is not pdf:
+                source.close()
+            self.ocr_stats['total_seconds'] = time.perf_counter() - inicio
+
+    def _create_ocr_executor(self, source: _PDFSource, workers: int,
+                             ocr_options: Dict[str, object]) -> ProcessPoolExecutor:
+        """
+        Cria o pool de processos de OCR. Para entradas em memória, o buffer é
+        enviado uma única vez a cada processo, e não a cada página. Cada
+        processo carrega o motor de OCR ao iniciar e o reaproveita nas páginas.
+        """
+        buffer = None
+        if source.path is None:
+            buffer = source.buffer if isinstance(source.buffer, bytes) else bytes(source.buffer)
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker,
+                                   initargs=(buffer, ocr_options))
+
+    def _page_text_direct(self, reader: "PyPDF2.PdfReader", page_num: int) -> str:
+        """Extrai a camada de texto de uma página usando PyPDF2."""
+        try:
+            return reader.pages[page_num - 1].extract_text() or ""
+        except Exception as e:
+            print(f"Erro ao extrair texto da página {page_num}: {e}")
+            return ""
+
+    def _ocr_page_inline(self, render_source: Union[str, bytes, mmap.mmap], page_num: int,
+                         ocr_options: Dict[str, object], deadline: Optional[float]) -> Future:
+        """
+        Aplica OCR em uma página no processo atual. O resultado é embrulhado em
+        um Future já resolvido para seguir o mesmo caminho do modo paralelo.
+        """
+        future: Future = Future()
+        try:
+            _check_deadline(deadline)
+            print(f"Processando página {page_num} com OCR...")
+            future.set_result(_ocr_page_worker(render_source, page_num, ocr_options, deadline))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _finish_page(self, page_num: int, text: str, job: Optional[Future],
+                     deadline: Optional[float]) -> Dict[str, object]:
+        """
+        Conclui uma página: aguarda o OCR (respeitando o prazo do documento) e
+        registra o método usado. Se o OCR falhar, mantém o texto direto.
+        """
+        method = 'direct'
+        if job is not None:
+            try:
+                timeout = max(deadline - time.time(), 0) if deadline else None
+                _, ocr_text, seconds, details = job.result(timeout=timeout)
+                self.ocr_stats['pages'].append(dict(details, page=page_num, seconds=seconds))
+                self.extraction_report['escalated_pages'] += details['escalated']
+                if ocr_text.strip():
+                    text, method = ocr_text, 'ocr'
+            except Exception as e:
+                # Inclui o RuntimeError do pytesseract quando o prazo estoura
+                print(f"Erro no OCR da página {page_num}: {str(e) or 'tempo limite atingido'}")
+                self.ocr_stats['failed_pages'].append(page_num)
+
+        self.extraction_report['pages'].append({'page': page_num, 'method': method})
+        self.extraction_report[f'{method}_pages'] += 1
+        return {'page': page_num, 'text': text, 'method': method}
+    
+    def _page_needs_ocr(self, text: str) -> bool:
+        """
+        Indica se a camada de texto de uma página é insuficiente: curta demais
+        ou composta em sua maior parte por símbolos sem sentido.
+        """
+        chars = [c for c in text if not c.isspace()]
+        if len(chars) < MIN_PAGE_CHARS:
+            return True
+        alnum = sum(1 for c in chars if c.isalnum())
+        return alnum / len(chars) < MIN_PAGE_ALNUM_RATIO or '(cid:' in text
     
     def _extract_text_direct(self, pdf_path: str) -> str:
         """
@@ -70,21 +921,18 @@ class ParserPDF:
         Returns:
             Texto extraído diretamente do PDF.
         """
-        text = ""
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(reader.pages)):
-                    page = reader.pages[page_num]
-                    text += page.extract_text() + "\n\n"
+            return "".join(page['text'] + "\n\n" for page in self.iter_pages(pdf_path, mode='direct'))
         except Exception as e:
             print(f"Erro ao extrair texto diretamente: {e}")
-        
-        return text
+            return ""
     
     def _extract_text_ocr(self, pdf_path: str) -> str:
         """
         Extrai texto do PDF usando OCR.
+
+        Com ocr_workers > 1 as páginas são distribuídas entre processos; a
+        ordem das páginas no texto final é sempre preservada.
         
         Args:
             pdf_path: Caminho para o arquivo PDF.
@@ -94,25 +942,21 @@ class ParserPDF:
         """
         if not self.ocr_available:
             return ""
-        
-        text = ""
+
         try:
-            # Converte PDF para imagens
-            images = self.convert_from_path(pdf_path)
-            
-            # Extrai texto de cada imagem
-            for i, image in enumerate(images):
-                print(f"Processando página {i+1}/{len(images)} com OCR...")
-                page_text = self.pytesseract.image_to_string(image, lang='por')
-                text += page_text + "\n\n"
+            return "".join(page['text'] + "\n\n" for page in self.iter_pages(pdf_path, mode='ocr')
+                           if page['method'] == 'ocr')
         except Exception as e:
             print(f"Erro ao extrair texto via OCR: {e}")
-        
-        return text
-    
+            return ""
+
     def _clean_text(self, text: str) -> str:
         """
         Limpa o texto extraído, removendo cabeçalhos, rodapés e formatação desnecessária.
+
+        Uma única expressão pré-compilada (_CLEAN_RE) percorre o texto uma vez:
+        cabeçalhos, rodapés e números de página isolados são removidos e os
+        trechos de espaço em branco são normalizados para um único espaço.
         
         Args:
             text: Texto a ser limpo.
@@ -123,36 +967,28 @@ class ParserPDF:
         if not text:
             return ""
         
-        # Remove múltiplos espaços em branco
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove cabeçalhos e rodapés comuns em documentos jurídicos
-        # Estes padrões podem precisar ser ajustados com base nos documentos reais
-        headers_footers = [
-            r'MINISTÉRIO PÚBLICO DO ESTADO DE.*\n',
-            r'PROMOTORIA DE JUSTIÇA.*\n',
-            r'Página \d+ de \d+',
-            r'Documento assinado digitalmente.*',
-            r'www\..*\.jus\.br',
-        ]
-        
-        for pattern in headers_footers:
-            text = re.sub(pattern, '', text)
-        
-        # Remove números de página isolados
-        text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
-        
-        # Normaliza quebras de linha
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text.strip()
+        return _CLEAN_RE.sub(_clean_replacement, text).strip()
     
-    def extract_structured_info(self, text: str) -> Dict[str, Union[str, List[str]]]:
+    def extract_structured_info(self, text: str, use_sections: bool = True) -> Dict[str, Union[str, List[str]]]:
         """
         Extrai informações estruturadas do texto da denúncia.
+
+        Todas as entidades são extraídas em uma única varredura: a expressão
+        _TRIGGER_RE localiza as palavras-gatilho ("denunciado", "vítima",
+        "crime", ...) e, para cada uma, a cauda correspondente é aplicada
+        ancorada logo após o gatilho, sobre o texto original. Os valores são os
+        mesmos das expressões anteriores, em ordem do documento. O tempo fica
+        linear mesmo em textos de OCR sem pontuação: uma regra não é aplicada
+        de novo dentro do trecho que já capturou, e a regra de local não é
+        aplicada de novo em um trecho sem pontuação em que já falhou.
+
+        Com use_sections, cada campo só é procurado nas seções relevantes
+        (FIELD_SECTIONS): a data do fato vem da narrativa, e não da data de
+        nascimento na qualificação, por exemplo.
         
         Args:
             text: Texto extraído da denúncia.
+            use_sections: Se True, restringe cada campo às suas seções.
             
         Returns:
             Dicionário com informações estruturadas como:
@@ -163,85 +999,129 @@ class ParserPDF:
             - local_fato
             - testemunhas
         """
-        info = {
-            'reus': [],
-            'vitimas': [],
-            'crimes': [],
-            'data_fato': '',
-            'local_fato': '',
-            'testemunhas': []
-        }
-        
-        # Extração de réus
-        reu_patterns = [
-            r'denunciado[s]?:?\s*([^,;\n\.]+)',
-            r'acusado[s]?:?\s*([^,;\n\.]+)',
-            r'réu[s]?:?\s*([^,;\n\.]+)'
-        ]
-        for pattern in reu_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match.group(1).strip() and match.group(1).strip() not in info['reus']:
-                    info['reus'].append(match.group(1).strip())
-        
-        # Extração de vítimas
-        vitima_patterns = [
-            r'vítima[s]?:?\s*([^,;\n\.]+)',
-            r'ofendido[s]?:?\s*([^,;\n\.]+)'
-        ]
-        for pattern in vitima_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match.group(1).strip() and match.group(1).strip() not in info['vitimas']:
-                    info['vitimas'].append(match.group(1).strip())
-        
-        # Extração de crimes
-        crime_patterns = [
-            r'crime[s]? (?:de|do|da)?\s*([^,;\n\.]+)',
-            r'delito[s]? (?:de|do|da)?\s*([^,;\n\.]+)',
-            r'(?:art|artigo)[\.:]?\s*(\d+)[^\d]+(?:do|da)\s*(?:CP|Código Penal)',
-        ]
-        for pattern in crime_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match.group(1).strip() and match.group(1).strip() not in info['crimes']:
-                    info['crimes'].append(match.group(1).strip())
-        
-        # Extração de data do fato
-        data_patterns = [
-            r'(?:em|no dia|na data de|datado de)\s*(\d{1,2}\/\d{1,2}\/\d{2,4})',
-            r'(?:em|no dia|na data de|datado de)\s*(\d{1,2}\s+de\s+(?:janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\s+de\s+\d{2,4})'
-        ]
-        for pattern in data_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['data_fato'] = match.group(1).strip()
-                break
-        
-        # Extração de local do fato
-        local_patterns = [
-            r'(?:ocorrido|ocorrida|ocorreram|aconteceu|sucedeu|deu-se)[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})',
-            r'(?:local|lugar|endereço)[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})'
-        ]
-        for pattern in local_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                info['local_fato'] = match.group(1).strip()
-                break
-        
-        # Extração de testemunhas
-        testemunha_patterns = [
-            r'testemunha[s]?:?\s*([^,;\n\.]+)',
-            r'(?:ouvir|ouvido|depoimento de)\s*([^,;\n\.]+)'
-        ]
-        for pattern in testemunha_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match.group(1).strip() and match.group(1).strip() not in info['testemunhas']:
-                    info['testemunhas'].append(match.group(1).strip())
-        
+        # dicts como conjuntos ordenados: deduplicação O(1) mantendo a ordem
+        found: Dict[str, Dict[str, None]] = {field: {} for field in _LIST_FIELDS}
+        # Para campos de valor único: (prioridade da regra, valor)
+        single: Dict[str, Tuple[int, str]] = {}
+        # Fim da última ocorrência de cada regra: como no finditer, uma regra
+        # não casa de novo dentro do trecho que ela mesma já capturou.
+        rule_end = [0] * len(_EXTRACTION_RULES)
+        # Regras de local: fim do trecho sem pontuação em que a cauda já falhou
+        # (qualquer gatilho dentro dele falharia também)
+        rule_failed_until = [0] * len(_EXTRACTION_RULES)
+
+        # Os gatilhos são buscados no texto em minúsculas, com expressão sensível
+        # a maiúsculas (bem mais rápida que IGNORECASE).
+        lowered = _lowercase_aligned(text)
+
+        # Limites das seções, para localizar por busca binária a seção de cada gatilho
+        sections = self._segment_lowered(lowered) if use_sections else {}
+        bounds = sorted((start, end, name) for name, (start, end) in sections.items())
+        starts = [start for start, _, _ in bounds]
+        # Campos cujas seções não foram encontradas são procurados no texto todo
+        scoped = {field for field, names in FIELD_SECTIONS.items() if any(n in sections for n in names)}
+
+        for trigger in _TRIGGER_RE.finditer(lowered):
+            start = trigger.start()
+            index = bisect_right(starts, start) - 1
+            section_end = bounds[index][1] if index >= 0 else len(text)
+            section = bounds[index][2] if index >= 0 else None
+            for word in _TRIGGER_PREFIXES[trigger.group(1)]:
+                for rule_id, field, tail, priority in _TRIGGER_RULES[word]:
+                    if start < rule_end[rule_id] or start < rule_failed_until[rule_id]:
+                        continue
+                    if field in single and single[field][0] <= priority:
+                        continue
+                    if field in scoped and section not in FIELD_SECTIONS[field]:
+                        continue
+                    end = section_end if field in scoped else len(text)
+                    match = tail.match(text, start + len(word), end)
+                    if not match:
+                        if field == 'local_fato':
+                            run_end = _RUN_END_RE.search(text, start + len(word), end)
+                            rule_failed_until[rule_id] = run_end.start() if run_end else end
+                        continue
+                    rule_end[rule_id] = match.end()
+                    value = match.group(1).strip()
+                    if field not in found:
+                        # Como no re.search anterior, vale o primeiro casamento, mesmo vazio
+                        single[field] = (priority, value)
+                    elif value:
+                        found[field][value] = None
+
+        info: Dict[str, Union[str, List[str]]] = {field: list(values) for field, values in found.items()}
+        info['data_fato'] = single.get('data_fato', (0, ''))[1]
+        info['local_fato'] = single.get('local_fato', (0, ''))[1]
         return info
 
+    def segment_sections(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Divide a denúncia em suas seções padrão (qualificação do denunciado,
+        narrativa dos fatos, capitulação, rol de testemunhas e pedidos) em uma
+        única varredura do texto.
+
+        Cada seção começa na primeira ocorrência de um de seus marcadores
+        (SECTION_MARKERS) e termina onde começa a seção seguinte. O trecho antes
+        da primeira seção (cabeçalho) não é incluído. Sem marcador de
+        narrativa, ela começa na primeira frase da qualificação que abre o
+        relato do fato (_NARRATIVE_OPENING_RE).
+
+        Args:
+            text: Texto da denúncia (bruto ou já limpo por _clean_text).
+
+        Returns:
+            Dicionário {nome da seção: (início, fim)} com posições de caracteres
+            em text, apenas para as seções encontradas.
+        """
+        return self._segment_lowered(_lowercase_aligned(text))
+
+    def _segment_lowered(self, lowered: str) -> Dict[str, Tuple[int, int]]:
+        starts: Dict[str, int] = {}
+        for match in _SECTION_RE.finditer(lowered):
+            name = _SECTION_BY_MARKER[match.group(1)]
+            if name in starts:
+                continue
+            # O marcador precisa começar e terminar em limite de palavra
+            before = lowered[match.start() - 1] if match.start() else ' '
+            after = lowered[match.end()] if match.end() < len(lowered) else ' '
+            if before.isalnum() or after.isalnum():
+                continue
+            starts[name] = match.start()
+            if len(starts) == len(SECTION_MARKERS):
+                break
+
+        if 'narrativa' not in starts and 'qualificacao' in starts:
+            qualificacao = starts['qualificacao']
+            limit = min((start for start in starts.values() if start > qualificacao), default=len(lowered))
+            opening = _NARRATIVE_OPENING_RE.search(lowered, qualificacao, limit)
+            if opening:
+                starts['narrativa'] = opening.start(1)
+
+        ordered = sorted(starts.items(), key=lambda item: item[1])
+        sections: Dict[str, Tuple[int, int]] = {}
+        for i, (name, start) in enumerate(ordered):
+            end = ordered[i + 1][1] if i + 1 < len(ordered) else len(lowered)
+            sections[name] = (start, end)
+        return sections
+
+    def section_text(self, text: str, names: Tuple[str, ...]) -> str:
+        """
+        Retorna apenas o texto das seções pedidas, na ordem do documento.
+        Se nenhuma delas for encontrada, retorna o texto inteiro.
+
+        Args:
+            text: Texto da denúncia.
+            names: Nomes das seções (chaves de SECTION_MARKERS).
+
+        Returns:
+            Texto das seções, separado por linhas em branco.
+        """
+        sections = self.segment_sections(text)
+        spans = sorted(sections[name] for name in names if name in sections)
+        if not spans:
+            return text
+        return "\n\n".join(text[start:end].strip() for start, end in spans)
+
 # Exemplo de uso:
 if __name__ == "__main__":
     parser = ParserPDF(use_ocr=True)
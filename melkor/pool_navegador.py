@@ -0,0 +1,347 @@
+# pool_navegador.py
+
+"""
+Pool de contextos do Chromium compartilhado entre buscas de jurisprudência.
+Abrir o navegador a cada requisição custa segundos; aqui o navegador fica
+aberto e os contextos são reaproveitados entre buscas. Cada contexto é
+dedicado a um site e herda o estado salvo daquele site (cookies e
+localStorage, como o aceite de cookies), de modo que pop-ups de consentimento
+não precisam ser fechados de novo. Contextos são reciclados após um número de
+páginas ou quando a memória do Chromium passa do limite, contendo os
+vazamentos de memória do navegador.
+
+Os objetos do Playwright pertencem ao loop de eventos que os criou, por isso
+há um pool por loop (obter_pool). O pool é fechado quando o seu loop é
+encerrado: sob async_to_sync (servidor WSGI) cada requisição tem um loop
+próprio, e o navegador aberto nela não pode sobreviver ao loop.
+"""
+
+import asyncio
+import contextlib
+import time
+import weakref
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Set
+
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Opções dos contextos criados pelo pool
+OPCOES_CONTEXTO = {
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "java_script_enabled": True,
+    "accept_downloads": False,
+    "bypass_csp": True,
+}
+# Tempo máximo (em segundos) da verificação de saúde de um contexto ocioso
+TIMEOUT_VERIFICACAO = 5.0
+
+
+def _pids_filhos() -> Set[int]:
+    """PIDs dos processos filhos diretos deste processo."""
+    try:
+        return {processo.pid for processo in psutil.Process().children()}
+    except psutil.Error:
+        return set()
+
+
+def _processos_driver(pids_anteriores: Set[int]) -> List["psutil.Process"]:
+    """
+    Processos do driver do Playwright: os filhos diretos criados desde
+    pids_anteriores, preferindo os que executam o driver ("run-driver"), caso
+    outro filho (um processo do pool de OCR, por exemplo) tenha surgido ao
+    mesmo tempo.
+    """
+    novos = []
+    try:
+        novos = [processo for processo in psutil.Process().children() if processo.pid not in pids_anteriores]
+    except psutil.Error:
+        pass
+    drivers = []
+    for processo in novos:
+        try:
+            if any('run-driver' in parte for parte in processo.cmdline()):
+                drivers.append(processo)
+        except psutil.Error:
+            continue
+    return drivers or novos
+
+
+class _ContextoPool:
+    """Um contexto do pool e seus contadores."""
+
+    def __init__(self, contexto: BrowserContext, site: str, browser: Browser):
+        self.contexto = contexto
+        self.site = site
+        self.browser = browser
+        self.paginas = 0
+        self.ultimo_uso = time.monotonic()
+        contexto.on("page", self._contar_pagina)
+
+    def _contar_pagina(self, _page) -> None:
+        self.paginas += 1
+
+
+class PoolNavegador:
+    def __init__(self, tamanho: int = 4, headless: bool = True, tempo_ocioso: float = 300.0,
+                 max_paginas_por_contexto: int = 50, max_rss_mb: Optional[int] = 1536,
+                 opcoes_contexto: Optional[Dict[str, object]] = None):
+        """
+        Inicializa o pool (o navegador só é aberto no primeiro uso).
+
+        Args:
+            tamanho: Número máximo de contextos abertos ao mesmo tempo.
+            headless: Se True, executa o navegador sem interface gráfica.
+            tempo_ocioso: Segundos sem uso após os quais um contexto é fechado.
+            max_paginas_por_contexto: Páginas abertas por um contexto antes de
+                                      ele ser reciclado.
+            max_rss_mb: Memória (RSS) máxima somada dos processos do navegador
+                        (o driver do Playwright aberto pelo pool e seus
+                        descendentes, o Chromium). Acima dela, contextos devolvidos são fechados e, sem
+                        contextos em uso, o navegador é reiniciado. Requer
+                        psutil; None desativa a verificação.
+            opcoes_contexto: Opções de browser.new_context (padrão: OPCOES_CONTEXTO).
+        """
+        self.tamanho = max(1, tamanho)
+        self.headless = headless
+        self.tempo_ocioso = tempo_ocioso
+        self.max_paginas_por_contexto = max_paginas_por_contexto
+        self.max_rss_mb = max_rss_mb if psutil is not None else None
+        self.opcoes_contexto = opcoes_contexto or OPCOES_CONTEXTO
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        # Processo do driver do Playwright, registrado ao iniciá-lo; os outros
+        # filhos do worker (tesseract, pool de OCR) não entram na conta de memória
+        self._processos_driver: List["psutil.Process"] = []
+        self._ociosos: List[_ContextoPool] = []
+        self._em_uso = 0
+        self._abrindo = 0
+        # Estado de armazenamento (cookies, localStorage) salvo por site
+        self._estado_sites: Dict[str, Dict[str, object]] = {}
+        self._condicao = asyncio.Condition()
+        self._lock_navegador = asyncio.Lock()
+        self.criados = 0
+        self.reaproveitados = 0
+        self.reciclados = 0
+        self.falhas_verificacao = 0
+        self.reinicios_navegador = 0
+
+    async def _navegador(self) -> Browser:
+        """Retorna o navegador, abrindo-o (ou reabrindo-o após uma queda) se necessário."""
+        async with self._lock_navegador:
+            if self.playwright is None:
+                pids_anteriores = _pids_filhos() if self.max_rss_mb else set()
+                self.playwright = await async_playwright().start()
+                if self.max_rss_mb:
+                    self._processos_driver = _processos_driver(pids_anteriores)
+            if self.browser is None or not self.browser.is_connected():
+                self.browser = await self.playwright.chromium.launch(headless=self.headless)
+            return self.browser
+
+    @contextlib.asynccontextmanager
+    async def contexto(self, site: str) -> AsyncIterator[BrowserContext]:
+        """
+        Empresta um contexto dedicado ao site pelo tempo do bloco `async with`.
+
+        Args:
+            site: Nome do site; contextos só são reaproveitados para o mesmo site.
+
+        Yields:
+            BrowserContext pronto para abrir páginas. Páginas deixadas abertas
+            são fechadas na devolução.
+        """
+        item = await self._adquirir(site)
+        try:
+            yield item.contexto
+        finally:
+            await self._liberar(item)
+
+    async def _adquirir(self, site: str) -> _ContextoPool:
+        while True:
+            fechar: List[_ContextoPool] = []
+            async with self._condicao:
+                while True:
+                    fechar += self._remover_expirados()
+                    item = next((i for i in reversed(self._ociosos) if i.site == site), None)
+                    if item is not None:
+                        self._ociosos.remove(item)
+                        self._em_uso += 1
+                        break
+                    if self._em_uso + self._abrindo + len(self._ociosos) < self.tamanho:
+                        self._abrindo += 1
+                        break
+                    if self._ociosos:
+                        # Pool cheio: fecha o contexto ocioso usado há mais tempo (outro site)
+                        fechar.append(self._ociosos.pop(0))
+                        continue
+                    await self._condicao.wait()
+            await self._fechar(fechar)
+
+            if item is None:
+                try:
+                    item = await self._criar(site)
+                finally:
+                    async with self._condicao:
+                        self._abrindo -= 1
+                        self._em_uso += item is not None
+                return item
+            if await self._saudavel(item):
+                self.reaproveitados += 1
+                return item
+            # Contexto quebrado (ex.: navegador caiu): descarta e tenta de novo
+            self.falhas_verificacao += 1
+            await self._liberar(item, descartar=True)
+
+    async def _criar(self, site: str) -> _ContextoPool:
+        browser = await self._navegador()
+        contexto = await browser.new_context(storage_state=self._estado_sites.get(site),
+                                             **self.opcoes_contexto)
+        self.criados += 1
+        return _ContextoPool(contexto, site, browser)
+
+    async def _saudavel(self, item: _ContextoPool) -> bool:
+        """Verificação de saúde: o navegador responde a uma chamada simples no contexto."""
+        if item.browser is not self.browser or not item.browser.is_connected():
+            return False
+        try:
+            await asyncio.wait_for(item.contexto.cookies(), timeout=TIMEOUT_VERIFICACAO)
+        except Exception:
+            return False
+        return True
+
+    async def _liberar(self, item: _ContextoPool, descartar: bool = False) -> None:
+        """Devolve o contexto ao pool, ou o fecha se precisar ser reciclado."""
+        item.ultimo_uso = time.monotonic()
+        if not descartar:
+            try:
+                for pagina in item.contexto.pages:
+                    await pagina.close()
+                self._estado_sites[item.site] = await item.contexto.storage_state()
+            except Exception:
+                descartar = True
+        memoria_excedida = self._memoria_excedida()
+        reciclar = descartar or memoria_excedida or item.paginas >= self.max_paginas_por_contexto
+
+        fechar: List[_ContextoPool] = []
+        async with self._condicao:
+            self._em_uso -= 1
+            if reciclar:
+                fechar.append(item)
+                self.reciclados += 1
+            else:
+                self._ociosos.append(item)
+            reiniciar = memoria_excedida and self._em_uso == 0 and self._abrindo == 0
+            if reiniciar:
+                fechar += self._ociosos
+                self._ociosos = []
+            self._condicao.notify_all()
+        await self._fechar(fechar)
+        if reiniciar:
+            await self._fechar_navegador()
+            self.reinicios_navegador += 1
+
+    def _remover_expirados(self) -> List[_ContextoPool]:
+        """Retira do pool os contextos ociosos há mais de tempo_ocioso (chamado com o lock)."""
+        limite = time.monotonic() - self.tempo_ocioso
+        expirados = [item for item in self._ociosos if item.ultimo_uso < limite]
+        if expirados:
+            self._ociosos = [item for item in self._ociosos if item.ultimo_uso >= limite]
+        return expirados
+
+    async def _fechar(self, itens: List[_ContextoPool]) -> None:
+        for item in itens:
+            try:
+                await item.contexto.close()
+            except Exception:
+                pass # Navegador já fechado
+
+    def _memoria_excedida(self) -> bool:
+        """Soma o RSS do driver do Playwright deste pool e dos seus descendentes (Chromium)."""
+        if not self.max_rss_mb:
+            return False
+        total = 0
+        for driver in self._processos_driver:
+            try:
+                processos = [driver] + driver.children(recursive=True)
+            except psutil.Error:
+                continue
+            for processo in processos:
+                try:
+                    total += processo.memory_info().rss
+                except psutil.Error:
+                    continue
+        return total > self.max_rss_mb * 1024 * 1024
+
+    async def _fechar_navegador(self) -> None:
+        async with self._lock_navegador:
+            if self.browser is not None:
+                try:
+                    await self.browser.close()
+                except Exception:
+                    pass
+                self.browser = None
+
+    async def fechar(self) -> None:
+        """Fecha todos os contextos ociosos, o navegador e o Playwright."""
+        async with self._condicao:
+            ociosos, self._ociosos = self._ociosos, []
+        await self._fechar(ociosos)
+        await self._fechar_navegador()
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+            self._processos_driver = []
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores de contextos criados, reaproveitados e reciclados."""
+        return {
+            "criados": self.criados,
+            "reaproveitados": self.reaproveitados,
+            "reciclados": self.reciclados,
+            "falhas_verificacao": self.falhas_verificacao,
+            "reinicios_navegador": self.reinicios_navegador,
+            "ociosos": len(self._ociosos),
+            "em_uso": self._em_uso,
+        }
+
+
+# Um pool por loop de eventos; some junto com o loop
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PoolNavegador]" = weakref.WeakKeyDictionary()
+# Guardas que fecham cada pool no encerramento do loop (o loop só guarda
+# referências fracas aos geradores assíncronos)
+_guardas: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGenerator]" = weakref.WeakKeyDictionary()
+
+
+async def _fechar_com_loop(pool: PoolNavegador) -> AsyncGenerator[None, None]:
+    """
+    Gerador assíncrono que fica suspenso enquanto o loop existir. Ao encerrar
+    o loop, asyncio.run e async_to_sync chamam loop.shutdown_asyncgens(), que
+    fecha os geradores abertos: o finally fecha então o navegador e o
+    Playwright do pool.
+    """
+    try:
+        yield
+    finally:
+        try:
+            await pool.fechar()
+        except Exception as e:
+            print(f"Erro ao fechar o pool do navegador: {e}")
+
+
+def obter_pool(**opcoes) -> PoolNavegador:
+    """
+    Retorna o pool compartilhado do loop de eventos atual, criando-o na
+    primeira chamada com as opções dadas (ver PoolNavegador). Deve ser chamada
+    de dentro de uma corrotina.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = PoolNavegador(**opcoes)
+        guarda = _guardas[loop] = _fechar_com_loop(pool)
+        # A primeira iteração registra o gerador no loop
+        loop.create_task(guarda.__anext__())
+    return pool
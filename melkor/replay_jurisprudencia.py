@@ -0,0 +1,181 @@
+# replay_jurisprudencia.py
+
+"""
+Gravação e reprodução das respostas dos sites de jurisprudência.
+Sem isso a JurisprudenciaTool só pode ser testada ou medida contra os sites
+reais, e mudanças de seletores e de extração vão para produção às cegas.
+
+No modo "gravar" as respostas recebidas durante uma busca real são salvas
+em disco, uma por arquivo JSON, em um diretório por site. No modo
+"reproduzir" as mesmas requisições são atendidas a partir desses arquivos,
+sem rede: requisições sem resposta gravada são abortadas (e contadas em
+faltas), de modo que a execução fica totalmente offline.
+
+As páginas do navegador são atendidas pelo roteamento do Playwright
+(atender) e o caminho HTTP dos adaptadores por um transporte do httpx
+(cliente_http).
+
+Uso (com a ferramenta):
+    replay = ReplayJurisprudencia("fixtures/jurisprudencia", modo="gravar")
+    tool = JurisprudenciaTool(replay=replay, usar_cache=False)
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import weakref
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from playwright.async_api import Route
+
+from melkor.cliente_http import CABECALHOS, httpx
+
+MODOS_REPLAY = ("gravar", "reproduzir")
+
+# Cabeçalhos que deixam de valer porque o corpo é gravado já decodificado
+_CABECALHOS_DESCARTADOS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def _normalizar_url(url: str) -> str:
+    """URL sem fragmento e com os parâmetros da query ordenados."""
+    partes = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((partes.scheme, partes.netloc, partes.path, query, ""))
+
+
+class ArquivoRespostas:
+    """Respostas gravadas em disco: <diretorio>/<site>/<hash da requisição>.json."""
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+
+    def _caminho(self, site: str, metodo: str, url: str, corpo: Optional[bytes]) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{metodo.upper()} {_normalizar_url(url)}\n".encode("utf-8"))
+        digest.update(corpo or b"")
+        return os.path.join(self.diretorio, site, f"{digest.hexdigest()[:32]}.json")
+
+    def obter(self, site: str, metodo: str, url: str,
+              corpo: Optional[bytes] = None) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Retorna (status, cabeçalhos, corpo) gravados para a requisição, ou None."""
+        try:
+            with open(self._caminho(site, metodo, url, corpo), "r", encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+        return dados["status"], dados["cabecalhos"], base64.b64decode(dados["corpo_base64"])
+
+    def salvar(self, site: str, metodo: str, url: str, corpo_requisicao: Optional[bytes],
+               status: int, cabecalhos: Dict[str, str], corpo: bytes) -> None:
+        """Grava uma resposta; cabeçalhos de codificação e tamanho são descartados."""
+        caminho = self._caminho(site, metodo, url, corpo_requisicao)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        dados = {
+            "metodo": metodo.upper(),
+            "url": url,
+            "status": status,
+            "cabecalhos": {nome: valor for nome, valor in cabecalhos.items()
+                           if nome.lower() not in _CABECALHOS_DESCARTADOS},
+            "corpo_base64": base64.b64encode(corpo).decode("ascii"),
+        }
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False, indent=1)
+
+
+class ReplayJurisprudencia:
+    def __init__(self, diretorio: str, modo: str = "reproduzir"):
+        """
+        Args:
+            diretorio: Diretório das respostas gravadas.
+            modo: "gravar" (busca real, salvando as respostas) ou "reproduzir"
+                  (somente as respostas gravadas, sem rede).
+        """
+        if modo not in MODOS_REPLAY:
+            raise ValueError(f"Modo de replay inválido: {modo}")
+        self.arquivo = ArquivoRespostas(diretorio)
+        self.modo = modo
+        self.gravadas = 0
+        self.reproduzidas = 0
+        self.faltas = 0
+        # Clientes HTTP por site, um conjunto por loop de eventos (como em cliente_http)
+        self._clientes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, object]]" = \
+            weakref.WeakKeyDictionary()
+
+    async def atender(self, route: Route, site: str) -> None:
+        """
+        Atende uma requisição do navegador (handler de page.route): devolve a
+        resposta gravada, ou busca na rede e grava, conforme o modo.
+        """
+        request = route.request
+        corpo = request.post_data_buffer
+        if self.modo == "reproduzir":
+            gravada = self.arquivo.obter(site, request.method, request.url, corpo)
+            if gravada is None:
+                self.faltas += 1
+                await route.abort()
+                return
+            status, cabecalhos, conteudo = gravada
+            self.reproduzidas += 1
+            await route.fulfill(status=status, headers=cabecalhos, body=conteudo)
+            return
+
+        resposta = await route.fetch()
+        conteudo = await resposta.body()
+        self.arquivo.salvar(site, request.method, request.url, corpo,
+                            resposta.status, resposta.headers, conteudo)
+        self.gravadas += 1
+        await route.fulfill(response=resposta, body=conteudo)
+
+    def cliente_http(self, site: str) -> "httpx.AsyncClient":
+        """
+        Cliente HTTP para o caminho sem navegador dos adaptadores, com o mesmo
+        comportamento de atender (gravação ou reprodução).
+        """
+        loop = asyncio.get_running_loop()
+        clientes = self._clientes.setdefault(loop, {})
+        cliente = clientes.get(site)
+        if cliente is None or cliente.is_closed:
+            cliente = clientes[site] = httpx.AsyncClient(
+                headers=CABECALHOS, follow_redirects=True, transport=_TransporteReplay(self, site))
+        return cliente
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores de respostas gravadas, reproduzidas e faltantes."""
+        return {"gravadas": self.gravadas, "reproduzidas": self.reproduzidas, "faltas": self.faltas}
+
+
+class _TransporteReplay(httpx.AsyncBaseTransport if httpx is not None else object):
+    """Transporte do httpx que grava ou reproduz as respostas de um site."""
+
+    def __init__(self, replay: ReplayJurisprudencia, site: str):
+        self.replay = replay
+        self.site = site
+        self._rede = httpx.AsyncHTTPTransport() if replay.modo == "gravar" else None
+
+    async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+        corpo = await request.aread()
+        url = str(request.url)
+        if self._rede is None:
+            gravada = self.replay.arquivo.obter(self.site, request.method, url, corpo)
+            if gravada is None:
+                self.replay.faltas += 1
+                raise httpx.ConnectError(f"Sem resposta gravada para {request.method} {url}", request=request)
+            status, cabecalhos, conteudo = gravada
+            self.replay.reproduzidas += 1
+            return httpx.Response(status, headers=cabecalhos, content=conteudo, request=request)
+
+        resposta = await self._rede.handle_async_request(request)
+        conteudo = await resposta.aread()
+        self.replay.arquivo.salvar(self.site, request.method, url, corpo, resposta.status_code,
+                                   dict(resposta.headers), conteudo)
+        self.replay.gravadas += 1
+        cabecalhos = {nome: valor for nome, valor in resposta.headers.items()
+                      if nome.lower() not in _CABECALHOS_DESCARTADOS}
+        return httpx.Response(resposta.status_code, headers=cabecalhos, content=conteudo, request=request)
+
+    async def aclose(self) -> None:
+        if self._rede is not None:
+            await self._rede.aclose()
@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+O endpoint de streaming de jurisprudência (core:api_jurisprudencia_stream)
+só entrega os resultados aos poucos quando servido por ASGI, por exemplo:
+
+    gunicorn -k uvicorn.workers.UvicornWorker melkor_project.asgi:application
 """
 
 import os
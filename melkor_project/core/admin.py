@@ -11,10 +11,10 @@ class HistoricoPesquisaAdmin(admin.ModelAdmin):
         "vara",
         "resultado_resumido",
     )
-    search_fields = ("usuario__username", "termo_pesquisado", "vara")
+    search_fields = ("usuario__username", "termo_pesquisado", "termo_normalizado", "vara")
     list_filter = ("timestamp", "vara", "usuario")
     date_hierarchy = "timestamp"
-    readonly_fields = ("timestamp",)
+    readonly_fields = ("timestamp", "termo_normalizado")
 
 # @admin.register(Prompt)
 # class PromptAdmin(admin.ModelAdmin):
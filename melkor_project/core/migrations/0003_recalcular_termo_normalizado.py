@@ -0,0 +1,83 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+# Cópia congelada da normalização de melkor.normalizador_consulta na versão
+# usada por esta migração: se o módulo mudar, a migração continua gerando os
+# mesmos valores.
+ABREVIACOES = {
+    "art": "artigo",
+    "arts": "artigo",
+    "inc": "inciso",
+    "par": "paragrafo",
+    "cp": "codigo penal",
+    "cpp": "codigo processo penal",
+    "cf": "constituicao federal",
+    "crfb": "constituicao federal",
+    "ctb": "codigo transito brasileiro",
+    "eca": "estatuto crianca adolescente",
+    "lep": "lei execucao penal",
+    "hc": "habeas corpus",
+    "resp": "recurso especial",
+    "re": "recurso extraordinario",
+}
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de do dos e em entre na nas no nos
+o os ou para pela pelas pelo pelos por que se sob sobre um uma umas uns
+""".split())
+_PLURAIS = (("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+            ("res", "r"), ("zes", "z"), ("ns", "m"), ("s", ""))
+_TAMANHO_MINIMO_RADICAL = 4
+_RE_ORDINAL = re.compile(r"(\d+)\s*[ºª°]")
+_RE_TOKEN = re.compile(r"[a-z0-9]+")
+_RE_PALAVRA = re.compile(r"[^\W_]+")
+
+
+def _remover_acentos(texto):
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def _radical(palavra):
+    if palavra.isdigit() or len(palavra) <= _TAMANHO_MINIMO_RADICAL:
+        return palavra
+    for sufixo, singular in _PLURAIS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 2:
+            palavra = palavra[:-len(sufixo)] + singular
+            break
+    if palavra[-1] in "aeo" and len(palavra) > _TAMANHO_MINIMO_RADICAL:
+        palavra = palavra[:-1]
+    return palavra
+
+
+def canonizar_consulta(consulta):
+    # Abreviações comparadas antes da remoção dos acentos ("ré" não é "RE")
+    texto = _RE_ORDINAL.sub(r"\1", consulta).replace("§", " paragrafo ").lower()
+    termos = []
+    for palavra_original in _RE_PALAVRA.findall(texto):
+        expandida = ABREVIACOES.get(palavra_original) or _remover_acentos(palavra_original)
+        for palavra in _RE_TOKEN.findall(expandida):
+            if palavra not in STOPWORDS:
+                termos.append(_radical(palavra))
+    return " ".join(sorted(set(termos)))
+
+
+def recalcular_termo_normalizado(apps, schema_editor):
+    # Abreviações passaram a ser comparadas antes da remoção de acentos ("ré"
+    # deixou de virar "recurso extraordinario")
+    HistoricoPesquisa = apps.get_model("core", "HistoricoPesquisa")
+    for pesquisa in HistoricoPesquisa.objects.only("id", "termo_pesquisado", "termo_normalizado").iterator():
+        termo_normalizado = canonizar_consulta(pesquisa.termo_pesquisado or "")[:500]
+        if termo_normalizado != pesquisa.termo_normalizado:
+            HistoricoPesquisa.objects.filter(pk=pesquisa.pk).update(termo_normalizado=termo_normalizado)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_historicopesquisa_termo_normalizado"),
+    ]
+
+    operations = [
+        migrations.RunPython(recalcular_termo_normalizado, migrations.RunPython.noop),
+    ]
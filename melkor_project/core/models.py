@@ -1,6 +1,8 @@
 # core/models.py
 from django.db import models
 from django.contrib.auth.models import User
+
+from melkor.normalizador_consulta import canonizar_consulta
 # from accounts.models import Cliente # Se necessário vincular diretamente ao Cliente
 
 class HistoricoPesquisa(models.Model):
@@ -9,12 +11,18 @@ class HistoricoPesquisa(models.Model):
     # cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, null=True, blank=True, help_text="Cliente associado à pesquisa, se aplicável")
     timestamp = models.DateTimeField(auto_now_add=True, help_text="Data e hora da pesquisa")
     termo_pesquisado = models.TextField(help_text="Termo ou descrição da pesquisa realizada")
+    termo_normalizado = models.CharField(max_length=500, blank=True, default="", db_index=True, editable=False,
+                                         help_text="Forma canônica do termo (normalizador_consulta), para agrupar pesquisas equivalentes")
     resultado_resumido = models.TextField(blank=True, null=True, help_text="Resumo do resultado da pesquisa")
     # O campo 'vara' é mencionado como filtro, pode ser um CharField ou ForeignKey para uma tabela de Varas, se houver.
     vara = models.CharField(max_length=255, blank=True, null=True, help_text="Vara relacionada à pesquisa, para filtragem")
     # Adicionar campos para armazenar os resultados completos ou referências a eles, se necessário.
     # Ex: json_resultado_completo = models.JSONField(null=True, blank=True)
 
+    def save(self, *args, **kwargs):
+        self.termo_normalizado = canonizar_consulta(self.termo_pesquisado or "")[:500]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Pesquisa de {self.usuario.username} em {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
 
@@ -1,3 +1,657 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import io
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import NameObject
+
+from melkor.benchmark_parser_pdf import TEXTO_MODELO
+from melkor.adaptadores_jurisprudencia import (AdaptadorSTJ, Disjuntor, LimitadorTaxa, obter_adaptador,
+                                               registrar_adaptador)
+from melkor.cache_jurisprudencia import CacheJurisprudencia
+from melkor.cliente_http import fechar_cliente_http
+from melkor.corpus_denuncias_pdf import gerar_pdf
+from melkor.indice_jurisprudencia import IndiceJurisprudencia
+from melkor import jurisprudencia_tool
+from melkor.jurisprudencia_tool import JurisprudenciaTool
+from melkor.normalizador_consulta import canonizar_consulta, comparar_taxas_acerto, radicais
+from melkor.parser_pdf import ParserPDF, _ocr_page_worker
+
+from . import views
+
+# Vocabulário dos textos aleatórios: gatilhos (com variações de caixa e
+# plural), conectivos das caudas, datas, artigos e palavras comuns
+_VOCABULARIO = [
+    "denunciado", "Denunciados", "acusado", "ACUSADOS", "réu", "réus", "vítima", "Vítimas", "ofendido",
+    "crime", "crimes", "delito", "delitos", "de", "do", "da", "art", "artigo", "Art.", "121", "157",
+    "do CP", "do Código Penal", "em", "no dia", "na data de", "datado de", "10/01/2023", "3/4/21",
+    "10 de janeiro de 2023", "ocorrido", "ocorrida", "aconteceu", "deu-se", "local", "lugar", "endereço",
+    "no", "na", "nos", "nas", "testemunha", "testemunhas", "ouvir", "ouvido", "depoimento de",
+    "João", "Maria da Silva", "Rua", "Avenida", "Belo Horizonte", "sem", "nome", "emprego", "casa",
+]
+_SEPARADORES = [" ", " ", " ", "  ", ", ", ". ", "; ", "\n", ": ", ":", "", "\t"]
+
+
+def _extracao_anterior(text):
+    """
+    Implementação anterior de ParserPDF.extract_structured_info, mantida aqui
+    como oráculo do teste diferencial (uma regex por padrão, uma varredura cada).
+    """
+    info = {'reus': [], 'vitimas': [], 'crimes': [], 'data_fato': '', 'local_fato': '', 'testemunhas': []}
+    listas = {
+        'reus': [r'denunciado[s]?:?\s*([^,;\n\.]+)', r'acusado[s]?:?\s*([^,;\n\.]+)',
+                 r'réu[s]?:?\s*([^,;\n\.]+)'],
+        'vitimas': [r'vítima[s]?:?\s*([^,;\n\.]+)', r'ofendido[s]?:?\s*([^,;\n\.]+)'],
+        'crimes': [r'crime[s]? (?:de|do|da)?\s*([^,;\n\.]+)', r'delito[s]? (?:de|do|da)?\s*([^,;\n\.]+)',
+                   r'(?:art|artigo)[\.:]?\s*(\d+)[^\d]+(?:do|da)\s*(?:CP|Código Penal)'],
+        'testemunhas': [r'testemunha[s]?:?\s*([^,;\n\.]+)', r'(?:ouvir|ouvido|depoimento de)\s*([^,;\n\.]+)'],
+    }
+    for campo, patterns in listas.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                if match.group(1).strip() and match.group(1).strip() not in info[campo]:
+                    info[campo].append(match.group(1).strip())
+    meses = r'(?:janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)'
+    for pattern in [r'(?:em|no dia|na data de|datado de)\s*(\d{1,2}\/\d{1,2}\/\d{2,4})',
+                    r'(?:em|no dia|na data de|datado de)\s*(\d{1,2}\s+de\s+' + meses + r'\s+de\s+\d{2,4})']:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['data_fato'] = match.group(1).strip()
+            break
+    for pattern in [r'(?:ocorrido|ocorrida|ocorreram|aconteceu|sucedeu|deu-se)[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})',
+                    r'(?:local|lugar|endereço)[^,;\.]*(?:em|no|na|nos|nas)\s*([^,;\n\.]{5,100})']:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['local_fato'] = match.group(1).strip()
+            break
+    return info
+
+
+def _comparavel(info):
+    """Listas ordenadas: a implementação atual devolve os valores na ordem do documento."""
+    return {campo: sorted(valor) if isinstance(valor, list) else valor for campo, valor in info.items()}
+
+
+class ExtracaoDiferencialTests(SimpleTestCase):
+    """extract_structured_info (varredura única) contra a implementação anterior."""
+
+    def setUp(self):
+        self.parser = ParserPDF(use_ocr=False)
+
+    def assertMesmaExtracao(self, texto):
+        self.assertEqual(_comparavel(_extracao_anterior(texto)),
+                         _comparavel(self.parser.extract_structured_info(texto, use_sections=False)),
+                         msg=repr(texto))
+
+    def test_texto_modelo(self):
+        self.assertMesmaExtracao(TEXTO_MODELO)
+
+    def test_textos_aleatorios(self):
+        rng = random.Random(2024)
+        for _ in range(3000):
+            texto = "".join(rng.choice(_VOCABULARIO) + rng.choice(_SEPARADORES)
+                            for _ in range(rng.randint(1, 60)))
+            self.assertMesmaExtracao(texto)
+
+    def test_casos_de_retrocesso(self):
+        # Cauda que falha no gatilho mais longo e casa no mais curto, local
+        # com "nos" lido como "no" + "s..." e local vazio que encerra a busca
+        for texto in ["denunciados, João", "ocorrido nos fundos da casa", "ocorrido em       . local na Rua Azul",
+                      "local sem nada; ocorrido no bairro Centro", "Art. 157 e outros do CP"]:
+            self.assertMesmaExtracao(texto)
+
+
+class SegmentacaoSecoesTests(SimpleTestCase):
+    """Seções de denúncias sem o título "dos fatos" e campos restritos a elas."""
+
+    def setUp(self):
+        self.parser = ParserPDF(use_ocr=False)
+
+    def test_texto_modelo(self):
+        secoes = self.parser.segment_sections(TEXTO_MODELO)
+        self.assertEqual(list(secoes), ['qualificacao', 'narrativa', 'capitulacao'])
+        self.assertTrue(TEXTO_MODELO[slice(*secoes['narrativa'])].startswith('No dia 10 de janeiro'))
+        info = self.parser.extract_structured_info(TEXTO_MODELO)
+        # A data de nascimento (15/03/1985) está na qualificação
+        self.assertEqual(info['data_fato'], '10 de janeiro de 2023')
+        self.assertEqual(info['crimes'],
+                         self.parser.extract_structured_info(TEXTO_MODELO, use_sections=False)['crimes'])
+
+    def test_paginas_do_corpus(self):
+        for semente in range(5):
+            texto = self.parser.extract_text_from_bytes(gerar_pdf(1, 'texto', semente=semente))
+            data_narrativa = re.search(r'No dia (\d+ de \w+ de \d{4})', texto).group(1)
+            info = self.parser.extract_structured_info(texto)
+            self.assertEqual(info['data_fato'], data_narrativa, msg=texto)
+            self.assertTrue(info['crimes'])
+
+    def test_aberturas_da_narrativa(self):
+        for abertura in ['Em 13/04/2016, por volta das 22h', 'Consta que, em 13/04/2016', 'No dia 13/04/2016']:
+            texto = (f"Denúncia em face de: FULANO, nascido em 04/08/1988, residente na Rua A. {abertura}, "
+                     f"o denunciado subtraiu o celular da vítima BELTRANO. Diante do exposto, requer-se a condenação.")
+            info = self.parser.extract_structured_info(texto)
+            self.assertEqual(info['data_fato'], '13/04/2016', msg=texto)
+            self.assertEqual(info['vitimas'], ['BELTRANO'])
+
+    def test_sem_abertura_mantem_qualificacao(self):
+        texto = "Denúncia em face de: FULANO, nascido em 04/08/1988. Diante do exposto, requer-se a condenação."
+        self.assertNotIn('narrativa', self.parser.segment_sections(texto))
+
+
+class IndiceJurisprudenciaTests(SimpleTestCase):
+    """Índice de jurisprudência no SQLite FTS5 em memória."""
+
+    def setUp(self):
+        self.indice = IndiceJurisprudencia(dsn='', caminho=':memory:')
+        self.addCleanup(self.indice.fechar)
+
+    def test_insercao_sem_duplicatas_por_link_canonico(self):
+        novos = self.indice.inserir_sincrono('stj', None, [
+            {'titulo': 'Prisão preventiva', 'link': 'http://www.STJ.jus.br/processo/?b=2&a=1&utm_source=x#topo'},
+            {'titulo': 'Repetido no lote', 'link': 'https://stj.jus.br/processo?a=1&b=2'},
+        ])
+        self.assertEqual(novos, 1)
+        novos = self.indice.inserir_sincrono('stj', None, [
+            {'titulo': 'Prisões preventivas revogadas', 'link': 'https://stj.jus.br/processo/?a=1&b=2'},
+        ])
+        self.assertEqual(novos, 0)
+        self.assertEqual(self.indice.estatisticas()['documentos'], 1)
+        self.assertEqual(self.indice.atualizados, 1)
+        resultados = self.indice.buscar_sincrono('prisão preventiva revogada')
+        self.assertEqual([r['titulo'] for r in resultados], ['Prisões preventivas revogadas'])
+
+    def test_estados_da_consulta(self):
+        furtos = [{'titulo': f'Furto qualificado {i}', 'link': f'https://stj.jus.br/{i}'} for i in range(3)]
+        self.assertEqual(self.indice.consultar_sincrono('stj', 'furto', 5)[1], 'escasso')
+        self.indice.inserir_sincrono('stj', None, furtos)
+        self.assertEqual(self.indice.consultar_sincrono('stj', 'furtos qualificados', 3)[1], 'suficiente')
+        self.indice.inserir_sincrono('stj', 'furto', furtos)
+        resultados, estado = self.indice.consultar_sincrono('stj', 'furto', 5)
+        self.assertEqual((len(resultados), estado), (3, 'fresco'))
+        self.indice.idade_maxima = 0
+        self.assertEqual(self.indice.consultar_sincrono('stj', 'furto', 5)[1], 'obsoleto')
+
+    def test_raspagem_vazia_vale_pouco(self):
+        self.indice.inserir_sincrono('stf', 'furto', [])
+        self.assertEqual(self.indice.consultar_sincrono('stf', 'furto', 5), ([], 'fresco'))
+        self.indice.idade_maxima_vazia = 0
+        self.assertEqual(self.indice.consultar_sincrono('stf', 'furto', 5), ([], 'obsoleto'))
+
+    def test_texto_busca_refeito_ao_mudar_versao(self):
+        self.indice.inserir_sincrono('stj', None, [{'titulo': 'Penais', 'link': 'https://stj.jus.br/1'}])
+        backend = self.indice._obter_backend()
+        # Texto gravado pela versão anterior (apenas sem acentos e em minúsculas)
+        backend.executar("UPDATE melkor_jurisprudencia SET texto_busca = 'penais'")
+        backend.executar("UPDATE melkor_jurisprudencia_meta SET valor = '1'")
+        self.assertEqual(self.indice.buscar_sincrono('penal'), [])
+        IndiceJurisprudencia._atualizar_texto_busca(backend)
+        self.assertEqual(len(self.indice.buscar_sincrono('penal')), 1)
+
+
+class _ExecutorRecusado:
+    """Pool de OCR falso: nenhuma página pode ser enviada a ele."""
+
+    def submit(self, *args):
+        raise AssertionError("página enviada ao pool depois do prazo")
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+class PrazoOCRTests(SimpleTestCase):
+    """Prazo do documento no OCR em processos."""
+
+    def test_paginas_nao_sao_enviadas_depois_do_prazo(self):
+        parser = ParserPDF(use_ocr=True, ocr_workers=4, ocr_timeout=1e-9)
+        parser.ocr_available = True
+        parser._create_ocr_executor = lambda *args: _ExecutorRecusado()
+        paginas = list(parser.iter_pages(gerar_pdf(6, 'texto'), mode='ocr'))
+        self.assertEqual([pagina['method'] for pagina in paginas], ['direct'] * 6)
+        self.assertEqual(parser.ocr_stats['failed_pages'], [1, 2, 3, 4, 5, 6])
+
+    def test_worker_desiste_depois_do_prazo(self):
+        opcoes = ParserPDF(use_ocr=False)._ocr_options(False)
+        with self.assertRaises(TimeoutError):
+            _ocr_page_worker(b"", 1, opcoes, time.time() - 1)
+
+
+class ImpressaoDigitalPaginaTests(SimpleTestCase):
+    """_page_fingerprint considera as fontes, e não os números dos objetos."""
+
+    def setUp(self):
+        self.parser = ParserPDF(use_ocr=False)
+        self.pdf = gerar_pdf(3, 'texto')
+
+    def _regravar(self, fonte_base):
+        escritor = PdfWriter()
+        for pagina in PdfReader(io.BytesIO(self.pdf)).pages:
+            escritor.add_page(pagina)
+        for pagina in escritor.pages:
+            fonte = pagina['/Resources']['/Font']['/F1'].get_object()
+            fonte[NameObject('/BaseFont')] = NameObject(fonte_base)
+        saida = io.BytesIO()
+        escritor.write(saida)
+        return saida.getvalue()
+
+    def test_pdf_regravado_mantem_impressoes(self):
+        self.assertEqual(self.parser.page_fingerprints(self._regravar('/Helvetica')),
+                         self.parser.page_fingerprints(self.pdf))
+
+    def test_mesmo_conteudo_com_outra_fonte(self):
+        originais = self.parser.page_fingerprints(self.pdf)
+        outra_fonte = self.parser.page_fingerprints(self._regravar('/Symbol'))
+        self.assertFalse(set(originais) & set(outra_fonte))
+
+
+# Página de resultados do SCON gravada (dois acórdãos, trechos relevantes)
+_PAGINA_SCON = """<html><body><div id="listadocumentos">
+<div class="documento">
+  <div class="paragrafoBRS"><div class="docTitulo">Processo</div>
+    <div class="clsIdentificacao">HC 123456 / MG<br>
+    HABEAS CORPUS 2023/0000001-0</div></div>
+  <a href="/SCON/pesquisar.jsp?b=ACOR&amp;livre=123456">Inteiro teor</a>
+  <div class="paragrafoBRS"><div class="docTitulo">Data do Julgamento</div><div class="docTexto">10/05/2023</div></div>
+  <div class="paragrafoBRS"><div class="docTitulo">Ementa</div>
+    <div class="docTexto">PENAL. FURTO QUALIFICADO. PRINCÍPIO DA INSIGNIFICÂNCIA. INAPLICABILIDADE.</div></div>
+</div>
+<div class="documento">
+  <div class="paragrafoBRS"><div class="clsIdentificacao">REsp 654321 / SP</div></div>
+  <a href="https://processo.stj.jus.br/SCON/GetInteiroTeorDoAcordao?documento=654321">Inteiro teor</a>
+  <div class="paragrafoBRS"><div class="docTitulo">Ementa</div>
+    <div class="docTexto">RECURSO ESPECIAL. FURTO. REINCIDÊNCIA.</div></div>
+</div>
+</div></body></html>"""
+
+
+class _PoolRecusado:
+    """Pool de navegador falso: a busca HTTP não pode abrir contextos."""
+
+    def __init__(self):
+        self.pedidos = 0
+
+    @contextlib.asynccontextmanager
+    async def contexto(self, site):
+        self.pedidos += 1
+        raise AssertionError("o navegador não deveria ser usado")
+        yield
+
+    async def fechar(self):
+        pass
+
+
+class BuscaHTTPTests(SimpleTestCase):
+    """Caminho HTTP do STJ contra um servidor local com a página do SCON gravada."""
+
+    def setUp(self):
+        consultas = self.consultas = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                partes = urlsplit(self.path)
+                consultas.append((partes.path, parse_qs(partes.query)))
+                corpo = _PAGINA_SCON.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        original = obter_adaptador('stj')
+        self.addCleanup(registrar_adaptador, original)
+        registrar_adaptador(AdaptadorSTJ(url_base=f"http://127.0.0.1:{servidor.server_port}"))
+
+    def test_resultados_do_stj_sem_navegador(self):
+        pool = _PoolRecusado()
+        tool = JurisprudenciaTool(pool=pool, usar_cache=False, usar_indice=False, limite_resultados=5)
+
+        async def buscar():
+            try:
+                return await tool.buscar_jurisprudencia('furto qualificado', ['stj'])
+            finally:
+                await fechar_cliente_http()
+
+        resultados = asyncio.run(buscar())
+        self.assertEqual(pool.pedidos, 0)
+        self.assertEqual(tool.ultimo_status_sites['stj']['via'], 'http')
+        self.assertEqual(tool.ultimo_status_sites['stj']['status'], 'ok')
+        self.assertEqual(self.consultas[0][0], '/SCON/pesquisar.jsp')
+        self.assertEqual(self.consultas[0][1]['livre'], ['furto qualificado'])
+        self.assertEqual([r['titulo'] for r in resultados],
+                         ['HC 123456 / MG HABEAS CORPUS 2023/0000001-0', 'REsp 654321 / SP'])
+        self.assertTrue(resultados[0]['link'].startswith(obter_adaptador('stj').url_base + '/SCON/pesquisar.jsp'))
+        self.assertEqual(resultados[0]['data_publicacao'], '10/05/2023')
+        self.assertIn('FURTO QUALIFICADO', resultados[0]['resumo'])
+        self.assertEqual(resultados[1]['data_publicacao'], 'Não informado')
+        self.assertEqual({r['fonte'] for r in resultados}, {'STJ'})
+
+
+class CoalescenciaTests(SimpleTestCase):
+    """CacheJurisprudencia.coalescer com uma raspagem falsa."""
+
+    def test_buscas_identicas_simultaneas_raspam_uma_vez(self):
+        cache = CacheJurisprudencia(usar_django=False)
+        raspagens = []
+
+        async def raspar():
+            raspagens.append(1)
+            await asyncio.sleep(0.05)
+            return [{'titulo': 'HC 1'}], {'status': 'ok', 'resultados': 1}
+
+        async def buscar():
+            # Grafias diferentes da mesma consulta caem na mesma chave
+            termos = ['Homicídio qualificado', 'homicidio  qualificado', 'qualificado homicídio'] * 4
+            return await asyncio.gather(*(cache.coalescer('stj', termo, raspar) for termo in termos))
+
+        respostas = asyncio.run(buscar())
+        self.assertEqual(len(raspagens), 1)
+        self.assertEqual(sorted(origem for _, origem in respostas), ['local'] * 11 + ['raspagem'])
+        self.assertEqual({str(resultado) for resultado, _ in respostas}, {str(respostas[0][0])})
+        self.assertEqual(cache.coalescidas_locais, 11)
+
+    def test_seguidor_raspa_quando_o_lider_falha(self):
+        cache = CacheJurisprudencia(usar_django=False)
+        raspagens = []
+
+        async def raspar_falha():
+            raspagens.append('lider')
+            await asyncio.sleep(0.05)
+            raise RuntimeError('site fora do ar')
+
+        async def raspar_ok():
+            raspagens.append('seguidor')
+            return [], {'status': 'ok', 'resultados': 0}
+
+        async def buscar():
+            lider = asyncio.create_task(cache.coalescer('stj', 'furto', raspar_falha))
+            await asyncio.sleep(0)
+            seguidor = asyncio.create_task(cache.coalescer('stj', 'furto', raspar_ok))
+            return await asyncio.gather(lider, seguidor, return_exceptions=True)
+
+        erro_lider, resposta_seguidor = asyncio.run(buscar())
+        self.assertIsInstance(erro_lider, RuntimeError)
+        self.assertEqual(resposta_seguidor, (([], {'status': 'ok', 'resultados': 0}), 'raspagem'))
+        self.assertEqual(raspagens, ['lider', 'seguidor'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'coalescencia-testes'}})
+    def test_trava_expirada_de_outro_worker(self):
+        caches['default'].clear()
+        cache = CacheJurisprudencia(validade_trava=0.2, espera_trava=10)
+        raspagens = []
+
+        async def raspar():
+            raspagens.append(1)
+            return [{'titulo': 'HC 2'}], {'status': 'ok', 'resultados': 1}
+
+        async def buscar():
+            # Trava deixada por um worker que morreu sem gravar a entrada
+            await caches['default'].aadd(f"{cache.chave('stj', 'furto')}:trava", 1, timeout=0.2)
+            inicio = time.monotonic()
+            resposta = await cache.coalescer('stj', 'furto', raspar)
+            return resposta, time.monotonic() - inicio
+
+        (resultado, origem), segundos = asyncio.run(buscar())
+        self.assertEqual(origem, 'raspagem')
+        self.assertEqual(resultado[0], [{'titulo': 'HC 2'}])
+        self.assertEqual(len(raspagens), 1)
+        self.assertLess(segundos, 5)
+        self.assertEqual(cache.coalescidas_workers, 0)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'coalescencia-testes'}})
+    def test_aguarda_a_entrada_gravada_por_outro_worker(self):
+        caches['default'].clear()
+        cache = CacheJurisprudencia(espera_trava=10)
+
+        async def raspar():
+            raise AssertionError("a raspagem do outro worker deveria ser reaproveitada")
+
+        async def outro_worker():
+            await asyncio.sleep(0.2)
+            await cache.salvar('stj', 'furto', [{'titulo': 'HC 3'}])
+
+        async def buscar():
+            await caches['default'].aadd(f"{cache.chave('stj', 'furto')}:trava", 1, timeout=30)
+            _, resposta = await asyncio.gather(outro_worker(), cache.coalescer('stj', 'furto', raspar))
+            return resposta
+
+        (resultados, status), origem = asyncio.run(buscar())
+        self.assertEqual(origem, 'worker')
+        self.assertEqual(resultados, [{'titulo': 'HC 3'}])
+        self.assertEqual(cache.coalescidas_workers, 1)
+
+
+class _AdaptadorSTJFalso(AdaptadorSTJ):
+    """STJ que responde pelo caminho HTTP sem rede, contando as buscas."""
+
+    def __init__(self, resultados):
+        super().__init__()
+        self.resultados = resultados
+        self.buscas = 0
+
+    async def buscar_http(self, tool, cliente, termo_busca):
+        self.buscas += 1
+        await asyncio.sleep(0.05)
+        return [dict(resultado) for resultado in self.resultados]
+
+
+class StaleWhileRevalidateTests(SimpleTestCase):
+    """Entradas obsoletas do cache servidas na hora e atualizadas em segundo plano."""
+
+    def setUp(self):
+        original = obter_adaptador('stj')
+        self.addCleanup(registrar_adaptador, original)
+        self.adaptador = registrar_adaptador(_AdaptadorSTJFalso([{'titulo': 'HC novo', 'link': 'https://stj.jus.br/2'}]))
+
+    def test_obsoleta_servida_e_atualizada_uma_vez(self):
+        cache = CacheJurisprudencia(usar_django=False, ttl=0, janela_obsoleta=3600)
+        tool = JurisprudenciaTool(pool=_PoolRecusado(), cache=cache, usar_indice=False)
+        antigos = [{'titulo': 'HC antigo', 'link': 'https://stj.jus.br/1'}]
+
+        async def buscar():
+            try:
+                await cache.salvar('stj', 'furto', antigos)
+                primeira = await tool.buscar_jurisprudencia('furto', ['stj'])
+                status = dict(tool.ultimo_status_sites['stj'])
+                segunda = await tool.buscar_jurisprudencia('Furtos', ['stj'])
+                await asyncio.gather(*list(jurisprudencia_tool._revalidacoes))
+                return primeira, status, segunda, await cache.obter('stj', 'furto')
+            finally:
+                await fechar_cliente_http()
+
+        primeira, status, segunda, atualizada = asyncio.run(buscar())
+        self.assertEqual(primeira, antigos)
+        self.assertEqual(segunda, antigos)
+        self.assertEqual(status['cache'], 'obsoleto')
+        self.assertEqual(self.adaptador.buscas, 1)
+        self.assertEqual(cache.atualizacoes, 1)
+        self.assertEqual(atualizada[0], [{'titulo': 'HC novo', 'link': 'https://stj.jus.br/2'}])
+
+    def test_resultado_vazio_expira_em_ttl_vazio(self):
+        cache = CacheJurisprudencia(usar_django=False, ttl_vazio=0.1)
+
+        async def salvar():
+            await cache.salvar('stf', 'furto', [])
+            await cache.salvar('stj', 'furto', [{'titulo': 'HC'}])
+            return await cache.obter('stf', 'furto')
+
+        self.assertEqual(asyncio.run(salvar()), ([], True))
+        time.sleep(0.15)
+        self.assertIsNone(asyncio.run(cache.obter('stf', 'furto')))
+        self.assertEqual(asyncio.run(cache.obter('stj', 'furto')), ([{'titulo': 'HC'}], True))
+
+
+class DisjuntorTests(SimpleTestCase):
+    """Transições fechado → aberto → meio_aberto → fechado/aberto."""
+
+    def setUp(self):
+        self.disjuntor = Disjuntor(falhas_para_abrir=3, tempo_resfriamento=120)
+
+    def _resfriar(self):
+        self.disjuntor.aberto_em -= self.disjuntor.tempo_resfriamento
+
+    def test_abre_apos_falhas_seguidas(self):
+        for _ in range(2):
+            self.disjuntor.registrar_falha()
+        self.disjuntor.registrar_sucesso()
+        for _ in range(2):
+            self.disjuntor.registrar_falha()
+        self.assertEqual(self.disjuntor.estado, 'fechado')
+        self.disjuntor.registrar_falha()
+        self.assertEqual(self.disjuntor.estado, 'aberto')
+        self.assertFalse(self.disjuntor.permitir())
+        self.assertEqual(self.disjuntor.recusadas, 1)
+        self.assertGreater(self.disjuntor.segundos_para_reabrir(), 119)
+
+    def test_meio_aberto_deixa_passar_um_teste(self):
+        for _ in range(3):
+            self.disjuntor.registrar_falha()
+        self._resfriar()
+        self.assertTrue(self.disjuntor.permitir())
+        self.assertEqual(self.disjuntor.estado, 'meio_aberto')
+        self.assertFalse(self.disjuntor.permitir())
+        self.disjuntor.registrar_sucesso()
+        self.assertEqual(self.disjuntor.estado, 'fechado')
+        self.assertTrue(self.disjuntor.permitir())
+
+    def test_teste_com_falha_reabre(self):
+        for _ in range(3):
+            self.disjuntor.registrar_falha()
+        self._resfriar()
+        self.assertTrue(self.disjuntor.permitir())
+        self.disjuntor.registrar_falha()
+        self.assertEqual(self.disjuntor.estado, 'aberto')
+        self.assertEqual(self.disjuntor.aberturas, 2)
+        self.assertFalse(self.disjuntor.permitir())
+
+    def test_teste_cancelado_libera_outro(self):
+        for _ in range(3):
+            self.disjuntor.registrar_falha()
+        self._resfriar()
+        self.assertTrue(self.disjuntor.permitir())
+        self.disjuntor.cancelar()
+        self.assertTrue(self.disjuntor.permitir())
+
+
+class LimitadorTaxaTests(SimpleTestCase):
+    """Token bucket: rajada imediata, espera pela próxima ficha e reabastecimento."""
+
+    def test_rajada_e_espera(self):
+        limitador = LimitadorTaxa(por_segundo=10, rajada=2)
+
+        async def consumir():
+            return [await limitador.aguardar() for _ in range(3)]
+
+        esperas = asyncio.run(consumir())
+        self.assertEqual(esperas[:2], [0.0, 0.0])
+        self.assertAlmostEqual(esperas[2], 0.1, delta=0.02)
+        self.assertEqual(limitador.esperas, 1)
+
+    def test_reabastecimento_limitado_a_rajada(self):
+        limitador = LimitadorTaxa(por_segundo=10, rajada=2)
+
+        async def consumir(quantidade):
+            return [await limitador.aguardar() for _ in range(quantidade)]
+
+        asyncio.run(consumir(2))
+        # Um segundo depois: 10 fichas geradas, mas o balde guarda só a rajada
+        limitador.atualizado -= 1
+        esperas = asyncio.run(consumir(3))
+        self.assertEqual(esperas[:2], [0.0, 0.0])
+        self.assertGreater(esperas[2], 0)
+
+    def test_sem_limite(self):
+        limitador = LimitadorTaxa(por_segundo=None)
+        self.assertEqual(asyncio.run(limitador.aguardar()), 0.0)
+        self.assertEqual(limitador.esperas, 0)
+
+
+class CanonizacaoConsultaTests(SimpleTestCase):
+    """Forma canônica dos termos de busca (chave de cache, índice e histórico)."""
+
+    def test_ordem_acentos_e_espacos(self):
+        self.assertEqual(canonizar_consulta('Homicídio qualificado'), 'homicidi qualificad')
+        self.assertEqual(canonizar_consulta('qualificado  homicidio'), 'homicidi qualificad')
+
+    def test_abreviacoes_e_stopwords(self):
+        self.assertEqual(canonizar_consulta('art. 157 do CP'), '157 artig codig penal')
+        self.assertEqual(canonizar_consulta('§ 2º'), '2 paragraf')
+
+    def test_re_abreviacao_e_re_acentuada(self):
+        self.assertEqual(canonizar_consulta('RE 123'), '123 extraordinari recurs')
+        self.assertEqual(canonizar_consulta('ré confessa'), 'confess re')
+        self.assertEqual(radicais('O réu e a ré'), ['reu', 're'])
+
+    def test_plurais(self):
+        self.assertEqual(canonizar_consulta('prisões preventivas'), canonizar_consulta('prisão preventiva'))
+        self.assertEqual(canonizar_consulta('penais'), 'penal')
+
+    def test_taxa_de_acerto(self):
+        taxas = comparar_taxas_acerto(['Homicídio qualificado', 'homicidio qualificado', 'roubo'])
+        self.assertEqual(taxas['chaves_literais'], 3)
+        self.assertEqual(taxas['chaves_canonicas'], 2)
+        self.assertAlmostEqual(taxas['taxa_acerto_canonica'], 1 / 3)
+
+
+class _ParserRegistrador:
+    """ParserPDF falso: registra por qual entrada o upload chegou ao parser."""
+
+    chamadas = []
+
+    def __init__(self, cache=None):
+        pass
+
+    def extract_text_from_pdf(self, pdf_path, preprocess=None):
+        with open(pdf_path, 'rb') as arquivo:
+            self.chamadas.append(('caminho', arquivo.read()))
+        return 'texto do caminho'
+
+    def extract_text_from_stream(self, stream, preprocess=None):
+        self.chamadas.append(('stream', stream.read()))
+        return 'texto do stream'
+
+
+class UploadDenunciaTests(SimpleTestCase):
+    """O upload gravado em disco é lido pelo caminho; o em memória, pelo stream."""
+
+    def _enviar(self):
+        conteudo = b'%PDF-1.4 denuncia'
+        request = RequestFactory().post('/analise-denuncia/', {
+            'arquivo': SimpleUploadedFile('denuncia.pdf', conteudo, content_type='application/pdf'),
+        })
+        request.user = mock.Mock(is_authenticated=True)
+        _ParserRegistrador.chamadas = []
+        with mock.patch.object(views, 'ParserPDF', _ParserRegistrador), \
+                mock.patch.object(views, 'CachePDF', mock.Mock()), \
+                mock.patch.object(views, 'render') as render:
+            views.analise_denuncia_view(request)
+        return conteudo, render.call_args.args[2]
+
+    @override_settings(FILE_UPLOAD_HANDLERS=['django.core.files.uploadhandler.TemporaryFileUploadHandler'])
+    def test_upload_em_disco_usa_caminho(self):
+        conteudo, contexto = self._enviar()
+        self.assertEqual(_ParserRegistrador.chamadas, [('caminho', conteudo)])
+        self.assertIsNone(contexto['erro'])
+
+    @override_settings(FILE_UPLOAD_HANDLERS=['django.core.files.uploadhandler.MemoryFileUploadHandler'])
+    def test_upload_em_memoria_usa_stream(self):
+        conteudo, contexto = self._enviar()
+        self.assertEqual(_ParserRegistrador.chamadas, [('stream', conteudo)])
+        self.assertIsNone(contexto['erro'])
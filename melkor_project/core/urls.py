@@ -10,6 +10,7 @@ urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard_explicit"), # Rota explícita se necessário
     path("historico/", views.historico_pesquisas, name="historico_pesquisas"),
     path("api/historico/", views.api_historico, name="api_historico"),
+    path("api/jurisprudencia/stream/", views.api_jurisprudencia_stream, name="api_jurisprudencia_stream"),
     path("documentacao/api/", views.api_documentation, name="api_documentation"),
     path("integracao/chatgpt/", views.chatgpt_integration_guide, name="chatgpt_integration_guide"),
     path('analise-denuncia/', views.analise_denuncia_view, name='analise_denuncia'),
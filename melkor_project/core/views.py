@@ -1,9 +1,15 @@
 # core/views.py
+import json
+import os
+from PyPDF2.errors import PyPdfError
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from .models import HistoricoPesquisa
 from melkor.agente import analista_acusacao  # Importe seu agente
+from melkor.cache_pdf import CachePDF
+from melkor.jurisprudencia_tool import JurisprudenciaTool
+from melkor.parser_pdf import ParserPDF
 
 def placeholder_view_core(request):
     return HttpResponse("Placeholder para views do app Core. (Ex: dashboard, histórico de pesquisas, etc.)")
@@ -68,13 +74,66 @@ def chatgpt_integration_guide(request):
         'title': 'Guia de Integração ChatGPT - Melkor',
     })
 
+# Tipos MIME aceitos no upload da denúncia (alguns navegadores enviam o segundo)
+TIPOS_PDF = {"application/pdf", "application/x-pdf"}
+
 @login_required
 def analise_denuncia_view(request):
     resultado = None
+    erro = None
     if request.method == "POST":
-        texto = request.POST.get("texto")
-        # Aqui você chama o agente (ajuste conforme sua lógica)
-        # Exemplo: resultado = analista_acusacao.analisar(texto)
-        resultado = f"Análise feita para: {texto[:50]}..."  # Placeholder
-    return render(request, "core/analise_denuncia.html", {"resultado": resultado})
+        texto = request.POST.get("texto", "")
+        arquivo = request.FILES.get("arquivo")
+        if arquivo:
+            extensao = os.path.splitext(arquivo.name)[1].lower()
+            if arquivo.content_type not in TIPOS_PDF or extensao != ".pdf":
+                erro = "Envie a denúncia em um arquivo PDF."
+            else:
+                # O upload vai direto para o parser: uploads em memória são lidos
+                # do próprio BytesIO e uploads gravados em disco são abertos pelo
+                # caminho do arquivo temporário, de onde as páginas são renderizadas
+                # para o OCR sem cópia do PDF para cada processo.
+                parser = ParserPDF(cache=CachePDF())
+                try:
+                    if hasattr(arquivo, 'temporary_file_path'):
+                        texto = parser.extract_text_from_pdf(arquivo.temporary_file_path())
+                    else:
+                        texto = parser.extract_text_from_stream(arquivo.file)
+                except (PyPdfError, ValueError, OSError) as e:
+                    print(f"Erro ao ler o PDF enviado ({arquivo.name}): {e}")
+                    erro = "Não foi possível ler o PDF enviado. Verifique se o arquivo não está corrompido."
+        if erro is None:
+            # Aqui você chama o agente (ajuste conforme sua lógica)
+            # Exemplo: resultado = analista_acusacao.analisar(texto)
+            resultado = f"Análise feita para: {texto[:50]}..."  # Placeholder
+    return render(request, "core/analise_denuncia.html", {"resultado": resultado, "erro": erro})
+
+async def api_jurisprudencia_stream(request):
+    """
+    Busca jurisprudência e devolve os resultados em NDJSON (uma linha JSON por
+    site), à medida que cada site termina. A interface mostra os resultados do
+    JusBrasil enquanto STF e STJ ainda carregam.
+
+    Parâmetros GET: q (termo de busca) e site (opcional, pode se repetir).
+    Requer servidor ASGI (ver melkor_project/asgi.py); sob WSGI a resposta só é
+    enviada ao final.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'erro': 'Autenticação necessária'}, status=401)
+    termo = request.GET.get('q', '').strip()
+    if not termo:
+        return JsonResponse({'erro': "Parâmetro 'q' obrigatório"}, status=400)
+    sites = request.GET.getlist('site') or None
+
+    async def linhas():
+        # O navegador fica aberto no pool compartilhado do worker entre requisições
+        tool = JurisprudenciaTool()
+        async for lote in tool.buscar_jurisprudencia_stream(termo, sites):
+            yield json.dumps(lote, ensure_ascii=False) + "\n"
 
+    response = StreamingHttpResponse(linhas(), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    # Impede que o nginx acumule a resposta antes de repassá-la ao cliente
+    response['X-Accel-Buffering'] = 'no'
+    return response
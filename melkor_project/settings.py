@@ -81,6 +81,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads de PDF até este tamanho ficam em memória e são entregues ao parser
+# sem passar por arquivo temporário (acima disso o Django grava em disco).
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', 20 * 1024 * 1024))
+
 # Configurações de segurança para produção
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -1 +1 @@
-gunicorn melkor_project.wsgi:application
\ No newline at end of file
+gunicorn melkor_project.asgi:application --worker-class uvicorn.workers.UvicornWorker --timeout 120